@@ -0,0 +1,87 @@
+# Import required libraries
+import base64
+import numpy as np
+import plotly.express as px
+import plotly.io as pio
+from preprocessing import ENGAGEMENT_COLUMNS
+from rollup import FLAG_BITS
+from sidebar import RELATIVE_DATE_OFFSETS
+from symptom_index import SYMPTOMS
+
+## Compact payload for the client-side filtering mode: the rollup cube as typed arrays (one per
+## column, each in the narrowest type that holds it) plus per-cell symptom tallies. It is sent once with the page; assets/aggregates.js then
+## applies platform, label and date selections to it in the browser.
+
+# Counters summed per cell
+COUNT_MEASURES = ['posts', 'engagementRaw'] + ENGAGEMENT_COLUMNS + ['comments', 'scored']
+
+# Posts mentioning a symptom are tallied in chunks of this many rows
+SYMPTOM_CHUNK_ROWS = 1_000_000
+
+def _typed(values, dtype):
+    # {'dtype', 'data'}: little-endian bytes, base64-encoded, for the matching JavaScript TypedArray
+    values = np.ascontiguousarray(values, dtype=np.dtype(dtype).newbyteorder('<'))
+    return {'dtype': np.dtype(dtype).name, 'data': base64.b64encode(values.tobytes()).decode('ascii')}
+
+def _unsigned(values):
+    # Non-negative counts in the narrowest unsigned type that holds them (capped at uint32)
+    values = np.clip(np.nan_to_num(np.asarray(values, dtype=np.float64)), 0, np.iinfo(np.uint32).max)
+    for dtype in [np.uint8, np.uint16, np.uint32]:
+        if len(values) == 0 or values.max() <= np.iinfo(dtype).max:
+            return _typed(values, dtype)
+
+def _relative_offsets():
+    # Relative date choices as {'days': n} / {'months': n}, as the browser applies them
+    offsets = {}
+    for choice, offset in RELATIVE_DATE_OFFSETS.items():
+        kwds = offset.kwds
+        offsets[choice] = {'months': kwds.get('months', 0) + 12 * kwds.get('years', 0), 'days': kwds.get('days', 0)}
+    return offsets
+
+def symptom_tallies(rollup, sm_df, symptom_index):
+    ## (cell, symptom, posts) triplets: how many posts in each cube cell mention each symptom
+    cells = rollup.post_cells(sm_df)
+    rows = np.flatnonzero(symptom_index.packed.any(axis=1))
+
+    keys = []
+    for low in range(0, len(rows), SYMPTOM_CHUNK_ROWS):
+        chunk = rows[low:low + SYMPTOM_CHUNK_ROWS]
+        post, symptom = np.nonzero(symptom_index.matrix(chunk))
+        keys.append(cells[chunk[post]].astype(np.int64) * len(SYMPTOMS) + symptom)
+
+    keys, posts = np.unique(np.concatenate(keys) if keys else np.zeros(0, dtype=np.int64), return_counts=True)
+    return keys // len(SYMPTOMS), keys % len(SYMPTOMS), posts
+
+def aggregate_payload(rollup, sm_df, symptom_index, version=None):
+    ## JSON-ready payload for the aggregates dcc.Store
+    cube = rollup.cube
+    days = rollup.dates.astype('datetime64[D]').astype(np.int64)
+    origin = int(days.min()) if len(days) else 0
+
+    # Days are offsets from the first day of the cube
+    columns = {
+        'day': _unsigned(days - origin),
+        'platform': _typed(rollup.platforms, np.uint8),
+        'flags': _unsigned(rollup.flags),
+        'compound': _typed(cube['compound'].to_numpy(), np.float32),
+    }
+    for measure in COUNT_MEASURES:
+        columns[measure] = _unsigned(cube[measure].to_numpy())
+
+    cell, symptom, posts = symptom_tallies(rollup, sm_df, symptom_index)
+
+    return {
+        'version': version,
+        'cells': len(cube.index),
+        'origin': origin,
+        'platforms': [str(platform) for platform in rollup.platform_names],
+        'flagBits': FLAG_BITS,
+        'relativeOffsets': _relative_offsets(),
+        'engagementColumns': ENGAGEMENT_COLUMNS,
+        'columns': columns,
+        'symptoms': SYMPTOMS,
+        'symptomTallies': {'cell': _unsigned(cell), 'symptom': _typed(symptom, np.uint8), 'posts': _unsigned(posts)},
+        # Figure styling the server-side panels get from plotly express
+        'template': pio.templates[pio.templates.default].to_plotly_json(),
+        'colors': px.colors.qualitative.Prism,
+    }
@@ -0,0 +1,356 @@
+// Client-side filtering mode (DASHBOARD_CLIENTSIDE_FILTERING=1): the aggregate panels are rendered
+// here from the compact rollup payload in the 'aggregates' store (see aggregates.py), so sidebar
+// changes only go to the server for the post-card panels.
+
+(function () {
+    const DAY_MS = 86400000;
+    let decoded = null;
+
+    const TYPES = {uint8: Uint8Array, uint16: Uint16Array, uint32: Uint32Array, int32: Int32Array, float32: Float32Array};
+
+    function typed(column) {
+        // {dtype, data} from aggregates._typed as a TypedArray
+        const text = atob(column.data);
+        const bytes = new Uint8Array(text.length);
+        for (let i = 0; i < text.length; i++) {
+            bytes[i] = text.charCodeAt(i);
+        }
+        return new TYPES[column.dtype](bytes.buffer);
+    }
+
+    function decode(payload) {
+        // Typed arrays are decoded once per payload and reused by every panel
+        if (decoded && decoded.payload === payload) {
+            return decoded;
+        }
+        const columns = {};
+        for (const [name, column] of Object.entries(payload.columns)) {
+            columns[name] = typed(column);
+        }
+        // Days as epoch days rather than offsets from the first day
+        columns.day = Int32Array.from(columns.day, day => day + payload.origin);
+
+        const tallies = payload.symptomTallies;
+        decoded = {
+            payload: payload,
+            columns: columns,
+            tallies: {cell: typed(tallies.cell), symptom: typed(tallies.symptom), posts: typed(tallies.posts)},
+        };
+        return decoded;
+    }
+
+    function dayString(day) {
+        return new Date(day * DAY_MS).toISOString().slice(0, 10);
+    }
+
+    function parseDay(value) {
+        return Math.floor(Date.parse(String(value).slice(0, 10) + 'T00:00:00Z') / DAY_MS);
+    }
+
+    function subtractOffset(day, offset) {
+        // Same as subtracting a pandas DateOffset: months clip to the end of the target month
+        const date = new Date(day * DAY_MS);
+        if (offset.months) {
+            const month = date.getUTCMonth() - offset.months;
+            const lastDay = new Date(Date.UTC(date.getUTCFullYear(), month + 1, 0)).getUTCDate();
+            date.setUTCDate(1);
+            date.setUTCMonth(month);
+            date.setUTCDate(Math.min(new Date(day * DAY_MS).getUTCDate(), lastDay));
+        }
+        return Math.floor(date.getTime() / DAY_MS) - (offset.days || 0);
+    }
+
+    function selectCells(data, filters) {
+        // Same selection as Rollup.mask plus sidebar.date_window, as a 0/1 flag per cell
+        const [platformList, accountCategory, accountIdentity, accountType, accountLocation,
+               timeFrame, relativeDate, startDate, endDate] = filters;
+        const payload = data.payload, columns = data.columns, bits = payload.flagBits;
+        const platforms = new Set((platformList || []).map(platform => payload.platforms.indexOf(platform)));
+
+        let required = 0, impossible = false;
+        for (const flag of (accountCategory || []).concat(accountIdentity !== 'all' ? [accountIdentity] : [])) {
+            if (flag in bits) {
+                required |= bits[flag];
+            } else {
+                impossible = true;
+            }
+        }
+
+        const selected = new Uint8Array(payload.cells);
+        let latest = null;
+        for (let cell = 0; cell < payload.cells && !impossible; cell++) {
+            const flags = columns.flags[cell];
+            if (!platforms.has(columns.platform[cell]) || (flags & required) !== required) {
+                continue;
+            }
+            if (accountType !== 'all' && ((flags & bits.institutional) !== 0) !== (accountType === 'institutional')) {
+                continue;
+            }
+            if (accountLocation !== 'all' && ((flags & bits.georgia) !== 0) !== (accountLocation === 'georgia')) {
+                continue;
+            }
+            selected[cell] = 1;
+            latest = latest === null ? columns.day[cell] : Math.max(latest, columns.day[cell]);
+        }
+
+        // Date bounds start <= day < end (null is unbounded)
+        let start = null, end = null;
+        if (timeFrame === 'relative') {
+            if (relativeDate !== 'All Dates' && latest !== null) {
+                start = subtractOffset(latest, payload.relativeOffsets[relativeDate]);
+            }
+        } else {
+            start = parseDay(startDate);
+            end = parseDay(endDate) + 1;
+        }
+
+        const cells = [];
+        for (let cell = 0; cell < payload.cells; cell++) {
+            const day = columns.day[cell];
+            if (selected[cell] && (start === null || day >= start) && (end === null || day < end)) {
+                cells.push(cell);
+            } else {
+                selected[cell] = 0;
+            }
+        }
+        return {cells: cells, selected: selected};
+    }
+
+    function component(type, props, namespace) {
+        return {type: type, namespace: namespace || 'dash_html_components', props: props};
+    }
+
+    function number(value) {
+        return value.toLocaleString('en-US');
+    }
+
+    function title(text) {
+        return text.charAt(0).toUpperCase() + text.slice(1);
+    }
+
+    function layout(payload, settings) {
+        return Object.assign({template: payload.template, font: {family: 'Open Sans', color: 'black'}}, settings);
+    }
+
+    function callbackInputs(args) {
+        // [decoded payload, selected cells] for a callback's (store data, ...sidebar values), or null
+        if (!args[0]) {
+            return null;
+        }
+        const decodedPayload = decode(args[0]);
+        return [decodedPayload, selectCells(decodedPayload, args.slice(1))];
+    }
+
+    function engagementPanel() {
+        const inputs = callbackInputs(Array.from(arguments));
+        if (!inputs) {
+            return window.dash_clientside.no_update;
+        }
+        const [data, selection] = inputs;
+        const columns = data.columns;
+
+        const totals = {}, week = {posts: 0, engagementRaw: 0, comments: 0};
+        const measures = ['posts', 'engagementRaw'].concat(data.payload.engagementColumns);
+        measures.forEach(measure => { totals[measure] = 0; });
+        const platforms = new Set();
+        let endDay = null;
+        for (const cell of selection.cells) {
+            measures.forEach(measure => { totals[measure] += columns[measure][cell]; });
+            platforms.add(data.payload.platforms[columns.platform[cell]]);
+            endDay = endDay === null ? columns.day[cell] : Math.max(endDay, columns.day[cell]);
+        }
+        // Past week: the 7 days up to the newest selected day
+        for (const cell of selection.cells) {
+            if (columns.day[cell] >= endDay - 7) {
+                week.posts += columns.posts[cell];
+                week.engagementRaw += columns.engagementRaw[cell];
+                week.comments += columns.comments[cell];
+            }
+        }
+
+        const H4 = text => component('H4', {children: text});
+        const H5 = text => component('H5', {children: text});
+        const H6 = text => component('H6', {children: text});
+        const box = children => component('Div', {children: children, style: {border: '1px solid black'}});
+
+        const values = [component('Br', {}),
+            H4(number(totals.posts) + ' Total Posts'), H6(number(week.posts) + ' Posts This Past Week'),
+            H4(number(totals.engagementRaw) + ' Total Reactions'), H6(number(week.engagementRaw) + ' Reactions This Past Week'),
+            H4(number(totals.ig_comment + totals.fb_comment + totals.tw_replies) + ' Total Comments'),
+            H6(number(week.comments) + ' Comments This Past Week')];
+
+        if (platforms.has('facebook')) {
+            values.push(box([component('Br', {}), H5('Facebook Reactions'),
+                H6('Like Count 👍: ' + number(totals.fb_like) + ' '), H6('Share Count 🫂: ' + number(totals.fb_share) + ' '),
+                H6('Comment Count 💬: ' + number(totals.fb_comment) + ' '), H6('Heart Count ❤️: ' + number(totals.fb_love) + ' '),
+                H6('Wow Count 😯: ' + number(totals.fb_wow) + ' '), H6('Laugh Count 😂: ' + number(totals.fb_haha) + ' '),
+                H6('Sad Count 😢: ' + number(totals.fb_sad) + ' '), H6('Angry Count 😡: ' + number(totals.fb_angry) + ' '),
+                H6('Thankful Count 🌸: ' + number(totals.fb_thankful) + ' '), H6('Care Count 🥰: ' + number(totals.fb_care) + ' '),
+                component('Br', {})]));
+        }
+        if (platforms.has('instagram')) {
+            values.push(component('Br', {}));
+            values.push(box([component('Br', {}), H5('Instagram Reactions'),
+                H6('Favorite Count ❤️: ' + number(totals.ig_favorite) + ' '), H6('CommentCount 💬: ' + number(totals.ig_comment) + ' '),
+                component('Br', {})]));
+        }
+        if (platforms.has('twitter')) {
+            values.push(component('Br', {}));
+            values.push(box([component('Br', {}), H5('Twitter Reactions'),
+                H6('Retweet Count 🔄: ' + number(totals.tw_retweets) + ' '), H6('Reply Count 💬: ' + number(totals.tw_replies) + ' '),
+                H6('Like Count 👍: ' + number(totals.tw_likes) + ' '), H6('Quote Count 🗣️: ' + number(totals.tw_quote_count) + ' '),
+                component('Br', {})]));
+        }
+        values.push(component('Br', {}));
+
+        const row = component('Row', {
+            children: [component('H4', {children: 'Engagement Statistics', style: {fontStyle: 'italic'}}),
+                       component('P', {children: 'The number of reactions and comments across all platforms.'}),
+                       component('Div', {id: 'statistics', children: values, style: {border: '1px solid black'}})],
+            justify: 'center', align: 'center', className: 'h-50', style: {height: '100vh', alignItems: 'center'},
+        }, 'dash_bootstrap_components');
+        return component('Div', {
+            children: [component('Container', {children: [row], style: {maxWidth: '100vw', margin: '1em'}}, 'dash_bootstrap_components')],
+            style: {marginRight: '1em'},
+        });
+    }
+
+    function newsEngagementPanel() {
+        const inputs = callbackInputs(Array.from(arguments));
+        if (!inputs) {
+            return window.dash_clientside.no_update;
+        }
+        const [data, selection] = inputs;
+        const columns = data.columns, newsBit = data.payload.flagBits.news_institutional;
+
+        // News and institutional posts per day
+        const counts = new Map();
+        for (const cell of selection.cells) {
+            if (columns.flags[cell] & newsBit) {
+                counts.set(columns.day[cell], (counts.get(columns.day[cell]) || 0) + columns.posts[cell]);
+            }
+        }
+        const days = Array.from(counts.keys()).sort((a, b) => a - b);
+
+        const figure = {
+            data: [{type: 'scatter', mode: 'lines', x: days.map(dayString), y: days.map(day => counts.get(day)),
+                    line: {color: '#0053a0'}, showlegend: false, hovertemplate: 'x=%{x}<br>y=%{y}<extra></extra>'}],
+            layout: layout(data.payload, {
+                title: {text: 'News + Institutional Posts Over Time', x: 0.5},
+                xaxis: {title: {text: 'Date'}}, yaxis: {title: {text: 'Post Count'}},
+                legend: {title: {text: 'Post Count'}, orientation: 'h', yanchor: 'bottom', y: 1.02, xanchor: 'right', x: 1},
+            }),
+        };
+        return component('Div', {
+            children: [component('H4', {children: 'News and Institutions', style: {textAlign: 'left', fontStyle: 'italic'}}),
+                       component('P', {children: "'Viral' News Cycles: recording post trends from news and institutional accounts.", style: {textAlign: 'left'}}),
+                       component('Div', {children: component('Graph', {figure: figure}, 'dash_core_components'), style: {border: '1px solid black'}})],
+            style: {width: '45vw'},
+        });
+    }
+
+    function sentimentPanel() {
+        const inputs = callbackInputs(Array.from(arguments));
+        if (!inputs) {
+            return window.dash_clientside.no_update;
+        }
+        const [data, selection] = inputs;
+        const columns = data.columns, platforms = data.payload.platforms;
+
+        // Daily compound sums and scored posts per platform, then rolling means from prefix sums (see Rollup.sentiment_trend)
+        const daily = platforms.map(() => new Map());
+        for (const cell of selection.cells) {
+            const sums = daily[columns.platform[cell]], day = columns.day[cell];
+            const total = sums.get(day) || [0, 0];
+            sums.set(day, [total[0] + columns.compound[cell], total[1] + columns.scored[cell]]);
+        }
+
+        const traces = [];
+        daily.forEach((sums, code) => {
+            if (sums.size === 0) {
+                return;
+            }
+            const first = Math.min(...sums.keys()), last = Math.max(...sums.keys());
+            const compound = [0], scored = [0], dates = [];
+            for (let day = first; day <= last; day++) {
+                const total = sums.get(day) || [0, 0];
+                compound.push(compound[compound.length - 1] + total[0]);
+                scored.push(scored[scored.length - 1] + total[1]);
+                dates.push(dayString(day));
+            }
+            const rolling = size => dates.map((date, position) => {
+                const low = Math.max(0, position + 1 - size);
+                const count = scored[position + 1] - scored[low];
+                return count > 0 ? (compound[position + 1] - compound[low]) / count : null;
+            });
+            const name = title(platforms[code]);
+            traces.push({type: 'scatter', mode: 'lines', x: dates, y: rolling(7), name: name + ' (7-day)'});
+            traces.push({type: 'scatter', mode: 'lines', x: dates, y: rolling(30), name: name + ' (30-day)', line: {dash: 'dot'}});
+        });
+
+        const figure = {
+            data: traces,
+            layout: layout(data.payload, {
+                title: {text: 'Rolling Average Sentiment', x: 0.5},
+                xaxis: {title: {text: 'Date'}}, yaxis: {title: {text: 'Compound Sentiment'}},
+                legend: {orientation: 'h', yanchor: 'bottom', y: 1.02, xanchor: 'right', x: 1},
+            }),
+        };
+        return component('Div', {
+            children: [component('H4', {children: 'Sentiment Over Time', style: {textAlign: 'left', fontStyle: 'italic'}}),
+                       component('P', {children: 'Average compound sentiment of posts on each platform, from -1 (most negative) to 1 (most positive).', style: {textAlign: 'left'}}),
+                       component('Div', {children: component('Graph', {figure: figure}, 'dash_core_components'), style: {border: '1px solid black'}})],
+            style: {width: '45vw'},
+        });
+    }
+
+    function symptomsPanel() {
+        const inputs = callbackInputs(Array.from(arguments));
+        if (!inputs) {
+            return window.dash_clientside.no_update;
+        }
+        const [data, selection] = inputs;
+        const symptoms = data.payload.symptoms, tallies = data.tallies, days = data.columns.day;
+
+        // Weeks (ending on Sunday) in which a selected post mentions each symptom
+        const weeks = symptoms.map(() => new Set());
+        for (let i = 0; i < tallies.cell.length; i++) {
+            if (selection.selected[tallies.cell[i]]) {
+                const day = days[tallies.cell[i]];
+                weeks[tallies.symptom[i]].add(day + 6 - (day + 3) % 7);
+            }
+        }
+        const counts = symptoms.map((symptom, position) => [symptom, weeks[position].size])
+            .sort((a, b) => b[1] - a[1]);
+
+        const colors = data.payload.colors;
+        const figure = {
+            data: counts.map(([symptom, count], position) => ({
+                type: 'bar', x: [symptom], y: [count], name: symptom, legendgroup: symptom, showlegend: true,
+                marker: {color: colors[position % colors.length]}, offsetgroup: symptom, orientation: 'v',
+                hovertemplate: 'symptom=%{x}<br>count=%{y}<extra></extra>',
+            })),
+            layout: layout(data.payload, {
+                title: {text: 'Sharing of Symptoms', x: 0.5}, barmode: 'relative',
+                legend: {title: {text: 'Symptoms'}, tracegroupgap: 0},
+                xaxis: {title: {text: 'Symptom'}, categoryorder: 'array', categoryarray: counts.map(([symptom]) => symptom)},
+                yaxis: {title: {text: 'Number of Weeks Observed'}},
+            }),
+        };
+        return component('Div', {
+            children: [component('H4', {children: 'Sharing of COVID Symptoms', style: {textAlign: 'left', fontStyle: 'italic', marginTop: '1em'}}),
+                       component('P', {children: 'Displays the types of symptoms mentioned across social media platforms.', style: {textAlign: 'left'}}),
+                       component('Graph', {id: 'symptom-bar-graph', figure: figure, style: {border: '1px solid black', width: '30vw'}}, 'dash_core_components')],
+            style: {marginRight: '5em'},
+        });
+    }
+
+    window.dash_clientside = Object.assign({}, window.dash_clientside, {
+        aggregates: {
+            engagement_panel: engagementPanel,
+            news_engagement_panel: newsEngagementPanel,
+            sentiment_panel: sentimentPanel,
+            symptoms_panel: symptomsPanel,
+        },
+    });
+})();
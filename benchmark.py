@@ -0,0 +1,155 @@
+# Import required libraries
+import argparse
+import importlib
+import json
+import os
+import sys
+import time
+import tracemalloc
+import numpy as np
+import pandas as pd
+from data import load_metadata, refresh_store
+from synthetic_data import write_pickles
+
+## Benchmarks for the filter path, every panel builder and a full page of panel callbacks, run on
+## synthetic data (see synthetic_data.py) at several scales and sidebar presets. Reports latency
+## percentiles and peak Python memory, and exits non-zero when a benchmark regresses against the
+## stored baseline.
+##
+##     python benchmark.py --scales 10000 100000 --save-baseline    # record a baseline
+##     python benchmark.py --scales 10000 100000                    # compare against it
+
+DATA_DIR = 'benchmark_data'
+BASELINE_FILE = 'benchmark_baseline.json'
+
+# Regressions smaller than these are timer or allocator noise
+MIN_REGRESSION_MS = 1.0
+MIN_REGRESSION_MB = 1.0
+
+def filter_presets(metadata):
+    # Sidebar states in dataframe_filter argument order
+    platforms = metadata['platforms']
+    end_date = metadata['max_date']
+    start_date = end_date - pd.DateOffset(months=3)
+    return {
+        'default': (platforms, [], 'all', 'all', 'all', 'relative', 'All Dates', metadata['min_date'], end_date),
+        'last_30_days': (platforms, [], 'all', 'all', 'all', 'relative', 'Last 30 Days', None, None),
+        'twitter_georgia': (['twitter'], [], 'all', 'all', 'georgia', 'relative', 'Last 6 Months', None, None),
+        'health_institutions_range': (platforms, ['health'], 'all', 'institutional', 'all', 'range', None,
+                                      start_date.isoformat(), end_date.isoformat()),
+    }
+
+def measure(function, repeat):
+    ## Latency percentiles (ms) over `repeat` runs, plus peak traced memory (MB) of one more run
+    timings = []
+    for run in range(repeat):
+        start = time.perf_counter()
+        function()
+        timings.append((time.perf_counter() - start) * 1000)
+
+    tracemalloc.start()
+    function()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    p50, p90, p99 = np.percentile(timings, [50, 90, 99])
+    return {'p50': float(p50), 'p90': float(p90), 'p99': float(p99), 'peak_mb': peak / 1024 / 1024}
+
+def load_scale(n_posts):
+    # Generate (once) and load the synthetic store for a scale; returns the loaded dashboard module
+    directory = os.path.join(DATA_DIR, str(n_posts))
+    if not os.path.exists(directory):
+        write_pickles(n_posts, directory)
+    os.chdir(directory)
+    refresh_store()
+
+    # dashboard.py loads its data from the working directory on import, so it is imported here
+    os.environ['DASHBOARD_EAGER_STARTUP'] = '1'
+    if 'dashboard' in sys.modules:
+        dashboard = sys.modules['dashboard']
+        dashboard.load_data()
+        dashboard.result_cache.clear()
+    else:
+        dashboard = importlib.import_module('dashboard')
+    return dashboard
+
+def page(dashboard, filters):
+    # Everything the panel callbacks compute for one sidebar state, without the result cache
+    data = dashboard.snapshot
+    results = {source: compute(data, filters) for source, compute in dashboard.SOURCES.items()}
+    for source, build in dashboard.PANELS.values():
+        build(results[source], data)
+    dashboard.posts(results['filter'][0], data.engagement_index, 'engagement')
+
+def run_scale(n_posts, repeat):
+    root = os.getcwd()
+    try:
+        dashboard = load_scale(n_posts)
+        results = {}
+        for preset, filters in filter_presets(load_metadata()).items():
+            data = dashboard.snapshot
+            sources = {source: compute(data, filters) for source, compute in dashboard.SOURCES.items()}
+            filter_result = sources['filter']
+
+            benchmarks = {
+                'dataframe_filter': lambda: dashboard.filter_result(data, filters),
+                'rollup_cells': lambda: dashboard.rollup_result(data, filters),
+                'posts': lambda: dashboard.posts(filter_result[0], data.engagement_index, 'engagement'),
+            }
+            for name, (source, build) in dashboard.PANELS.items():
+                benchmarks[name] = lambda source=source, build=build: build(sources[source], data)
+            benchmarks['page'] = lambda: page(dashboard, filters)
+
+            for name, function in benchmarks.items():
+                results[f'{n_posts}/{preset}/{name}'] = measure(function, repeat)
+        return results
+    finally:
+        os.chdir(root)
+
+def regressions(results, baseline, tolerance):
+    ## Benchmarks slower (p50) or hungrier (peak memory) than the baseline by more than `tolerance`
+    found = []
+    for key, result in results.items():
+        if key not in baseline:
+            continue
+        base = baseline[key]
+        if result['p50'] > base['p50'] * (1 + tolerance) and result['p50'] - base['p50'] > MIN_REGRESSION_MS:
+            found.append(f"{key}: p50 {base['p50']:.1f} ms -> {result['p50']:.1f} ms")
+        if result['peak_mb'] > base['peak_mb'] * (1 + tolerance) and result['peak_mb'] - base['peak_mb'] > MIN_REGRESSION_MB:
+            found.append(f"{key}: peak {base['peak_mb']:.1f} MB -> {result['peak_mb']:.1f} MB")
+    return found
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the dashboard on synthetic data')
+    parser.add_argument('--scales', type=int, nargs='+', default=[10000, 100000], help='numbers of posts (10k to 10M)')
+    parser.add_argument('--repeat', type=int, default=5, help='timed runs per benchmark')
+    parser.add_argument('--baseline', default=BASELINE_FILE)
+    parser.add_argument('--save-baseline', action='store_true', help='record these results as the new baseline')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='allowed slowdown before failing (0.25 = 25%%)')
+    args = parser.parse_args()
+
+    results = {}
+    for n_posts in args.scales:
+        results.update(run_scale(n_posts, args.repeat))
+
+    print(f"{'benchmark':<60} {'p50 ms':>10} {'p90 ms':>10} {'p99 ms':>10} {'peak MB':>10}")
+    for key, result in results.items():
+        print(f"{key:<60} {result['p50']:>10.1f} {result['p90']:>10.1f} {result['p99']:>10.1f} {result['peak_mb']:>10.1f}")
+
+    if args.save_baseline:
+        with open(args.baseline, 'w') as baseline_file:
+            json.dump(results, baseline_file, indent=2, sort_keys=True)
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f'No baseline at {args.baseline}; run with --save-baseline to record one')
+        return 0
+
+    with open(args.baseline) as baseline_file:
+        found = regressions(results, json.load(baseline_file), args.tolerance)
+    for regression in found:
+        print(f'REGRESSION {regression}')
+    return 1 if found else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
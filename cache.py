@@ -0,0 +1,120 @@
+# Import required libraries
+import json
+import threading
+from collections import OrderedDict
+import pandas as pd
+import plotly
+
+def estimate_bytes(value):
+    ## Rough in-memory size of a cached value, used for the LRU byte budget
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(index=True))
+    if isinstance(value, (list, tuple)):
+        return sum(estimate_bytes(item) for item in value)
+    if hasattr(value, 'nbytes'):
+        return int(value.nbytes)
+    try:
+        # Dash components and figures: size of the JSON payload they serialize to
+        return len(json.dumps(value, cls=plotly.utils.PlotlyJSONEncoder))
+    except (TypeError, ValueError):
+        return 64
+
+class ResultCache:
+    ## Thread-safe LRU cache bounded by the estimated byte size of its entries
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.version = None
+        self.lock = threading.Lock()
+        self.pending = {}
+
+    def after_fork(self):
+        # In a forked process only the forking thread survives: a lock or a computation another
+        # thread held at the fork would never be released there
+        self.lock = threading.Lock()
+        self.pending = {}
+
+    def set_version(self, version):
+        # Entries computed against an older copy of the data are dropped
+        with self.lock:
+            if version != self.version:
+                self.entries.clear()
+                self.total_bytes = 0
+                self.version = version
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.total_bytes = 0
+
+    def get(self, key, default=None, count=True):
+        # count=False reads without adding to the hit and miss counters
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                self.hits += count
+                return self.entries[key][0]
+            self.misses += count
+            return default
+
+    def put(self, key, value, size=None):
+        size = estimate_bytes(value) if size is None else size
+        with self.lock:
+            if key in self.entries:
+                self.total_bytes -= self.entries.pop(key)[1]
+            if size > self.max_bytes:
+                return value
+
+            self.entries[key] = (value, size)
+            self.total_bytes += size
+
+            # Evict the least recently used entries until we are back under budget
+            while self.total_bytes > self.max_bytes:
+                _, (_, evicted_size) = self.entries.popitem(last=False)
+                self.total_bytes -= evicted_size
+        return value
+
+    def get_or_compute(self, key, compute):
+        missing = object()
+        value = self.get(key, missing)
+        if value is not missing:
+            return value
+
+        # Concurrent callers asking for the same key wait for a single computation
+        with self.lock:
+            event = self.pending.get(key)
+            owner = event is None
+            if owner:
+                event = self.pending[key] = threading.Event()
+
+        if not owner:
+            # Already counted as a miss above
+            event.wait()
+            value = self.get(key, missing, count=False)
+            if value is not missing:
+                return value
+            return compute()
+
+        try:
+            return self.put(key, compute())
+        finally:
+            with self.lock:
+                del self.pending[key]
+            event.set()
+
+    def stats(self):
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self.entries),
+                'bytes': self.total_bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+            }
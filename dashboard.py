@@ -1,21 +1,141 @@
 # Import required libraries
+import functools
+import hashlib
+import os
+import threading
 import numpy as np
 import dash
 import dash_bootstrap_components as dbc
 from dash import html, dcc
-from dash.dependencies import Input, Output, State
-import pandas as pd
+from dash.dependencies import Input, Output, State, ClientsideFunction
 import plotly.express as px
 import plotly.graph_objects as go
 from style import CONTENT_STYLE
-from sidebar import sidebar, dataframe_filter
-from graphs import engagement_statistics, posts, tf_idf, groups_and_communities, symptoms, news_engagement, news_posts
-from flask import Flask
+from sidebar import sidebar, dataframe_filter, date_window, filter_key, default_filters
+from graphs import engagement_statistics, posts, tf_idf, keyword_table, keyword_table_page, groups_and_communities, symptoms, news_engagement, news_posts, sentiment_over_time
+from graphs import group_posts, groups_and_communities_page, news_institutional_posts, news_posts_page, CARD_COLUMNS
+from data import store_version
+from snapshot import load_snapshot
+from cache import ResultCache
+from aggregates import aggregate_payload
+from metrics import Registry, BYTES_BUCKETS, ROWS_BUCKETS
+from jobs import JobManager, JOB_DIR
+from flask import Flask, Response, request
 from flask_cors import CORS
 
-sm_df = pd.read_pickle('updated_testing_data.pkl')
-weekly_df = pd.read_pickle('keywords.pkl')
-symptoms_df = pd.read_pickle('weekly_tf_idf.pkl')
+def load_data():
+    global snapshot
+
+    # Columnar store, memory-mapped and shared with the other workers. It is built by python data.py
+    # and ingest.py, never here; the data and its indexes are loaded completely, then published with
+    # a single assignment, and requests already running keep the snapshot they started with.
+    new_snapshot = load_snapshot()
+    result_cache.set_version(new_snapshot.version)
+    snapshot = new_snapshot
+
+    # Background jobs run in processes forked from this one, so they get the new snapshot from here
+    # rather than each loading its own
+    job_manager.restart()
+
+def reload_if_changed():
+    # Pick up a rebuilt store without a restart: only the version in data_store/CURRENT is compared,
+    # and the files are reopened when it changes. Requests arriving while a reload is running carry
+    # on with the current snapshot instead of waiting for it. Job processes keep the snapshot they
+    # were forked with (the worker forks new ones when it reloads).
+    if job_process or store_version() == snapshot.version or not reload_lock.acquire(blocking=False):
+        return
+    try:
+        if store_version() != snapshot.version:
+            load_data()
+    finally:
+        reload_lock.release()
+
+def start_loading():
+    # Load the data and mark the app ready, then render the default view so the first visitors are
+    # served from the cache (requests arriving meanwhile share those computations)
+    with reload_lock:
+        load_data()
+    data_ready.set()
+    warm_default_view()
+
+def wait_for_data():
+    data_ready.wait()
+
+def data_version():
+    # Background panel results are stored per data version (see jobs.py)
+    wait_for_data()
+    reload_if_changed()
+    return snapshot.version
+
+def start_job_process():
+    ## First thing in each background job process. It is forked from a worker with its data
+    ## already loaded, but only the forking thread comes along, so the locks the other threads
+    ## might have held are replaced.
+    global reload_lock, data_ready, job_process
+    job_process = True
+    reload_lock = threading.Lock()
+    data_ready = threading.Event()
+    data_ready.set()
+    result_cache.after_fork()
+    metrics.after_fork()
+    # Samples inherited from the worker are already counted there
+    metrics.drain()
+
+def collect_job_metrics():
+    # In a job process after each job: what the job recorded, merged into the worker's registry
+    return metrics.drain()
+
+# Filter results and rendered panels, keyed on the normalized sidebar state. The cache is per
+# worker, so DASHBOARD_CACHE_MB bounds how far each worker's memory grows past the shared data.
+result_cache = ResultCache(max_bytes=int(os.environ.get('DASHBOARD_CACHE_MB', 512)) * 1024 * 1024)
+reload_lock = threading.Lock()
+data_ready = threading.Event()
+job_process = False
+
+# Lazy startup: the app and its skeleton layout come up at once while the data loads in the
+# background. Set DASHBOARD_EAGER_STARTUP=1 to load everything before the module finishes importing.
+EAGER_STARTUP = os.environ.get('DASHBOARD_EAGER_STARTUP') == '1'
+
+# Client-side filtering: the page ships a compact rollup payload and the aggregate panels are
+# filtered and drawn in the browser (assets/aggregates.js); only post-card panels call the server.
+CLIENTSIDE_FILTERING = os.environ.get('DASHBOARD_CLIENTSIDE_FILTERING') == '1'
+CLIENTSIDE_PANELS = ['engagement', 'news-engagement', 'sentiment', 'symptoms']
+
+# The Hot Topics, groups and news posts panels can take seconds over a long date range, so they run
+# as background callbacks: a local pool of DASHBOARD_JOB_PROCESSES processes per worker computes them
+# and the worker's threads stay free for the cheap panels. Results are kept in DASHBOARD_JOB_DIR,
+# shared by all workers.
+PANEL_STEPS = ['Filtering posts', 'Building the panel', 'Done']
+job_manager = JobManager(directory=os.environ.get('DASHBOARD_JOB_DIR', JOB_DIR),
+                         processes=int(os.environ.get('DASHBOARD_JOB_PROCESSES', 2)),
+                         cache_by=[data_version], initializer=start_job_process,
+                         collect=collect_job_metrics, merge=lambda samples: metrics.merge(samples))
+
+# Callback, panel and cache metrics, served in Prometheus text format on /metrics
+metrics = Registry()
+CALLBACK_SECONDS = metrics.histogram('dashboard_callback_seconds', 'Wall time of each Dash callback.')
+SOURCE_SECONDS = metrics.histogram('dashboard_source_seconds', 'Wall time of computing a filter or rollup result (cache misses).')
+PANEL_SECONDS = metrics.histogram('dashboard_panel_build_seconds', 'Wall time of building a panel from its source result (cache misses).')
+FILTER_ROWS_IN = metrics.counter('dashboard_filter_rows_in_total', 'Rows passed into dataframe_filter.')
+FILTER_ROWS_OUT = metrics.counter('dashboard_filter_rows_out_total', 'Rows returned by dataframe_filter.')
+FILTER_ROWS = metrics.histogram('dashboard_filter_rows', 'Rows returned by each dataframe_filter call.', ROWS_BUCKETS)
+RESPONSE_BYTES = metrics.histogram('dashboard_response_bytes', 'Serialized size of each callback response.', BYTES_BUCKETS)
+metrics.gauge('dashboard_cache_hits_total', 'Result cache hits.', lambda: result_cache.stats()['hits'], kind='counter')
+metrics.gauge('dashboard_cache_misses_total', 'Result cache misses.', lambda: result_cache.stats()['misses'], kind='counter')
+metrics.gauge('dashboard_cache_hit_ratio', 'Share of result cache lookups served from the cache.', lambda: result_cache.stats()['hit_rate'])
+metrics.gauge('dashboard_cache_entries', 'Entries in the result cache.', lambda: result_cache.stats()['entries'])
+metrics.gauge('dashboard_cache_bytes', 'Estimated size of the result cache.', lambda: result_cache.stats()['bytes'])
+metrics.gauge('dashboard_jobs_running', 'Background panel jobs running in this worker\'s pool.', lambda: job_manager.stats()['running'])
+metrics.gauge('dashboard_jobs_submitted_total', 'Background panel jobs started.', lambda: job_manager.stats()['submitted'], kind='counter')
+metrics.gauge('dashboard_jobs_shared_total', 'Background panel requests served by a job already running or finished.', lambda: job_manager.stats()['shared'], kind='counter')
+
+def instrumented(callback):
+    # Records the wall time of a Dash callback, labelled with its name
+    @functools.wraps(callback)
+    def timed_callback(*args):
+        with CALLBACK_SECONDS.time(callback=callback.__name__):
+            return callback(*args)
+    return timed_callback
 
 # Topic Data Calculations
 # topics = list(set(val for sublist in sm_df['topics'] for val in sublist)) # Get the unique topics
@@ -31,15 +151,46 @@ symptoms_df = pd.read_pickle('weekly_tf_idf.pkl')
 
 server = Flask(__name__)
 
-app = dash.Dash(server=server, suppress_callback_exceptions=True, external_stylesheets=[dbc.themes.BOOTSTRAP], serve_locally=False)
+app = dash.Dash(server=server, suppress_callback_exceptions=True, external_stylesheets=[dbc.themes.BOOTSTRAP], serve_locally=False,
+                background_callback_manager=job_manager)
 app.title = 'Social Media Analytics Dashboard'
 server = app.server
 CORS(server) 
 
+# Health checks: /health answers as soon as the process is up, /ready once the data is loaded
+@server.route('/health')
+def health():
+    return 'ok'
+
+@server.route('/ready')
+def ready():
+    return ('ready', 200) if data_ready.is_set() else ('loading', 503)
+
+@server.route('/metrics')
+def metrics_text():
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
+@server.after_request
+def record_response_size(response):
+    # Size of each callback response, labelled with the outputs it updates
+    if request.path.endswith('/_dash-update-component'):
+        output = (request.get_json(silent=True) or {}).get('output', '')
+        RESPONSE_BYTES.observe(response.calculate_content_length() or 0, output=output)
+    return response
+
+def background_panel_div(name):
+    # Placeholder and progress bar, shown while the panel's background job runs
+    placeholder = html.Div(id=f'{name}-placeholder',
+                           children=[html.P('Crunching the numbers for this panel...', style={'fontStyle': 'italic'}),
+                                     dbc.Progress(id=f'{name}-progress', value=0, max=len(PANEL_STEPS) - 1, striped=True, animated=True)],
+                           style={'display': 'none'})
+    return html.Div(children=[placeholder, html.Div(id=name)])
+
+# Panels start empty and are filled in by their callbacks on page load
 maindiv_list = []
-maindiv_list.append(tf_idf(sm_df, weekly_df))
+maindiv_list.append(background_panel_div('tf-idf'))
 # maindiv_list.append(html.Br())
-maindiv_list.append(engagement_statistics(sm_df))
+maindiv_list.append(dcc.Loading(html.Div(id='engagement')))
 # maindiv_list.append(hot_topics(column_sums))
 
 maindiv = html.Div(
@@ -54,20 +205,52 @@ maindiv = html.Div(
                         style={"display": "inline-flex", "alignItems": "center", "gap": "2em"}),
                 html.Div(children=[html.H4(id='New and Popular', children='See What\'s Popular', style={'fontStyle': 'italic', 'marginTop': '1em'}), 
                                    html.P('A collection of the most popular posts across platforms by the number of reactions, normalized by the number of followers of the author account.'),
-                                   posts(sm_df)], style={"maxWidth": "100vw"}),
+                                   dcc.RadioItems(
+                                       id='posts-ranking',
+                                       options=[
+                                           {'label': 'Total Reactions', 'value': 'engagement'},
+                                           {'label': 'Reactions per Follower', 'value': 'normalized'},
+                                       ],
+                                       value='engagement',
+                                       inline=True,
+                                       inputStyle={"marginRight":"0.5rem", "marginLeft":"0.5rem"}
+                                   ),
+                                   dcc.Loading(html.Div(id='posts'))], style={"maxWidth": "100vw"}),
                 html.Br(),
                 html.Hr(style={'borderTop': '2px solid black'}),
                 html.H2(children='Content and Engagement', style={"textAlign":"left"}),
-                html.Div(children=[groups_and_communities(sm_df), symptoms(symptoms_df)], style={'display' : 'flex', 'gap' : '2em'}),
-                html.Div(children=[news_engagement(sm_df)], style={'display': 'flex', 'verticalAlign': 'top'}),
-                html.Div(children=[news_posts(sm_df)], style={'display': 'flex', 'verticalAlign': 'top'})
+                html.Div(children=[background_panel_div('groups-communities'), dcc.Loading(html.Div(id='symptoms'))], style={'display' : 'flex', 'gap' : '2em'}),
+                html.Div(children=[dcc.Loading(html.Div(id='news-engagement')), dcc.Loading(html.Div(id='sentiment'))], style={'display': 'flex', 'gap': '2em', 'verticalAlign': 'top'}),
+                html.Div(children=[background_panel_div('news-posts')], style={'display': 'flex', 'verticalAlign': 'top'})
             ]
         )
     ],
     style = CONTENT_STYLE
 )
 
-app.layout = html.Div(children=[sidebar, maindiv], style={'display' : 'flex', 'gap' : '2em'})
+def aggregates():
+    # Payload for the client-side panels, built once per data version
+    data = snapshot
+    return result_cache.get_or_compute(('aggregates', data.version), lambda: aggregate_payload(data.rollup, data.sm_df, data.symptom_index, data.version))
+
+def serve_layout():
+    # Built per page load from the store's metadata alone (platform list and date bounds), so the
+    # page comes up while the data is still loading; the aggregates store is filled by a callback
+    children = [sidebar(), maindiv]
+    if CLIENTSIDE_FILTERING:
+        children.append(dcc.Store(id='aggregates'))
+    return html.Div(children=children, style={'display' : 'flex', 'gap' : '2em'})
+
+app.layout = serve_layout
+
+def aggregates_data(store_id):
+    wait_for_data()
+    reload_if_changed()
+    return aggregates()
+
+if CLIENTSIDE_FILTERING:
+    # Runs once on page load (the store's id never changes)
+    app.callback(Output('aggregates', 'data'), Input('aggregates', 'id'))(instrumented(aggregates_data))
 
 # Account Categories - option handling
 @app.callback(
@@ -75,6 +258,7 @@ app.layout = html.Div(children=[sidebar, maindiv], style={'display' : 'flex', 'g
     [Input("all-or-none-category", "value")],
     [State("account-category", "options")],
 )
+@instrumented
 def select_all_none_category(all_selected, options):
     all_or_none = []
     all_or_none = [option["value"] for option in options if all_selected]
@@ -97,6 +281,7 @@ def select_all_none_category(all_selected, options):
      Output(component_id='relative-date-div', component_property='style')],
     [Input(component_id='time-frame', component_property='value')]
 )
+@instrumented
 def date_options(visibility_state):
     show = {'display': 'block'}
     hide = {'display': 'none'}
@@ -107,48 +292,228 @@ def date_options(visibility_state):
         return show, hide
 
 # Graph + Chart Callback Functions
-@app.callback(
-        # Output("topic-bar-graph", "figure"),
-        Output("engagement", "children"),
-        Output("posts", "children"),
-        Output("tf-idf", "children"),
-        Output("groups-communities", "children"),
-        Output('symptoms', 'children'),
-        Output('news-engagement', 'children'),
-        Output('news-posts', 'children'),
-    
-        # Platform Selection
-        Input("platform-selection", "value"),
-         
-        # Account categories
-        Input("account-category", "value"),
+FILTER_INPUTS = [
+    # Platform Selection
+    Input("platform-selection", "value"),
+
+    # Account categories
+    Input("account-category", "value"),
 
-        # Account identity
-        Input("account-identity", "value"),
+    # Account identity
+    Input("account-identity", "value"),
 
-        # Account type
-        Input("account-type", "value"),
+    # Account type
+    Input("account-type", "value"),
 
-        # Account location
-        Input("account-location", "value"),
+    # Account location
+    Input("account-location", "value"),
 
-        # Time frame values
-        Input("time-frame", "value"),
-        Input("dates-dropdown", "value"),
-        Input("date-range", "start_date"),
-        Input("date-range", "end_date")
+    # Time frame values
+    Input("time-frame", "value"),
+    Input("dates-dropdown", "value"),
+    Input("date-range", "start_date"),
+    Input("date-range", "end_date")
 
-        # Input("com-b-components", "value") - COM-B components for later implementation
-    )
+    # Input("com-b-components", "value") - COM-B components for later implementation
+]
 
-def graphs(platform_list, account_category, account_identity, account_type, account_location, time_frame, relative_date, start_date, end_date):
+# The same sidebar values, read without triggering (for the pagination callbacks)
+FILTER_STATES = [State(filter_input.component_id, filter_input.component_property) for filter_input in FILTER_INPUTS]
+
+def filter_result(data, filters):
     # Filter the dataframe based on the selected platforms and the selected labels
-    result = dataframe_filter(sm_df, weekly_df, symptoms_df, platform_list, account_category, account_identity, account_type, account_location, time_frame, relative_date, start_date, end_date)
-    filtered_df = result[0]
-    start_date = result[1] # Save the start and end dates for x-axis labels
-    end_date = result[2]
+    result = dataframe_filter(data.sm_df, *filters, filter_index=data.filter_index, label_index=data.label_index)
+
+    FILTER_ROWS_IN.inc(len(data.sm_df.index))
+    FILTER_ROWS_OUT.inc(len(result[0].index))
+    FILTER_ROWS.observe(len(result[0].index))
+    return result
+
+def rollup_result(data, filters):
+    # Rollup cube cells for the same selection, for panels that only need aggregates
+    mask = data.rollup.mask(*filters[:5])
+    time_frame, relative_date, start_date, end_date = filters[5:]
+    latest_date = data.rollup.latest_date(mask) if time_frame == 'relative' else None
+    start_date, end_date, start, end = date_window(time_frame, relative_date, start_date, end_date, latest_date)
+    return data.rollup.cells(mask, start, end)
 
-    filtered_df = filtered_df.groupby(['authoredAt', 'platform']).agg({'positive': 'mean', 'negative': 'mean', 'compound': 'mean'}).reset_index()
-    filtered_df['compound_7day'] = filtered_df['compound'].rolling(window=7).mean()
+def keyword_result(data, filters):
+    # Filtered posts with their Hot Topics table, formatted once and shared by the panel and the table's paging callback
+    result = source_result(data, 'filter', filters)
+    return result[0], keyword_table(data.topic_index.weekly_keywords(result[0].index.to_numpy()))
+
+SOURCES = {
+    'filter': filter_result,
+    'rollup': rollup_result,
+    'keywords': keyword_result,
+}
+
+def source_result(data, source, filters):
+    # Cached result of a source for a sidebar state, keyed on the snapshot's version
+    def compute_source():
+        with SOURCE_SECONDS.time(source=source):
+            return SOURCES[source](data, filters)
+
+    return result_cache.get_or_compute((source, data.version) + filter_key(*filters), compute_source)
+
+def panel_output(panel, filters, build, wait=True, source='filter', progress=None):
+    ## Each panel is its own callback (so Dash requests them in parallel and a slow panel no longer
+    ## holds back the others); they share one cached source result per sidebar state.
+    # progress(step) reports how far along the panel is (background panels, see PANEL_STEPS)
+    progress = progress or (lambda step: None)
+    if wait:
+        wait_for_data()
+        reload_if_changed()
+
+    # One snapshot for the whole request, even if a reload swaps in a new one meanwhile
+    data = snapshot
+    key = (data.version,) + filter_key(*filters)
+
+    def build_panel():
+        with PANEL_SECONDS.time(panel='-'.join(panel) if isinstance(panel, tuple) else panel):
+            return build(result, data)
+
+    progress(0)
+    result = source_result(data, source, filters)
+    progress(1)
+    output = result_cache.get_or_compute((panel,) + key, build_panel)
+    progress(2)
+    return output
+
+# Panel builders: (source, builder over that source's result and the snapshot). Aggregate-only
+# panels read the rollup cube, so their cost depends on the cube size rather than the number of posts.
+PANELS = {
+    'engagement': ('rollup', lambda cells, data: engagement_statistics(cells)),
+    'tf-idf': ('keywords', lambda result, data: tf_idf(*result)),
+    'groups-communities': ('filter', lambda result, data: groups_and_communities(result[0])),
+    'news-engagement': ('rollup', lambda cells, data: news_engagement(None, data.rollup.post_counts(data.rollup.news_institutional(cells)))),
+    'news-posts': ('filter', lambda result, data: news_posts(result[0], data.label_index)),
+    'symptoms': ('filter', lambda result, data: symptoms(result[0], data.symptom_index)),
+    'sentiment': ('rollup', lambda cells, data: sentiment_over_time(data.rollup.sentiment_trend(cells))),
+}
+
+# Data behind the paging callbacks of the background panels: {panel: (name, source, builder)}. The
+# panel's job stores it in the job store, so a page change in any worker reads it there instead of
+# filtering the posts again on a request thread.
+PAGE_DATA = {
+    'tf-idf': ('hot-topics-table', 'keywords', lambda result, data: result[1]),
+    'groups-communities': ('groups-communities-posts', 'filter', lambda result, data: group_posts(result[0])[CARD_COLUMNS]),
+    'news-posts': ('news-posts-posts', 'filter', lambda result, data: news_institutional_posts(result[0], data.label_index)[CARD_COLUMNS]),
+}
+
+def page_data_key(name, version, filters):
+    # Name of a sidebar state's paging data in the job store
+    return hashlib.sha1(repr((name, version) + filter_key(*filters)).encode('utf-8')).hexdigest()
+
+def panel(name, filters, set_progress=None):
+    source, build = PANELS[name]
+    progress = (lambda step: set_progress((step, PANEL_STEPS[step]))) if set_progress else None
+    output = panel_output(name, filters, build, source=source, progress=progress)
+    if name in PAGE_DATA:
+        page, page_source, page_build = PAGE_DATA[name]
+        job_manager.store_data(page_data_key(page, snapshot.version, filters), panel_output(page, filters, page_build, source=page_source))
+    return output
+
+def page_data(panel_name, filters):
+    ## Paging data stored by the panel's job, cached in this worker; built here only if it has
+    ## expired from the job store
+    page, source, build = PAGE_DATA[panel_name]
+    wait_for_data()
+    reload_if_changed()
+    data = snapshot
+
+    def read_page_data():
+        value = job_manager.read_data(page_data_key(page, data.version, filters))
+        return build(source_result(data, source, filters), data) if value is None else value
+
+    return result_cache.get_or_compute((page, data.version) + filter_key(*filters), read_page_data)
+
+def background(name):
+    # Options for a background panel callback: its placeholder while running, and its progress bar
+    return {
+        'background': True,
+        'running': [(Output(f'{name}-placeholder', 'style'), {'display': 'block'}, {'display': 'none'}),
+                    (Output(name, 'style'), {'opacity': 0.4}, {'opacity': 1})],
+        'progress': [Output(f'{name}-progress', 'value'), Output(f'{name}-progress', 'label')],
+        'progress_default': [0, PANEL_STEPS[0]],
+        'interval': 500,
+    }
+
+def warm_default_view():
+    # Render every panel for the sidebar's initial state (run right after loading)
+    filters = default_filters()
+    for name, (source, build) in PANELS.items():
+        if CLIENTSIDE_FILTERING and name in CLIENTSIDE_PANELS:
+            continue
+        panel_output(name, filters, build, wait=False, source=source)
+    if CLIENTSIDE_FILTERING:
+        aggregates()
+    panel_output(('posts', 'engagement'), filters, lambda result, data: posts(result[0], data.engagement_index, 'engagement'), wait=False)
+
+def engagement_panel(*filters):
+    return panel('engagement', filters)
+
+@app.callback(Output("posts", "children"), FILTER_INPUTS + [Input("posts-ranking", "value")])
+@instrumented
+def posts_panel(*inputs):
+    filters, ranking = inputs[:-1], inputs[-1]
+    return panel_output(('posts', ranking), filters, lambda result, data: posts(result[0], data.engagement_index, ranking))
+
+@app.callback(Output("tf-idf", "children"), FILTER_INPUTS, **background('tf-idf'))
+@instrumented
+def tf_idf_panel(set_progress, *filters):
+    return panel('tf-idf', filters, set_progress)
+
+# Paging, sorting and filtering the Hot Topics table only sends the visible rows
+@app.callback([Output("table", "data"), Output("table", "page_count")],
+              [Input("table", "page_current"), Input("table", "page_size"), Input("table", "sort_by"), Input("table", "filter_query")],
+              FILTER_STATES, prevent_initial_call=True)
+@instrumented
+def hot_topics_table_page(page_current, page_size, sort_by, filter_query, *filters):
+    table_df = page_data('tf-idf', filters)
+    return keyword_table_page(table_df, page_current or 0, page_size, sort_by, filter_query)
+
+@app.callback(Output("groups-communities", "children"), FILTER_INPUTS, **background('groups-communities'))
+@instrumented
+def groups_and_communities_panel(set_progress, *filters):
+    return panel('groups-communities', filters, set_progress)
+
+# Page changes only rebuild the visible cards from the cached matching posts
+@app.callback(Output("groups-communities-page", "children"), Input("groups-communities-pagination", "active_page"), FILTER_STATES, prevent_initial_call=True)
+@instrumented
+def groups_and_communities_page_panel(active_page, *filters):
+    group_df = page_data('groups-communities', filters)
+    return groups_and_communities_page(group_df, active_page or 1)
+
+def news_engagement_panel(*filters):
+    return panel('news-engagement', filters)
+
+def sentiment_panel(*filters):
+    return panel('sentiment', filters)
+
+@app.callback(Output("news-posts", "children"), FILTER_INPUTS, **background('news-posts'))
+@instrumented
+def news_posts_panel(set_progress, *filters):
+    return panel('news-posts', filters, set_progress)
+
+@app.callback(Output("news-posts-page", "children"), Input("news-posts-pagination", "active_page"), FILTER_STATES, prevent_initial_call=True)
+@instrumented
+def news_posts_page_panel(active_page, *filters):
+    post_count_df = page_data('news-posts', filters)
+    return news_posts_page(post_count_df, active_page or 1)
+
+def symptoms_panel(*filters):
+    return panel('symptoms', filters)
+
+# Aggregate panels are rendered by the server, or in the browser from the aggregates store
+for name, callback in zip(CLIENTSIDE_PANELS, [engagement_panel, news_engagement_panel, sentiment_panel, symptoms_panel]):
+    if CLIENTSIDE_FILTERING:
+        app.clientside_callback(ClientsideFunction(namespace='aggregates', function_name=callback.__name__),
+                                Output(name, "children"), [Input("aggregates", "data")] + FILTER_INPUTS)
+    else:
+        app.callback(Output(name, "children"), FILTER_INPUTS)(instrumented(callback))
 
-    return engagement_statistics(result[0]), posts(result[0]), tf_idf(result[0], result[1]), groups_and_communities(result[0]), symptoms(result[2]), news_engagement(result[0]), news_posts(result[0])
\ No newline at end of file
+if EAGER_STARTUP:
+    start_loading()
+else:
+    threading.Thread(target=start_loading, name='data-loader', daemon=True).start()
@@ -0,0 +1,385 @@
+# Import required libraries
+import contextlib
+import hashlib
+import json
+import os
+import shutil
+import sys
+import time
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+from preprocessing import ENGAGEMENT_COLUMNS, add_engagement_columns, add_follower_columns
+from symptom_index import encode_symptoms
+from rollup import SENTIMENT_COLUMNS, build_rollup, merge_rollup
+from filter_index import FLAG_COLUMNS
+from topic_index import build_term_matrix, text_hashes
+
+## Single data-access module. The notebook's pickles are converted once into Arrow IPC files
+## that every worker opens memory-mapped, so the column buffers live in the shared page cache
+## instead of being unpickled into a private copy per process. The store is built from the command
+## line (python data.py) and updated by ingest.py; serving processes only read it and watch its version.
+## Each build is written to a directory of its own and published by replacing the CURRENT file that
+## names it, so a reader opens every file from one build and never sees a build half written.
+
+PICKLE_FILES = {
+    'posts': 'updated_testing_data.pkl',
+    'keywords': 'keywords.pkl',
+    'weekly': 'weekly_tf_idf.pkl',
+}
+
+# Bit-packed symptom rows aligned with the posts pickle, written by symptom_extraction.py and
+# ingest.py (data straight from the notebook has per-post symptom sets instead)
+SYMPTOM_MATRIX_FILE = 'post_symptoms.npy'
+
+STORE_DIR = 'data_store'
+# Names the build directory being served; its content is the store version
+CURRENT_FILE = 'CURRENT'
+BUILD_PREFIX = 'build-'
+# A temporary build directory this old was left by a build that stopped half way
+STALE_BUILD_SECONDS = 24 * 3600
+POSTS_FILE = 'posts.arrow'
+KEYWORDS_FILE = 'keywords.arrow'
+WEEKLY_FILE = 'weekly.arrow'
+SYMPTOMS_FILE = 'symptoms.npy'
+ROLLUP_FILE = 'rollup.arrow'
+TERMS_FILE = 'terms.arrow'
+TERM_MATRIX_FILES = {'indptr': 'term_indptr.npy', 'indices': 'term_indices.npy', 'data': 'term_counts.npy', 'hashes': 'term_text_hashes.npy'}
+METADATA_FILE = 'metadata.json'
+STORE_FILES = [POSTS_FILE, KEYWORDS_FILE, WEEKLY_FILE, ROLLUP_FILE, SYMPTOMS_FILE, TERMS_FILE] + list(TERM_MATRIX_FILES.values()) + [METADATA_FILE]
+
+# Columns holding Python containers that Arrow cannot store as they are
+LIST_COLUMNS = ['labels', 'topics', 'symptoms']
+JSON_COLUMNS = ['raw', 'sentiment']
+
+# Not stored with the posts: the panels only read the engagement and follower fields of `raw`,
+# which build_store has already extracted into columns, and the symptoms are stored as a matrix
+DROPPED_COLUMNS = ['raw', 'symptoms']
+
+# Not stored with the weekly table: the per-week word -> score dicts, which no panel reads and which
+# Arrow would store as a struct with one field per distinct word
+WEEKLY_DROPPED_COLUMNS = ['tfIdfMatrix']
+
+# Low-cardinality text stored dictionary-encoded and loaded as pandas categoricals
+CATEGORICAL_COLUMNS = ['platform', 'author']
+
+def _store_path(name, store_dir=STORE_DIR, build=None):
+    # File of a build (the one being served by default)
+    return os.path.join(store_dir, build or store_version(store_dir), name)
+
+def _arrow_ready(df):
+    # Sets become sorted lists, missing lists become empty ones, nested dicts become JSON text
+    df = df.copy()
+    for column in LIST_COLUMNS:
+        if column in df.columns:
+            df[column] = [sorted(value) if isinstance(value, (set, frozenset)) else list(value) if isinstance(value, (list, tuple, np.ndarray)) else []
+                          for value in df[column]]
+    for column in JSON_COLUMNS:
+        if column in df.columns:
+            df[column] = [json.dumps(value, default=str) if value is not None else None for value in df[column]]
+    df.columns = [str(column) for column in df.columns]
+    return df
+
+def temporary_path(path):
+    # Per-process name, so workers converting at the same time do not write over each other;
+    # write here, then os.replace onto path so readers never see a half-written file
+    return f'{path}.{os.getpid()}.tmp'
+
+def write_pickle(df, path):
+    df.to_pickle(temporary_path(path))
+    os.replace(temporary_path(path), path)
+
+def text_hash(text):
+    # Short content hash: sentiment scores and symptom tags are reused for unchanged text
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()[:16]
+
+def _write_table(df, path):
+    # Write to a temporary file and rename, so readers never see a half-written file
+    table = pa.Table.from_pandas(_arrow_ready(df), preserve_index=False).combine_chunks()
+    with pa.OSFile(temporary_path(path), 'wb') as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    os.replace(temporary_path(path), path)
+
+def _read_table(path):
+    return pa.ipc.open_file(pa.memory_map(path, 'r')).read_all()
+
+def _column(array):
+    ## Zero-copy pandas column over a memory-mapped Arrow column where the type allows it
+    array = array.combine_chunks() if isinstance(array, pa.ChunkedArray) else array
+    if array.null_count == 0 and (pa.types.is_integer(array.type) or pa.types.is_floating(array.type) or pa.types.is_timestamp(array.type)):
+        return array.to_numpy(zero_copy_only=True)
+    if pa.types.is_dictionary(array.type):
+        # Categorical over the memory-mapped dictionary codes
+        codes = array.indices.fill_null(-1) if array.null_count else array.indices
+        return pd.Categorical.from_codes(_column(codes), categories=array.dictionary.to_pandas())
+    if pa.types.is_integer(array.type) or pa.types.is_floating(array.type) or pa.types.is_timestamp(array.type) or pa.types.is_boolean(array.type):
+        # Numbers with nulls (as NaN / NaT) and bit-packed booleans are copied into numpy
+        return array.to_pandas().to_numpy()
+    # Everything else stays in Arrow buffers, so no column holds Python objects whose reference
+    # counts would dirty the pages shared with the other workers
+    return pd.arrays.ArrowExtensionArray(array)
+
+def _small_frame(table):
+    # The weekly tables are tiny, so they are simply copied into ordinary frames
+    df = table.to_pandas()
+    df.columns = [int(column) if column.isdigit() else column for column in df.columns]
+    return df
+
+def _write_array(array, path):
+    with open(temporary_path(path), 'wb') as array_file:
+        np.save(array_file, array)
+    os.replace(temporary_path(path), path)
+
+def write_symptom_matrix(packed, path=SYMPTOM_MATRIX_FILE):
+    _write_array(np.ascontiguousarray(packed, dtype=np.uint8), path)
+
+def read_symptom_matrix(sm_df, path=SYMPTOM_MATRIX_FILE):
+    ## Bit-packed symptom rows for sm_df: the saved matrix, or the notebook's symptom sets encoded;
+    ## None when the posts have not been tagged
+    if os.path.exists(path):
+        packed = np.load(path)
+        if len(packed) == len(sm_df.index):
+            return packed
+    if 'symptoms' in sm_df.columns:
+        return np.packbits(encode_symptoms(sm_df['symptoms'].to_numpy()).astype(bool), axis=1)
+    return None
+
+def compact_posts(sm_df):
+    ## Posts as stored: without `raw`, with platform and author as categoricals and narrow numeric
+    ## types. Text stays in Arrow string buffers and list columns in Arrow list arrays (offsets
+    ## plus values).
+    posts_df = sm_df.drop(columns=[column for column in DROPPED_COLUMNS if column in sm_df.columns])
+    for column in CATEGORICAL_COLUMNS:
+        if column in posts_df.columns:
+            posts_df[column] = posts_df[column].astype('category')
+
+    # 0/1 flags and engagement counters in the narrowest integer type that holds them
+    for column in FLAG_COLUMNS + ['news', 'engagementRaw', 'comments'] + ENGAGEMENT_COLUMNS:
+        if column in posts_df.columns and pd.api.types.is_integer_dtype(posts_df[column]):
+            posts_df[column] = pd.to_numeric(posts_df[column], downcast='integer')
+    for column in SENTIMENT_COLUMNS:
+        if column in posts_df.columns and pd.api.types.is_float_dtype(posts_df[column]):
+            posts_df[column] = posts_df[column].astype(np.float32)
+    return posts_df
+
+def memory_report(df):
+    ## Bytes held by each column, largest first (Arrow-backed columns count their buffers, which
+    ## for the loaded posts are memory-mapped rather than on the heap)
+    report = pd.DataFrame({'dtype': df.dtypes.astype(str), 'bytes': df.memory_usage(index=False, deep=True)})
+    report['share'] = report['bytes'] / max(report['bytes'].sum(), 1)
+    return report.sort_values('bytes', ascending=False)
+
+def build_store(store_dir=STORE_DIR):
+    ## Convert the notebook's pickles into the columnar store (run after every data refresh)
+    sm_df = pd.read_pickle(PICKLE_FILES['posts']).reset_index(drop=True)
+    # ingest.py adds these as posts arrive; data produced by the notebook still needs them
+    if not set(ENGAGEMENT_COLUMNS + ['comments']).issubset(sm_df.columns):
+        sm_df = add_engagement_columns(sm_df)
+    if 'engagementNormalized' not in sm_df.columns:
+        sm_df = add_follower_columns(sm_df)
+    symptoms = read_symptom_matrix(sm_df)
+    if symptoms is None:
+        raise ValueError(f"The posts in {PICKLE_FILES['posts']} have no symptom tags: run python symptom_extraction.py")
+
+    try:
+        previous = os.path.join(store_dir, store_version(store_dir))
+    except FileNotFoundError:
+        previous = None
+
+    with _new_build(store_dir) as directory:
+        _write_table(compact_posts(sm_df), os.path.join(directory, POSTS_FILE))
+        _write_weekly_tables(pd.read_pickle(PICKLE_FILES['weekly']), pd.read_pickle(PICKLE_FILES['keywords']), directory)
+        _write_table(build_rollup(sm_df), os.path.join(directory, ROLLUP_FILE))
+        _write_array(symptoms, os.path.join(directory, SYMPTOMS_FILE))
+
+        # Document-term matrix behind the filtered hot topics (see topic_index.py)
+        write_term_matrix(sm_df['actualText'].to_numpy(), directory, previous=previous)
+
+        _write_metadata({
+            'rows': len(sm_df.index),
+            'platforms': [str(platform) for platform in sm_df['platform'].unique()],
+            'min_date': sm_df['authoredAt'].min().isoformat(),
+            'max_date': sm_df['authoredAt'].max().isoformat(),
+        }, directory)
+
+def update_store(sm_df, n_new, symptoms, weekly_df, keywords_df, store_dir=STORE_DIR):
+    ## Store update for the last n_new posts of sm_df, appended by ingest.py to the posts the store
+    ## was built from (see store_holds). Their rollup cells, symptom rows and term matrix rows are
+    ## added to those of the build being served, in a new build; only the posts table is converted
+    ## again in full.
+    n_old = len(sm_df.index) - n_new
+    new_df = sm_df.iloc[n_old:]
+    build = store_version(store_dir)
+    metadata = load_metadata(store_dir, build)
+    if metadata['rows'] != n_old:
+        raise ValueError(f"The store holds {metadata['rows']} posts, not the {n_old} the new posts were appended to: run python data.py")
+
+    with _new_build(store_dir) as directory:
+        _write_table(compact_posts(sm_df), os.path.join(directory, POSTS_FILE))
+        _write_weekly_tables(weekly_df, keywords_df, directory)
+        _write_table(merge_rollup(load_rollup(store_dir, build), new_df), os.path.join(directory, ROLLUP_FILE))
+        _write_array(symptoms, os.path.join(directory, SYMPTOMS_FILE))
+        write_term_matrix(sm_df['actualText'].to_numpy(), directory, start=n_old, previous=os.path.join(store_dir, build))
+
+        platforms = metadata['platforms'] + [str(platform) for platform in new_df['platform'].unique() if str(platform) not in metadata['platforms']]
+        _write_metadata({
+            'rows': len(sm_df.index),
+            'platforms': platforms,
+            'min_date': min(metadata['min_date'], new_df['authoredAt'].min()).isoformat(),
+            'max_date': max(metadata['max_date'], new_df['authoredAt'].max()).isoformat(),
+        }, directory)
+
+@contextlib.contextmanager
+def _new_build(store_dir):
+    ## Directory for a new build, written under a temporary name. Once everything in it is written
+    ## it is renamed into place and published; a build that fails is removed instead.
+    build = f'{BUILD_PREFIX}{time.time_ns()}'
+    directory = temporary_path(os.path.join(store_dir, build))
+    os.makedirs(directory)
+    try:
+        yield directory
+    except BaseException:
+        shutil.rmtree(directory, ignore_errors=True)
+        raise
+    _publish(store_dir, build, directory)
+
+def _publish(store_dir, build, directory):
+    # CURRENT is replaced in one step, so readers move from one complete build to the next. The
+    # build it replaces is kept for workers still opening it; older builds are removed (workers
+    # holding them memory-mapped keep reading them until they reload).
+    try:
+        previous = store_version(store_dir)
+    except FileNotFoundError:
+        previous = None
+    os.rename(directory, os.path.join(store_dir, build))
+    current_path = os.path.join(store_dir, CURRENT_FILE)
+    with open(temporary_path(current_path), 'w') as current_file:
+        current_file.write(build)
+    os.replace(temporary_path(current_path), current_path)
+
+    for name in os.listdir(store_dir):
+        path = os.path.join(store_dir, name)
+        if not name.startswith(BUILD_PREFIX) or name in [build, previous]:
+            continue
+        if name.endswith('.tmp') and time.time() - os.path.getmtime(path) < STALE_BUILD_SECONDS:
+            # Another build still being written
+            continue
+        shutil.rmtree(path, ignore_errors=True)
+
+def _write_weekly_tables(weekly_df, keywords_df, directory):
+    _write_table(keywords_df, os.path.join(directory, KEYWORDS_FILE))
+    weekly_df = weekly_df.drop(columns=[column for column in WEEKLY_DROPPED_COLUMNS if column in weekly_df.columns])
+    _write_table(weekly_df, os.path.join(directory, WEEKLY_FILE))
+
+def _write_metadata(metadata, directory):
+    with open(os.path.join(directory, METADATA_FILE), 'w') as metadata_file:
+        json.dump(metadata, metadata_file)
+
+def store_is_stale(store_dir=STORE_DIR):
+    # No build yet, missing files, or older than the pickles it was converted from
+    try:
+        directory = os.path.join(store_dir, store_version(store_dir))
+    except FileNotFoundError:
+        return True
+    pickles = [path for path in list(PICKLE_FILES.values()) + [SYMPTOM_MATRIX_FILE] if os.path.exists(path)]
+    if not all(os.path.exists(os.path.join(directory, name)) for name in STORE_FILES):
+        return True
+    return bool(pickles) and max(os.stat(path).st_mtime_ns for path in pickles) > os.stat(os.path.join(directory, METADATA_FILE)).st_mtime_ns
+
+def store_holds(rows, store_dir=STORE_DIR):
+    # True if the store is up to date with the pickles, which hold `rows` posts (so update_store
+    # can add posts appended after them)
+    return not store_is_stale(store_dir) and load_metadata(store_dir)['rows'] == rows
+
+def refresh_store(store_dir=STORE_DIR):
+    # Rebuild the store when it is missing or out of date (command line only: a serving process
+    # never builds the store)
+    if store_is_stale(store_dir):
+        build_store(store_dir)
+
+def store_version(store_dir=STORE_DIR):
+    # Name of the build being served, read from CURRENT
+    try:
+        with open(os.path.join(store_dir, CURRENT_FILE)) as current_file:
+            return current_file.read().strip()
+    except FileNotFoundError:
+        raise FileNotFoundError(f'No data store in {store_dir}/: build it with python data.py') from None
+
+# The loaders read the build being served, or `build` (a store version) when it is given
+
+def load_metadata(store_dir=STORE_DIR, build=None):
+    with open(_store_path(METADATA_FILE, store_dir, build)) as metadata_file:
+        metadata = json.load(metadata_file)
+    metadata['min_date'] = pd.Timestamp(metadata['min_date'])
+    metadata['max_date'] = pd.Timestamp(metadata['max_date'])
+    return metadata
+
+def load_posts(store_dir=STORE_DIR, build=None):
+    ## sm_df backed by the memory-mapped posts file (numeric columns are read-only views)
+    table = _read_table(_store_path(POSTS_FILE, store_dir, build))
+    return pd.DataFrame({name: _column(table.column(name)) for name in table.column_names}, copy=False)
+
+def load_keywords(store_dir=STORE_DIR, build=None):
+    return _small_frame(_read_table(_store_path(KEYWORDS_FILE, store_dir, build)))
+
+def load_weekly(store_dir=STORE_DIR, build=None):
+    weekly_df = _small_frame(_read_table(_store_path(WEEKLY_FILE, store_dir, build)))
+    if 'symptoms' in weekly_df.columns:
+        weekly_df['symptoms'] = [set(value) for value in weekly_df['symptoms']]
+    return weekly_df
+
+def load_rollup(store_dir=STORE_DIR, build=None):
+    # Daily rollup cube (see rollup.py), memory-mapped like the posts
+    table = _read_table(_store_path(ROLLUP_FILE, store_dir, build))
+    return pd.DataFrame({name: _column(table.column(name)) for name in table.column_names}, copy=False)
+
+def load_symptoms(store_dir=STORE_DIR, build=None):
+    # Bit-packed per-post symptom matrix, memory-mapped like the posts
+    return np.load(_store_path(SYMPTOMS_FILE, store_dir, build), mmap_mode='r')
+
+def write_term_matrix(texts, directory, start=None, previous=None):
+    # Writes the matrix into a build directory, tokenizing only the posts the matrix of the previous
+    # build does not have: its rows are reused when their texts are unchanged and new posts were only
+    # appended (a full build otherwise). `start` is the number of leading texts known to be
+    # unchanged, which then are not hashed again.
+    stored, matrix = np.zeros(0, dtype=np.uint64), None
+    if previous is not None:
+        try:
+            stored, matrix = np.load(os.path.join(previous, TERM_MATRIX_FILES['hashes'])), _read_term_matrix(previous)
+        except FileNotFoundError:
+            pass
+    if start is not None and len(stored) == start:
+        hashes = np.concatenate([stored, text_hashes(texts[start:])])
+    else:
+        hashes = text_hashes(texts)
+
+    reused = None
+    if matrix is not None and len(stored) == len(matrix[0]) - 1 <= len(hashes) and np.array_equal(stored, hashes[:len(stored)]):
+        indptr, indices, data, terms = matrix
+        reused = (indptr, indices, data, list(terms))
+
+    indptr, indices, data, terms = build_term_matrix(texts, reused)
+    for name, array in zip(['indptr', 'indices', 'data', 'hashes'], [indptr, indices, data, hashes]):
+        _write_array(array, os.path.join(directory, TERM_MATRIX_FILES[name]))
+    _write_table(pd.DataFrame({'term': terms}, dtype=object), os.path.join(directory, TERMS_FILE))
+
+def _read_term_matrix(directory):
+    arrays = [np.load(os.path.join(directory, TERM_MATRIX_FILES[name]), mmap_mode='r') for name in ['indptr', 'indices', 'data']]
+    terms = _column(_read_table(os.path.join(directory, TERMS_FILE)).column('term'))
+    return (*arrays, terms)
+
+def load_term_matrix(store_dir=STORE_DIR, build=None):
+    # (indptr, indices, data, terms) of the CSR document-term matrix, memory-mapped
+    return _read_term_matrix(os.path.join(store_dir, build or store_version(store_dir)))
+
+if __name__ == '__main__':
+    # python data.py           convert the pickles into the store (rebuilds it unconditionally)
+    # python data.py report    memory used by each column of the loaded posts
+    if sys.argv[1:] == ['report']:
+        refresh_store()
+        report = memory_report(load_posts())
+        print(report.to_string(formatters={'bytes': '{:,}'.format, 'share': '{:.1%}'.format}))
+        print(f"{report['bytes'].sum():,} bytes in total")
+    else:
+        build_store()
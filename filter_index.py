@@ -0,0 +1,85 @@
+# Import required libraries
+import numpy as np
+import pandas as pd
+
+# One-hot label columns the sidebar can filter on
+FLAG_COLUMNS = ['government', 'media', 'faith', 'health', 'covid', 'misinfo', 'partners', 'trusted',
+                'blackafam', 'latinx', 'institutional', 'georgia']
+
+class FilterIndex:
+    ## Packed boolean masks over sm_df rows, built once at load so any sidebar selection
+    ## resolves to one AND of masks plus a single take of the matching rows.
+    def __init__(self, sm_df):
+        self.n_rows = len(sm_df.index)
+
+        # Platform masks
+        self.platforms = {}
+        platform_values = sm_df['platform'].to_numpy()
+        for platform in pd.unique(platform_values):
+            self.platforms[platform] = np.packbits(platform_values == platform)
+
+        # Account category, identity, type and location masks
+        self.flags = {}
+        for column in FLAG_COLUMNS:
+            if column in sm_df.columns:
+                self.flags[column] = np.packbits(sm_df[column].to_numpy() == 1)
+
+        # Date-sorted row order so that date bounds become searchsorted slices
+        self.dates = sm_df['authoredAt'].to_numpy(dtype='datetime64[ns]')
+        self.date_order = np.argsort(self.dates, kind='stable')
+        self.sorted_dates = self.dates[self.date_order]
+
+        self.everything = np.packbits(np.ones(self.n_rows, dtype=bool))
+        self.nothing = np.packbits(np.zeros(self.n_rows, dtype=bool))
+
+    def flag(self, column):
+        # Labels that never occur in the data have no column, so nothing matches them
+        return self.flags.get(column, self.nothing)
+
+    def mask(self, platform_list, account_category, account_identity, account_type, account_location):
+        # Platform Selection
+        packed = self.nothing
+        for platform in platform_list:
+            if platform in self.platforms:
+                packed = packed | self.platforms[platform]
+
+        # Account Category
+        for account in account_category:
+            packed = packed & self.flag(account)
+
+        # Account Identity
+        if account_identity != 'all':
+            packed = packed & self.flag(account_identity)
+
+        # Account Type
+        if account_type != 'all':
+            if account_type == 'institutional':
+                packed = packed & self.flag('institutional')
+            else:
+                packed = packed & ~self.flag('institutional')
+
+        # Acccount Location
+        if account_location != 'all':
+            if account_location == 'georgia':
+                packed = packed & self.flag('georgia')
+            else:
+                packed = packed & ~self.flag('georgia')
+
+        return np.unpackbits(packed, count=self.n_rows).view(bool)
+
+    def latest_date(self, mask):
+        # Latest authoredAt among the selected rows (NaT when nothing is selected)
+        if not mask.any():
+            return pd.NaT
+        return pd.Timestamp(self.dates[mask].max())
+
+    def rows(self, mask, start=None, end=None):
+        ## Positions of the selected rows with start <= authoredAt < end, in original row order
+        if start is None and end is None:
+            return np.flatnonzero(mask)
+
+        low = 0 if start is None else np.searchsorted(self.sorted_dates, np.datetime64(start, 'ns'), side='left')
+        high = self.n_rows if end is None else np.searchsorted(self.sorted_dates, np.datetime64(end, 'ns'), side='left')
+
+        candidates = np.sort(self.date_order[low:high])
+        return candidates[mask[candidates]]
@@ -1,6 +1,7 @@
 # Import required libraries
 import numpy as np
 import ast, json
+import operator
 from datetime import datetime, timedelta
 import dash_bootstrap_components as dbc
 from dash import html, dcc
@@ -9,82 +10,68 @@ import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 from dash import dash_table
-import re
+from preprocessing import ENGAGEMENT_COLUMNS, INTERESTING_AUTHORS
+from keyword_matcher import keyword_matcher
+from ranking import RANKINGS
+from label_index import NEWS_LABELS
+
+# Post carousels are paged on the server; only one page of cards is sent per response
+POSTS_PER_PAGE = 10
+
+# The columns a post card shows (see groups_and_communities_page and news_posts_page)
+CARD_COLUMNS = ['platform', 'author', 'url', 'authoredAt', 'content']
+
+def page_count(total_posts):
+    return max(1, -(-total_posts // POSTS_PER_PAGE))
+
+def news_institutional_posts(sm_df, label_index=None):
+    if label_index is not None:
+        # Rows of sm_df are positions in the frame the index was built on (see dataframe_filter)
+        return sm_df[label_index.mask(NEWS_LABELS)[sm_df.index.to_numpy()]]
+    return sm_df[sm_df['labels'].apply(lambda x: any(label in x for label in NEWS_LABELS))]
+
+def post_counts(df):
+    # Rollup cells (see rollup.py) carry a post count per row; plain posts count one each
+    return df['posts'] if 'posts' in df.columns else pd.Series(1, index=df.index)
 
 def engagement_statistics(filtered_df):
-    total_posts = len(filtered_df.index)
-    total_reactions = sum(filtered_df['engagementRaw'])
+    ## Accepts either the filtered posts or the matching rollup cells
+    counts = post_counts(filtered_df)
+    total_posts = int(counts.sum())
+    total_reactions = int(filtered_df['engagementRaw'].sum())
     platformList = list(filtered_df['platform'].unique())
 
     # Calculate start and end dates for the past week
     end_date = filtered_df['authoredAt'].max()
     start_date = end_date - timedelta(days=7)
+    past_week = (filtered_df['authoredAt'] >= start_date) & (filtered_df['authoredAt'] <= end_date)
 
-    # Calculate total posts and total reactions for the past week
-    week_posts = 0
-    week_reactions = 0
-    week_comments = 0
-    total_comments = 0
-
-    facebookLikeCount = 0
-    facebookShareCount = 0
-    facebookCommentCount = 0
-    facebookWowCount = 0
-    facebookHahaCount = 0
-    facebookSadCount = 0
-    facebookLoveCount = 0
-    facebookAngryCount = 0
-    facebookThankfulCount = 0
-    facebookCareCount = 0
-
-    instagramFavoriteCount = 0
-    instagramCommentCount = 0
-
-    twitterRetweets = 0
-    twitterReplies = 0
-    twitterLikes = 0
-    twitterQuoteCount = 0
-                
-    for index, row in filtered_df.iterrows():
-        post_time = row['authoredAt']
-        if start_date <= post_time <= end_date:
-            week_posts += 1
-            week_reactions += row['engagementRaw']
-
-        if row['platform'] == 'twitter':
-            post = row['raw']
-            twitterRetweets += post['retweets']
-            twitterReplies += post['replies']
-            twitterLikes += post['likes']
-            twitterQuoteCount += post['quote_count']
-
-            if start_date <= post_time <= end_date:
-                week_comments += post['replies']
-
-
-        elif row['platform'] == 'facebook':
-            post = row['raw']['statistics']['actual']
-            facebookLikeCount += post['likeCount']
-            facebookShareCount += post['shareCount']
-            facebookCommentCount += post['commentCount']
-            facebookLoveCount += post['loveCount']
-            facebookWowCount += post['wowCount']
-            facebookHahaCount += post['hahaCount']
-            facebookSadCount += post['sadCount']
-            facebookAngryCount += post['angryCount']
-            facebookThankfulCount += post['thankfulCount']
-            facebookCareCount += post['careCount']
-
-            if start_date <= post_time <= end_date:
-                week_comments += post['commentCount']
+    # Sum the flattened engagement columns (see preprocessing.add_engagement_columns)
+    totals = filtered_df[ENGAGEMENT_COLUMNS].sum()
 
-        else:
-            post = row['raw']['statistics']['actual']
-            instagramFavoriteCount += post['favoriteCount']
-            instagramCommentCount += post['commentCount']
-
-            if start_date <= post_time <= end_date:
-                week_comments += post['commentCount']
+    # Calculate total posts and total reactions for the past week
+    week_posts = int(counts[past_week].sum())
+    week_reactions = int(filtered_df.loc[past_week, 'engagementRaw'].sum())
+    week_comments = int(filtered_df.loc[past_week, 'comments'].sum())
+
+    facebookLikeCount = int(totals['fb_like'])
+    facebookShareCount = int(totals['fb_share'])
+    facebookCommentCount = int(totals['fb_comment'])
+    facebookWowCount = int(totals['fb_wow'])
+    facebookHahaCount = int(totals['fb_haha'])
+    facebookSadCount = int(totals['fb_sad'])
+    facebookLoveCount = int(totals['fb_love'])
+    facebookAngryCount = int(totals['fb_angry'])
+    facebookThankfulCount = int(totals['fb_thankful'])
+    facebookCareCount = int(totals['fb_care'])
+
+    instagramFavoriteCount = int(totals['ig_favorite'])
+    instagramCommentCount = int(totals['ig_comment'])
+
+    twitterRetweets = int(totals['tw_retweets'])
+    twitterReplies = int(totals['tw_replies'])
+    twitterLikes = int(totals['tw_likes'])
+    twitterQuoteCount = int(totals['tw_quote_count'])
 
     total_comments = instagramCommentCount + facebookCommentCount + twitterReplies
 
@@ -150,9 +137,14 @@ def engagement_statistics(filtered_df):
         style={'marginRight' : '1em'}
     )
 
-def posts(sm_df):
+def posts(sm_df, engagement_index=None, ranking='engagement'):
     posts = []
-    filtered_df = sm_df.sort_values(by='engagementRaw', ascending=False).head(20).reset_index()
+    if engagement_index is not None:
+        # Rows of sm_df are positions in the frame the index was built on (see dataframe_filter)
+        top_rows = engagement_index.top_k(sm_df.index.to_numpy(), 20, ranking)
+        filtered_df = sm_df.loc[top_rows].reset_index()
+    else:
+        filtered_df = sm_df.sort_values(by=RANKINGS.get(ranking, 'engagementRaw'), ascending=False).head(20).reset_index()
 
     for index, row in filtered_df.iterrows():
         post_children = []
@@ -162,18 +154,19 @@ def posts(sm_df):
         post_children.append(html.A('Link to Post', href=row['url']))
         post_children.append(html.H6(row['authoredAt'].date()))
 
+        # Counters come from the flattened engagement columns (see preprocessing.add_engagement_columns)
         if row['platform'] == 'instagram':
-            favorites = row['raw']['statistics']['actual']['favoriteCount']
-            comments = row['raw']['statistics']['actual']['commentCount']
+            favorites = int(row['ig_favorite'])
+            comments = int(row['ig_comment'])
             post_children.append(html.P('❤️' + f'{favorites:,} ' + ' | ' + '💬' + f'{comments:,} '))
         elif row['platform'] == 'twitter':
-            likes = row['raw']['likes']
-            replies = row['raw']['replies']
-            retweets = row['raw']['retweets']
+            likes = int(row['tw_likes'])
+            replies = int(row['tw_replies'])
+            retweets = int(row['tw_retweets'])
             post_children.append(html.P('🔄' +f'{retweets:,} ' + ' | ' + '👍' + f'{likes:,} ' + ' | ' + '💬' + f'{replies:,} ' + '|'))
         else:
-            likes = row['raw']['statistics']['actual']['likeCount']
-            comments = row['raw']['statistics']['actual']['commentCount']
+            likes = int(row['fb_like'])
+            comments = int(row['fb_comment'])
             post_children.append(html.P('👍' + f'{likes:,}' + ' | ' + '💬' +f'{comments:,} '))
 
         post_children.append(html.P(row['content']))
@@ -184,44 +177,112 @@ def posts(sm_df):
     return html.Div(id='posts', children=posts, style={'display': 'flex', 'maxWidth': '100vw', 
                                                        'overflowX': 'auto'})
 
-def tf_idf(sm_df, weekly_df):
-    keywords = []
-
-    # Assuming 'weekly_df' is your DataFrame containing keywords
-    for column in weekly_df.columns:
-        for index, value in weekly_df[column].items():
-            if isinstance(value, str) and any(char.isalpha() for char in value):
-                keywords.append(value)
+# The Hot Topics table is paged, sorted and filtered on the server (see keyword_table_page)
+KEYWORD_TABLE_PAGE_SIZE = 10
+
+# Related Posts are scanned in blocks of this many rows; only a block's text is read out of Arrow
+RELATED_POSTS = 50
+SCAN_BLOCK_ROWS = 512
+WEEK_COLUMN = 'Week Authored'
+
+# Operators of the DataTable filter query, longest spelling first
+FILTER_OPERATORS = [['ge ', '>='], ['le ', '<='], ['lt ', '<'], ['gt ', '>'], ['ne ', '!='], ['eq ', '='],
+                    ['contains '], ['datestartswith ']]
+COMPARISONS = {'ge': operator.ge, 'le': operator.le, 'lt': operator.lt, 'gt': operator.gt, 'ne': operator.ne, 'eq': operator.eq}
+
+def keyword_table(weekly_df):
+    ## Display frame of the Hot Topics table (columns renamed, weeks formatted), built once per
+    ## filter result and dataset version and then paged from the result cache
+    table_df = weekly_df.copy()
+    table_df.columns = [WEEK_COLUMN] + [f'{i}' for i in range(1, len(weekly_df.columns))]
+    table_df[WEEK_COLUMN] = pd.to_datetime(table_df[WEEK_COLUMN]).dt.strftime('%m/%d/%Y')
+    return table_df
+
+def split_filter_part(filter_part):
+    # '{column} operator value' -> (column, operator, value)
+    name, closing, expression = filter_part.strip().lstrip('{').partition('} ')
+    for operator_type in FILTER_OPERATORS:
+        for spelling in operator_type:
+            if closing and expression.startswith(spelling):
+                value = expression[len(spelling):].strip()
+                if len(value) > 1 and value[0] == value[-1] and value[0] in ('\'', '"', '`'):
+                    value = value[1:-1].replace('\\' + value[0], value[0])
+                return name, operator_type[0].strip(), value
+    return None, None, None
+
+def _week_dates(values):
+    return pd.to_datetime(values, format='%m/%d/%Y', errors='coerce')
+
+def _sort_key(values):
+    # Weeks sort by date rather than by their mm/dd/yyyy text; keywords case-insensitively
+    return _week_dates(values) if values.name == WEEK_COLUMN else values.str.lower()
+
+def keyword_table_page(table_df, page_current=0, page_size=KEYWORD_TABLE_PAGE_SIZE, sort_by=None, filter_query=''):
+    ## One page of the filtered and sorted table: (records, page count)
+    rows = table_df
+    for filter_part in (filter_query or '').split(' && '):
+        column, comparison, value = split_filter_part(filter_part)
+        if column not in rows.columns:
+            continue
+        values = rows[column].fillna('')
+        if comparison == 'contains':
+            rows = rows[values.str.contains(value, case=False, regex=False)]
+        elif comparison == 'datestartswith':
+            rows = rows[values.str.startswith(value)]
+        elif column == WEEK_COLUMN:
+            date = pd.to_datetime(value, errors='coerce')
+            if not pd.isna(date):
+                rows = rows[COMPARISONS[comparison](_week_dates(values), date).to_numpy()]
+        else:
+            rows = rows[COMPARISONS[comparison](values.str.lower(), value.lower())]
 
-    # Escape special characters in keywords
-    escaped_keywords = [re.escape(keyword) for keyword in keywords]
+    sort_by = [column for column in (sort_by or []) if column['column_id'] in rows.columns]
+    if sort_by:
+        rows = rows.sort_values([column['column_id'] for column in sort_by], key=_sort_key, kind='mergesort',
+                                ascending=[column['direction'] == 'asc' for column in sort_by])
 
-    # Create regex pattern to match any of the keywords
-    pattern = '|'.join(escaped_keywords)
+    page_count = max(1, -(-len(rows.index) // page_size))
+    page_current = min(page_current, page_count - 1)
+    return rows.iloc[page_current * page_size:(page_current + 1) * page_size].to_dict('records'), page_count
 
-    # Filter sm_df based on keywords
-    filtered_df = sm_df[sm_df['actualText'].str.contains(pattern)].reset_index(drop=True)
+def tf_idf(sm_df, table_df):
+    keywords = []
 
-   # Convert to datetime
-    weekly_df['weekAuthored'] = pd.to_datetime(weekly_df['weekAuthored'])
+    # Assuming 'table_df' is your DataFrame containing keywords (see keyword_table)
+    for column in table_df.columns[1:]:
+        for index, value in table_df[column].items():
+            if isinstance(value, str) and any(char.isalpha() for char in value):
+                keywords.append(value)
 
-    # Extract date
-    weekly_df = weekly_df.rename(columns={'weekAuthored' : 'Week Authored'})
+    # Matcher over the weekly keyword set (built once per set and cached)
+    matcher = keyword_matcher(tuple(sorted(set(keywords))))
 
     authors_to_remove = ['Survivor Corps', 'COVID-19 Long Haulers Support', 'A Voice for Choice']
-    filtered_df = filtered_df[~filtered_df['author'].isin(authors_to_remove)]
-
-    filtered_df = filtered_df.head(50)
+    eligible_rows = np.flatnonzero(~sm_df['author'].isin(authors_to_remove).to_numpy())
+
+    # Scan posts in order and stop as soon as the 50 displayed posts have been found, converting
+    # the text of one block of candidate rows at a time rather than the whole column
+    texts = sm_df['actualText']
+    matches = []
+    for low in range(0, len(eligible_rows), SCAN_BLOCK_ROWS):
+        block = eligible_rows[low:low + SCAN_BLOCK_ROWS]
+        for position, hits in matcher.search(texts.take(block).to_numpy(), limit=RELATED_POSTS - len(matches)):
+            matches.append((block[position], hits))
+        if len(matches) >= RELATED_POSTS:
+            break
+    filtered_df = sm_df.iloc[[row for row, hits in matches]]
+    matched_keywords = [hits for row, hits in matches]
 
     posts = []
 
-    for index, row in filtered_df.iterrows():
+    for (index, row), hits in zip(filtered_df.iterrows(), matched_keywords):
         post_children = []
         post_children.append(html.Br())
         post_children.append(html.H5(row['platform'].title(), style={'fontWeight': 'bold'}))
         post_children.append(html.H6('Author: ' + row['author']))
         post_children.append(html.A('Link to Post', href=row['url']))
         post_children.append(html.H6(row['authoredAt'].date()))
+        post_children.append(html.P('Keywords: ' + ', '.join(hits), style={'fontStyle': 'italic'}))
         post_children.append(html.P(row['content']))
 
         posts.append(html.Div(children=post_children, style={'border': '1px solid black', 'height': '25em', 'maxWidth': '30em', 
@@ -230,10 +291,10 @@ def tf_idf(sm_df, weekly_df):
     all_children = []
 
     all_children.append(html.H4('Hot Topics 🔥', style={'fontStyle': 'italic'}))
-    all_children.append(html.P('A list of the top 20 keywords mentioned in posts across all platforms over a 1-week time frame.'))
+    all_children.append(html.P('A list of the top 20 keywords mentioned in the selected posts over a 1-week time frame.'))
 
-    weekly_df.columns = ['Week Authored'] + [f'{i}' for i in range(1, len(weekly_df.columns))]
-    weekly_df['Week Authored'] = weekly_df['Week Authored'].dt.strftime('%m/%d/%Y')
+    # Only the first page is sent with the panel; the table asks for other pages, sorts and filters
+    data, table_page_count = keyword_table_page(table_df)
 
     all_children.append(html.Div(
             id='tf-idf-graph',
@@ -241,8 +302,17 @@ def tf_idf(sm_df, weekly_df):
             children=[
                 dash_table.DataTable(
                     id='table',
-                    columns=[{'name': str(col), 'id': str(col)} for col in weekly_df.columns],
-                    data=weekly_df.to_dict('records'),
+                    columns=[{'name': str(col), 'id': str(col)} for col in table_df.columns],
+                    data=data,
+                    page_action='custom',
+                    page_current=0,
+                    page_size=KEYWORD_TABLE_PAGE_SIZE,
+                    page_count=table_page_count,
+                    sort_action='custom',
+                    sort_mode='multi',
+                    sort_by=[],
+                    filter_action='custom',
+                    filter_query='',
                     style_table={'overflowX': 'auto', 'overflowY': 'auto', 'width': '100%'},  # Set table width to 100%
                     style_cell={
                         'whiteSpace': 'normal',
@@ -263,27 +333,14 @@ def tf_idf(sm_df, weekly_df):
     
     return html.Div(id='tf-idf', children = all_children)
 
-def groups_and_communities(sm_df):
-    interesting_authors = ['COVID-19 Long Haulers Support', 'Survivor Corps', 
-                           'Vaccines save lives', 'COVID-19 Novel Coronavirus FACTS', 
-                           '¡MÉDICOS POR LA VERDAD!', 'Black News Network (BNN)', 
-                           'COVID19: Real Talk from Health Care Workers around the Globe', 
-                           'Black Educators', 'Covid Wellness Clinic', 
-                           'Coronavirus Updates for: Statesboro, Georgia & Surrounding Counties', 
-                           'Athens GA COVID-19 Resources and Discussion', 'Georgia Trump Republicans', 
-                           "Skip Mason's Vanishing Black Atlanta History", 'DeKalb Strong', 
-                           'COVID-19 Watch North GA w/ Help & Resources', 
-                           'Albany, GA Area Happenings Over 21', 'Albany GA: Home Is Where The Heart Is', 
-                           'Type 1 Diabetes Recipes & Food Ideas', 
-                           'Kimono My House (Virtual House Concerts)', 'Dank Diabetes Memes Diabuddies', 
-                           'America First Tea Party', 'The Prayer Wall', 'TERMINÓ 🧑\u200d🦽🧑\u200d🦽🧑\u200d🦽🧑\u200d🦽', 
-                           'Coronavirus Updates from NBC News']
-
-    sm_df = sm_df[sm_df['author'].isin(interesting_authors)]
+def group_posts(sm_df):
+    return sm_df[sm_df['author'].isin(INTERESTING_AUTHORS)]
 
+def groups_and_communities_page(group_df, page=1):
+    ## Cards for one page of group posts; only the visible page is sent to the browser
     posts = []
 
-    for index, row in sm_df.iterrows():
+    for index, row in group_df.iloc[(page - 1) * POSTS_PER_PAGE:page * POSTS_PER_PAGE].iterrows():
         post_children = []
         post_children.append(html.Br())
         post_children.append(html.H5(row['platform'].title(), style={'fontWeight': 'bold'}))
@@ -294,89 +351,26 @@ def groups_and_communities(sm_df):
 
         posts.append(html.Div(children=post_children, style={'border': '1px solid black', 'height': '25em', 
                                             'minWidth': '20em', 'maxWidth': '30em', 'overflow': 'auto', 'margin': '1em', 'overflow':'scroll'}))
-    
+
+    return posts
+
+def groups_and_communities(sm_df):
+    group_df = group_posts(sm_df)
+    total_posts = len(group_df.index)
+
     all_children = []
     all_children.append(html.H4(children='Groups and Communities', style={"textAlign":"left", 'fontStyle' : 'italic'}))
     all_children.append(html.P(children='A collection of posts from various Facebook Groups.', style={'textAlign': 'left'}))
-    all_children.append(html.Div(children=posts, style={'width': '50vw', 'overflow': 'auto', 'display' : 'flex'}))
+    all_children.append(html.Div(id='groups-communities-page', children=groups_and_communities_page(group_df), style={'width': '50vw', 'overflow': 'auto', 'display' : 'flex'}))
+    all_children.append(html.Div(children=[html.P(f'{total_posts:,} Posts'),
+                                           dbc.Pagination(id='groups-communities-pagination', max_value=page_count(total_posts), active_page=1, fully_expanded=False)],
+                                 style={'display': 'flex', 'gap': '1em', 'alignItems': 'baseline'}))
 
     return html.Div(id='groups-communities', children = all_children, style={'justifyContent' : 'left'})
 
-def symptoms(weekly_df):
-    grouped_symptoms = {
-        "fever": 0,
-        "headache": 0,
-        "cough": 0,
-        "shortness_of_breath": 0,
-        "fatigue": 0,
-        "sore_throat": 0,
-        "congestion": 0,
-        "muscle_aches": 0,
-        "nausea_vomiting": 0,
-        "diarrhea": 0,
-        "chills": 0,
-        "chest_head_pressure": 0,
-        "pink_eye": 0,
-        "rash": 0,
-        "dizziness": 0,
-        "seizures": 0,
-        "confusion": 0,
-        "abdominal_pain": 0,
-        "loss_of_appetite": 0,
-        "muscle_joint_pain": 0,
-        "difficulty_sleeping": 0,
-        "feeling_disoriented": 0,
-        "numbness_tingling": 0,
-        "chest_pain": 0,
-        "swelling_edema": 0,
-        "bruising": 0,
-        "loss_of_coordination": 0,
-        "difficulty_speaking": 0,
-        "frequent_urination": 0,
-        "blood_in_urine": 0,
-        "skin_discoloration": 0,
-        "decreased_urination": 0,
-        "swollen_glands": 0,
-        "hair_loss": 0,
-        "chapped_lips": 0,
-        "puffy_eyes": 0,
-        "weight_gain": 0,
-        "hoarse_voice": 0,
-        "mood_changes": 0,
-        "cognitive_issues": 0,
-        "leg_swelling": 0,
-        "hair_thinning": 0,
-        "dry_skin": 0,
-        "weakness": 0,
-        "tremors": 0,
-        "depression": 0,
-        "anxiety": 0,
-        "irritability": 0,
-        "insomnia": 0,
-        "feeling_cold": 0,
-        "feeling_hot": 0,
-        "difficulty_breathing": 0,
-        "chest_tightness": 0,
-        "palpitations": 0,
-        "lightheadedness": 0,
-        "severe_headache": 0,
-        "stroke_heart_attack": 0,
-        "vision_loss": 0,
-        "paralysis": 0,
-        "aphasia": 0,
-        "weakness_in_arms": 0,
-        "weakness_in_legs": 0,
-        "facial_droop": 0,
-        "slurred_speech": 0,
-        "difficulty_swallowing": 0,
-        "decreased_sense_of_smell": 0,
-        "decreased_sense_of_taste": 0
-    }
-
-    for index, row in weekly_df.iterrows():
-        symptom_set = row['symptoms']
-        for symptom in symptom_set:
-            grouped_symptoms[symptom] += 1
+def symptoms(sm_df, symptom_index):
+    # Rows of sm_df are positions in the frame the index was built on (see dataframe_filter)
+    grouped_symptoms = symptom_index.weeks_observed(sm_df.index.to_numpy())
 
     symptom_df = pd.DataFrame(grouped_symptoms.items(), columns=['symptom', 'count']).sort_values(by='count', ascending=False)
 
@@ -410,27 +404,20 @@ def symptoms(weekly_df):
         style={'marginRight' : '5em'}
     )
 
-def news_engagement(sm_df):
-
+def news_engagement(sm_df, post_count=None):
     ## TO-DO: Questions about COVID; reactions to news posts, topic analysis -- informational news and institutional posts
-
-   # Drop NaN values from the 'labels' column
-    sm_df.dropna(subset=['labels'], inplace=True)
-
-    # Convert NaN values to empty string in the 'labels' column
-    sm_df['labels'].fillna('', inplace=True)
-
-def news_engagement(sm_df):
+    ## post_count: posts per day when already aggregated (see Rollup.post_counts)
     all_children = []
 
     all_children.append(html.H4(children='News and Institutions', style={"textAlign":"left", 'fontStyle' : 'italic'}))
     all_children.append(html.P(children="'Viral' News Cycles: recording post trends from news and institutional accounts.", style={'textAlign': 'left'}))
 
-    # Filter the DataFrame
-    post_count_df = sm_df[sm_df['labels'].apply(lambda x: 'news' in x or 'institutional' in x)]
+    if post_count is None:
+        # Filter the DataFrame
+        post_count_df = news_institutional_posts(sm_df)
 
-    # Calculate post counts
-    post_count = post_count_df.groupby('authoredAt').size()
+        # Calculate post counts
+        post_count = post_count_df.groupby('authoredAt').size()
 
     figure = px.line(x=post_count.index, y=post_count.values,
                         title='News + Institutional Posts Over Time', 
@@ -454,13 +441,39 @@ def news_engagement(sm_df):
     return html.Div(id='news-engagement', children=all_children, style={'width': '45vw'})
 
 
-def news_posts(sm_df):
+def sentiment_over_time(trend_df):
+    ## trend_df: daily and rolling mean compound sentiment by platform (see Rollup.sentiment_trend)
     all_children = []
 
-    post_count_df = sm_df[sm_df['labels'].apply(lambda x: 'news' in x or 'institutional' in x)]
+    all_children.append(html.H4(children='Sentiment Over Time', style={"textAlign":"left", 'fontStyle' : 'italic'}))
+    all_children.append(html.P(children="Average compound sentiment of posts on each platform, from -1 (most negative) to 1 (most positive).", style={'textAlign': 'left'}))
+
+    figure = go.Figure()
+    for platform, platform_df in trend_df.groupby('platform'):
+        figure.add_trace(go.Scatter(x=platform_df['authoredAt'], y=platform_df['compound_7day'], mode='lines',
+                                    name=f'{platform.title()} (7-day)'))
+        figure.add_trace(go.Scatter(x=platform_df['authoredAt'], y=platform_df['compound_30day'], mode='lines',
+                                    name=f'{platform.title()} (30-day)', line={'dash': 'dot'}))
+
+    figure.update_layout(
+        title='Rolling Average Sentiment',
+        xaxis_title='Date',
+        yaxis_title='Compound Sentiment',
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
+        font_family='Open Sans',
+        font_color='black',
+        title_x=0.5
+    )
+
+    all_children.append(html.Div(children=dcc.Graph(figure=figure), style={'border' : '1px solid black'}))
+
+    return html.Div(id='sentiment', children=all_children, style={'width': '45vw'})
+
+def news_posts_page(post_count_df, page=1):
+    ## Cards for one page of news and institutional posts
     posts = []
 
-    for index, row in post_count_df.iterrows():
+    for index, row in post_count_df.iloc[(page - 1) * POSTS_PER_PAGE:page * POSTS_PER_PAGE].iterrows():
         post_children = []
         post_children.append(html.Br())
         post_children.append(html.H5(row['platform'].title(), style={'fontWeight': 'bold'}))
@@ -471,10 +484,20 @@ def news_posts(sm_df):
 
         posts.append(html.Div(children=post_children, style={'border': '1px solid black', 'height': '25em', 
                                             'minWidth': '20em', 'maxWidth': '30em', 'overflow': 'auto', 'marginLeft': '1em', 'marginRight' : '1em', 'overflow':'scroll'}))
-    
+
+    return posts
+
+def news_posts(sm_df, label_index=None):
+    all_children = []
+
+    post_count_df = news_institutional_posts(sm_df, label_index)
+    total_posts = len(post_count_df.index)
+
     all_children.append(html.Br())
     all_children.append(html.P(children="Informational News + Institutional posts across all platforms.", style={'textAlign': 'left'}))
-    all_children.append(html.Div(children=posts, style={'maxWidth': '80vw', 'overflowX': 'auto', 'display' : 'flex'}))
+    all_children.append(html.Div(id='news-posts-page', children=news_posts_page(post_count_df), style={'maxWidth': '80vw', 'overflowX': 'auto', 'display' : 'flex'}))
+    all_children.append(html.Div(children=[html.P(f'{total_posts:,} Posts'),
+                                           dbc.Pagination(id='news-posts-pagination', max_value=page_count(total_posts), active_page=1, fully_expanded=False)],
+                                 style={'display': 'flex', 'gap': '1em', 'alignItems': 'baseline', 'marginLeft': '1em'}))
 
     return html.Div(id='news-posts', children = all_children, style={'justifyContent' : 'left'})
-
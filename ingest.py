@@ -0,0 +1,202 @@
+# Import required libraries
+import hashlib
+import json
+import math
+import sys
+import numpy as np
+import pandas as pd
+import nltk
+from data import PICKLE_FILES, build_store, read_symptom_matrix, store_holds, update_store, write_pickle, write_symptom_matrix
+from filter_index import FLAG_COLUMNS
+from preprocessing import add_engagement_columns, add_follower_columns
+from sentiment import score_posts
+from stopwords import STOP_WORDS, KEYWORD_STOPWORDS
+from symptom_extraction import extract_symptoms, load_cache, save_cache
+from symptom_index import SYMPTOMS
+
+## Incremental version of the analysis notebook's refresh. New source pickles are appended to
+## updated_testing_data.pkl, skipping posts already ingested (matched on a hash of `raw`). Derived
+## columns are computed for the new posts only, and the weekly TF-IDF / keyword tables are
+## recomputed only for the weeks those posts fall in. The columnar store is then updated with the
+## new posts (rebuilt instead if it was not built from the current pickles); running dashboards see
+## its new version and reload on their next request (see dashboard.py).
+##
+##     python ingest.py new_posts.pkl [more_posts.pkl ...]
+
+# Added to data ingested before the incremental refresh existed (see backfill)
+BACKFILLED_COLUMNS = ['postId', 'sentimentHash', 'comments', 'engagementNormalized']
+
+# One-hot label columns kept in sync with the `labels` lists
+LABEL_COLUMNS = FLAG_COLUMNS + ['news']
+
+KEYWORDS_PER_WEEK = 20
+
+def post_id(raw):
+    # Stable id for a post: hash of its raw record, independent of key order
+    return hashlib.sha1(json.dumps(raw, sort_keys=True, default=str).encode('utf-8')).hexdigest()[:16]
+
+def week_ending(dates):
+    # Weeks ending on Sunday, like pd.Grouper(freq='W') in the notebook
+    return pd.to_datetime(dates).dt.to_period('W-SUN').dt.end_time.dt.normalize()
+
+def actual_text(df):
+    # Translated text where there is one, the original content otherwise
+    return [str(translated) if translated is not None and not (isinstance(translated, float) and math.isnan(translated)) else str(content)
+            for translated, content in zip(df['text_translated'], df['content'])]
+
+def post_labels(new_df):
+    # Label columns to one-hot encode: the dashboard's flags plus any other label on the new posts
+    labels = set(LABEL_COLUMNS)
+    for value in new_df['labels']:
+        labels.update(value)
+    return sorted(labels)
+
+def prepare_posts(new_df):
+    ## Derived columns for newly ingested posts only
+    new_df = new_df.reset_index(drop=True).copy()
+    new_df['postId'] = [post_id(raw) for raw in new_df['raw']]
+
+    # authoredAt column datetime manipulation for timeseries grouping
+    new_df['authoredAt'] = pd.to_datetime(new_df['authoredAt'], errors='coerce').dt.normalize()
+    new_df['weekAuthored'] = new_df['authoredAt'].dt.isocalendar().week
+
+    new_df['actualText'] = actual_text(new_df)
+    score_posts(new_df)
+
+    # One-Hot Encoding Account Labels
+    for label in post_labels(new_df):
+        new_df[label] = new_df['labels'].apply(lambda x: 1 if label in x else 0)
+
+    new_df = add_engagement_columns(new_df)
+    new_df = add_follower_columns(new_df)
+    return new_df
+
+def backfill(sm_df):
+    # Columns the incremental refresh relies on, computed once for data ingested before it existed
+    if 'postId' not in sm_df.columns:
+        sm_df['postId'] = [post_id(raw) for raw in sm_df['raw']]
+    if 'sentimentHash' not in sm_df.columns:
+        score_posts(sm_df)
+    if 'comments' not in sm_df.columns:
+        sm_df = add_engagement_columns(sm_df)
+    if 'engagementNormalized' not in sm_df.columns:
+        sm_df = add_follower_columns(sm_df)
+    return sm_df
+
+# TF-IDF (as in the notebook: each sentence of the week's text is a document)
+def _frequency_table(sentence):
+    freq_table = {}
+    words = nltk.word_tokenize(sentence)
+
+    for word in words:
+        word = word.lower()
+        if word in STOP_WORDS:
+            continue
+        freq_table[word] = freq_table.get(word, 0) + 1
+
+    # Adding bigrams as phrases
+    for bigram in nltk.bigrams(words):
+        phrase = ' '.join(bigram)
+        if all(word not in STOP_WORDS for word in phrase.split(' ')):
+            freq_table[phrase] = freq_table.get(phrase, 0) + 1
+
+    return freq_table
+
+def tf_idf_matrix(text, total_documents):
+    ## TF-IDF scores of the week's words and phrases (highest score over the week's sentences)
+    freq_tables = [_frequency_table(sentence) for sentence in nltk.sent_tokenize(text)]
+
+    documents_per_word = {}
+    for freq_table in freq_tables:
+        for word in freq_table:
+            documents_per_word[word] = documents_per_word.get(word, 0) + 1
+
+    matrix = {}
+    for freq_table in freq_tables:
+        for word, count in freq_table.items():
+            tf = count / len(freq_table)
+            idf = math.log10(total_documents / documents_per_word[word]) if total_documents else 0.0
+            matrix[word] = max(matrix.get(word, float('-inf')), float(tf * idf))
+    return matrix
+
+def top_keywords(matrix):
+    # Drop numbers, short words and stopword phrases, then keep the highest scoring keywords
+    matrix_modified = {key: value for key, value in matrix.items()
+                       if not key.isdigit() and len(key) > 3 and all(word not in KEYWORD_STOPWORDS for word in key.lower().split())}
+    ranked = sorted(matrix_modified, key=matrix_modified.get, reverse=True)
+    return matrix_modified, [keyword for keyword in ranked if keyword][:KEYWORDS_PER_WEEK]
+
+def weekly_row(week, week_df, week_symptoms):
+    ## One row of weekly_tf_idf.pkl, recomputed from the week's posts and their packed symptom rows
+    texts = week_df['actualText']
+    matrix, values = top_keywords(tf_idf_matrix(' '.join(texts), int(texts.count())))
+    mentioned = np.unpackbits(np.bitwise_or.reduce(week_symptoms, axis=0), count=len(SYMPTOMS)) if len(week_symptoms) else []
+    symptoms = set(SYMPTOMS[column] for column in np.flatnonzero(mentioned))
+
+    return {'weekAuthored': week, 'textProcessed': ' '.join(texts), 'count': int(texts.count()),
+            'tfIdfMatrix': matrix, 'values': values, 'symptoms': symptoms}
+
+def update_weekly(weekly_text, sm_df, symptoms, weeks):
+    # Replace (or add) the rows for the given weeks, leaving every other week as it was
+    post_weeks = week_ending(sm_df['authoredAt']).to_numpy()
+    rows = [weekly_row(week, sm_df[post_weeks == week], symptoms[post_weeks == week]) for week in sorted(weeks)]
+
+    weekly_text = weekly_text[~pd.to_datetime(weekly_text['weekAuthored']).isin(weeks)]
+    weekly_text = pd.concat([weekly_text, pd.DataFrame(rows)], ignore_index=True)
+    return weekly_text.sort_values('weekAuthored').reset_index(drop=True)
+
+def update_keywords(words_df, weekly_text, weeks):
+    # keywords.pkl: one row of top keywords per week, rewritten for the given weeks only
+    updated = weekly_text[pd.to_datetime(weekly_text['weekAuthored']).isin(weeks)]
+    updated = pd.DataFrame(updated['values'].tolist(), index=updated['weekAuthored'],
+                           columns=range(KEYWORDS_PER_WEEK)).reset_index()
+
+    words_df = words_df[~pd.to_datetime(words_df['weekAuthored']).isin(weeks)]
+    words_df = pd.concat([words_df, updated], ignore_index=True)
+    return words_df.sort_values('weekAuthored').reset_index(drop=True)
+
+def ingest(sources):
+    ## Append the posts in the given pickles; returns the number of new posts
+    symptom_cache = load_cache()
+    sm_df = pd.read_pickle(PICKLE_FILES['posts']).reset_index(drop=True)
+    # The store can take the new posts as they are only if it holds every earlier post unchanged
+    incremental = set(BACKFILLED_COLUMNS).issubset(sm_df.columns) and store_holds(len(sm_df.index))
+    sm_df = backfill(sm_df)
+    symptoms = read_symptom_matrix(sm_df)
+    if symptoms is None:
+        symptoms = extract_symptoms(sm_df['actualText'].to_numpy(), cache=symptom_cache)
+    weekly_text = pd.read_pickle(PICKLE_FILES['weekly'])
+    words_df = pd.read_pickle(PICKLE_FILES['keywords'])
+
+    new_df = pd.concat([pd.read_pickle(source) for source in sources], ignore_index=True)
+    new_ids = pd.Series([post_id(raw) for raw in new_df['raw']])
+    new_df = new_df[(~new_ids.isin(set(sm_df['postId'])) & ~new_ids.duplicated()).to_numpy()]
+    if new_df.empty:
+        return 0
+
+    new_df = prepare_posts(new_df)
+    symptoms = np.concatenate([symptoms, extract_symptoms(new_df['actualText'].to_numpy(), cache=symptom_cache)])
+    # The symptom matrix replaces the notebook's per-post symptom sets
+    sm_df = pd.concat([sm_df.drop(columns='symptoms', errors='ignore'), new_df], ignore_index=True)
+    for label in post_labels(new_df):
+        # Labels seen for the first time are 0 on the earlier posts
+        sm_df[label] = sm_df[label].fillna(0).astype(np.int64)
+
+    weeks = set(week_ending(new_df['authoredAt']).dropna())
+    weekly_text = update_weekly(weekly_text, sm_df, symptoms, weeks)
+    words_df = update_keywords(words_df, weekly_text, weeks)
+
+    write_symptom_matrix(symptoms)
+    write_pickle(sm_df, PICKLE_FILES['posts'])
+    write_pickle(weekly_text, PICKLE_FILES['weekly'])
+    write_pickle(words_df, PICKLE_FILES['keywords'])
+    save_cache(symptom_cache)
+
+    if incremental:
+        update_store(sm_df, len(new_df.index), symptoms, weekly_text, words_df)
+    else:
+        build_store()
+    return len(new_df.index)
+
+if __name__ == '__main__':
+    print(f'{ingest(sys.argv[1:]):,} new posts')
@@ -0,0 +1,254 @@
+# Import required libraries
+import multiprocessing
+import os
+import pickle
+import threading
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dash.exceptions import PreventUpdate
+from dash.long_callback.managers import BaseLongCallbackManager
+from data import temporary_path
+
+## Background callbacks without a broker. Jobs run in a local process pool and write their results
+## to a directory every worker can read, so a poll answered by another gunicorn worker still finds
+## them. A job is claimed with an exclusive file create: identical requests (same callback, inputs
+## and data version) share the job already running instead of starting another one, and results
+## stay in the store until they have not been read for `expire` seconds. Progress stays readable
+## by every poller until the job finishes. Job processes do not set dash.callback_context (Dash
+## only offers a private API for that), so a background callback must not read it. Whatever a job
+## records in its own process (metrics, say) can be sent back with `collect` and `merge`, and data
+## a job leaves for later requests of any worker (store_data / read_data) is kept like a result.
+
+JOB_DIR = 'job_store'
+
+# Callback functions by registry key; a forked job process finds them here
+JOB_FUNCTIONS = {}
+
+def _alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+class JobStore:
+    ## Pickled results, progress values and job claims, one file each under a directory
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def path(self, key, kind):
+        return os.path.join(self.directory, f'{key}.{kind}')
+
+    def write(self, key, kind, value):
+        # Written to a temporary file and renamed, so a poll never reads half a result
+        path = self.path(key, kind)
+        with open(temporary_path(path), 'wb') as store_file:
+            pickle.dump(value, store_file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporary_path(path), path)
+
+    def read(self, key, kind, default=None):
+        try:
+            with open(self.path(key, kind), 'rb') as store_file:
+                return pickle.load(store_file)
+        except FileNotFoundError:
+            return default
+
+    def remove(self, key, kind):
+        try:
+            os.remove(self.path(key, kind))
+        except FileNotFoundError:
+            pass
+
+    def claim(self, key):
+        ## True if this process now owns the job for key, False if a live process already does
+        path = self.path(key, 'job')
+        for _ in range(2):
+            try:
+                claim_file = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            except FileExistsError:
+                if _alive(self.owner(key)):
+                    return False
+                # The worker that claimed it has died; take the job over
+                self.remove(key, 'job')
+                continue
+            with os.fdopen(claim_file, 'w') as claim_file:
+                claim_file.write(str(os.getpid()))
+            return True
+        return False
+
+    def owner(self, key):
+        try:
+            with open(self.path(key, 'job')) as claim_file:
+                return int(claim_file.read() or 0)
+        except (FileNotFoundError, ValueError):
+            return 0
+
+    def sweep(self, expire):
+        # Drop results (and anything left behind with them) not read for `expire` seconds
+        cutoff = time.time() - expire
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            try:
+                if name.endswith(('.result', '.progress', '.data', '.tmp')) and os.path.getmtime(path) < cutoff:
+                    os.remove(path)
+            except FileNotFoundError:
+                pass
+
+def _run_job(function_key, directory, key, args, collect):
+    ## Body of a job, in a pool process: runs the callback and stores what it returned
+    fn, progress = JOB_FUNCTIONS[function_key]
+    store = JobStore(directory)
+
+    def set_progress(value):
+        store.write(key, 'progress', list(value) if isinstance(value, (list, tuple)) else [value])
+
+    progress_args = [set_progress] if progress else []
+    try:
+        if isinstance(args, dict):
+            result = fn(*progress_args, **args)
+        else:
+            result = fn(*progress_args, *args)
+    except PreventUpdate:
+        result = {'_dash_no_update': '_dash_no_update'}
+    except Exception as err:
+        # Reported to the page the same way Dash reports errors of its own background jobs
+        result = {'long_callback_error': {'msg': str(err), 'tb': traceback.format_exc()}}
+    store.write(key, 'result', result)
+    return collect() if collect else None
+
+class JobManager(BaseLongCallbackManager):
+    ## Dash background callback manager over a process pool and a JobStore. The pool is created on
+    ## first use in each process (so a gunicorn master never forks one into its workers) and its
+    ## processes are forked from the worker: they start with its data, and `initializer` runs first
+    ## in each of them. After each job the pool process calls `collect` (a module-level function)
+    ## and the manager's process passes what it returned to `merge`.
+    def __init__(self, directory=JOB_DIR, processes=2, cache_by=None, expire=3600, initializer=None, collect=None, merge=None):
+        self.store = JobStore(directory)
+        self.processes = processes
+        self.expire = expire
+        self.initializer = initializer
+        self.collect = collect
+        self.merge = merge
+        self.pool = None
+        self.pool_pid = None
+        self.lock = threading.Lock()
+        self.running = {}
+        self.submitted = 0
+        self.shared = 0
+        super().__init__(cache_by)
+
+    def executor(self):
+        if self.pool_pid != os.getpid():
+            # Inherited from the process this one was forked from
+            self.pool = None
+            self.running = {}
+        if self.pool is None:
+            self.pool = ProcessPoolExecutor(self.processes, mp_context=multiprocessing.get_context('fork'), initializer=self.initializer)
+            self.pool_pid = os.getpid()
+        return self.pool
+
+    def restart(self):
+        # Later jobs run in new processes, forked from this one as it is now (after a data reload,
+        # say); jobs already running finish in the old ones
+        with self.lock:
+            if self.pool is not None and self.pool_pid == os.getpid():
+                self.pool.shutdown(wait=False)
+                self.pool = None
+
+    def make_job_fn(self, fn, progress, key=None):
+        JOB_FUNCTIONS[key] = (fn, progress)
+        return key
+
+    def call_job_fn(self, key, job_fn, args, context):
+        # The job id is the cache key: every request for the same result polls the same job
+        with self.lock:
+            if self.result_ready(key) or not self.store.claim(key):
+                self.shared += 1
+                return key
+            if self.result_ready(key):
+                # Finished between the two checks
+                self.store.remove(key, 'job')
+                self.shared += 1
+                return key
+            self.store.sweep(self.expire)
+            try:
+                future = self.executor().submit(_run_job, job_fn, self.store.directory, key, args, self.collect)
+            except Exception:
+                self.store.remove(key, 'job')
+                raise
+            self.running[key] = future
+            self.submitted += 1
+        future.add_done_callback(lambda future: self.finish(key, future))
+        return key
+
+    def finish(self, key, future):
+        # A pool process that died (or a job that could not be pickled) still answers its pollers
+        error = None if future.cancelled() else future.exception()
+        if error is not None:
+            self.store.write(key, 'result', {'long_callback_error': {'msg': repr(error), 'tb': ''.join(traceback.format_exception(error))}})
+        elif self.merge is not None and future.result() is not None:
+            self.merge(future.result())
+        with self.lock:
+            self.running.pop(key, None)
+            if isinstance(error, BrokenProcessPool):
+                self.pool = None
+        self.store.remove(key, 'progress')
+        self.store.remove(key, 'job')
+
+    def job_running(self, job):
+        if not job or os.path.exists(self.store.path(job, 'result')):
+            return False
+        return _alive(self.store.owner(job))
+
+    def terminate_job(self, job):
+        # Jobs may be shared by several pages, so one of them moving on does not cancel it
+        pass
+
+    def terminate_unhealthy_job(self, job):
+        return False
+
+    def clear_cache_entry(self, key):
+        self.store.remove(key, 'result')
+        self.store.remove(key, 'progress')
+
+    def get_progress(self, key):
+        # Read without removing: every page polling a shared job keeps seeing its progress
+        return self.store.read(key, 'progress')
+
+    def store_data(self, key, value):
+        self.store.write(key, 'data', value)
+
+    def read_data(self, key, default=None):
+        # Reading counts as a use, like reading a result
+        value = self.store.read(key, 'data', default)
+        if value is not default:
+            try:
+                os.utime(self.store.path(key, 'data'))
+            except FileNotFoundError:
+                pass
+        return value
+
+    def result_ready(self, key):
+        return os.path.exists(self.store.path(key, 'result'))
+
+    def get_result(self, key, job):
+        result = self.store.read(key, 'result', self.UNDEFINED)
+        if result is self.UNDEFINED:
+            return self.UNDEFINED
+
+        # Results are kept for later identical requests, counting a read as a use; errors are
+        # dropped so that the next request tries again
+        if self.cache_by is None or (isinstance(result, dict) and 'long_callback_error' in result):
+            self.clear_cache_entry(key)
+        else:
+            os.utime(self.store.path(key, 'result'))
+        return result
+
+    def stats(self):
+        with self.lock:
+            return {'running': len(self.running), 'submitted': self.submitted, 'shared': self.shared}
@@ -0,0 +1,81 @@
+# Import required libraries
+import re
+from collections import deque
+from functools import lru_cache
+
+# Words, hashtags, mentions and hyphenated terms
+TOKEN_PATTERN = re.compile(r"[\w'@#-]+")
+
+def tokenize(text):
+    return TOKEN_PATTERN.findall(text.lower())
+
+class KeywordMatcher:
+    ## Aho-Corasick automaton over lowercased tokens: one pass over a post finds every keyword
+    ## (single words and multi-word phrases) it contains, however many keywords there are.
+    def __init__(self, keywords):
+        self.keywords = []
+        self.transitions = [{}]
+        self.fail = [0]
+        self.outputs = [[]]
+
+        for keyword in keywords:
+            tokens = tokenize(keyword)
+            if not tokens:
+                continue
+
+            state = 0
+            for token in tokens:
+                if token not in self.transitions[state]:
+                    self.transitions.append({})
+                    self.fail.append(0)
+                    self.outputs.append([])
+                    self.transitions[state][token] = len(self.transitions) - 1
+                state = self.transitions[state][token]
+
+            if keyword not in self.outputs[state]:
+                self.outputs[state].append(keyword)
+                self.keywords.append(keyword)
+
+        # Breadth-first pass to link each state to its longest proper suffix state
+        queue = deque(self.transitions[0].values())
+        while queue:
+            state = queue.popleft()
+            for token, child in self.transitions[state].items():
+                queue.append(child)
+                fallback = self.fail[state]
+                while fallback and token not in self.transitions[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[child] = self.transitions[fallback].get(token, 0)
+                self.outputs[child] = self.outputs[child] + [keyword for keyword in self.outputs[self.fail[child]] if keyword not in self.outputs[child]]
+
+    def find(self, text):
+        # Keywords contained in the text, in order of first appearance
+        if not isinstance(text, str) or not self.keywords:
+            return []
+
+        hits = {}
+        state = 0
+        for token in tokenize(text):
+            while state and token not in self.transitions[state]:
+                state = self.fail[state]
+            state = self.transitions[state].get(token, 0)
+            for keyword in self.outputs[state]:
+                hits[keyword] = True
+        return list(hits)
+
+    def search(self, texts, rows=None, limit=None):
+        ## Yield (row, keywords) for texts containing any keyword, stopping after `limit` matches
+        rows = range(len(texts)) if rows is None else rows
+        found = 0
+        for row in rows:
+            if limit is not None and found >= limit:
+                return
+            hits = self.find(texts[row])
+            if hits:
+                found += 1
+                yield row, hits
+
+@lru_cache(maxsize=32)
+def keyword_matcher(keywords):
+    # Matchers are built once per keyword set (pass a tuple so it can be cached)
+    return KeywordMatcher(keywords)
@@ -0,0 +1,49 @@
+# Import required libraries
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+
+# Labels that mark a post as informational news or institutional
+NEWS_LABELS = ['news', 'institutional']
+
+def _label_lists(labels):
+    # Arrow list array of the labels column, whether it came from the store or a pickle
+    try:
+        return pa.array(labels)
+    except (pa.ArrowInvalid, pa.ArrowTypeError, TypeError):
+        return pa.array([sorted(value) if isinstance(value, (set, frozenset)) else list(value) if value is not None else []
+                         for value in labels], type=pa.list_(pa.string()))
+
+class LabelIndex:
+    ## The free-form `labels` lists encoded once at load: a label vocabulary plus a per-row bitset
+    ## (one uint64 word per 64 labels), so any label predicate is a few vectorized bit operations.
+    def __init__(self, sm_df):
+        lists = _label_lists(sm_df['labels'])
+        values = pc.list_flatten(lists)
+        rows = pc.list_parent_indices(lists).to_numpy(zero_copy_only=False)
+
+        encoded = pc.dictionary_encode(values)
+        self.vocabulary = encoded.dictionary.to_pylist()
+        self.codes = {label: code for code, label in enumerate(self.vocabulary)}
+        codes = encoded.indices.to_numpy(zero_copy_only=False).astype(np.int64)
+
+        self.n_rows = len(sm_df.index)
+        self.bits = np.zeros((self.n_rows, max(1, -(-len(self.vocabulary) // 64))), dtype=np.uint64)
+        np.bitwise_or.at(self.bits, (rows, codes // 64), np.left_shift(np.uint64(1), (codes % 64).astype(np.uint64)))
+
+    def label_mask(self, labels):
+        # Bitset with the given labels set (labels that never occur have no bit)
+        mask = np.zeros(self.bits.shape[1], dtype=np.uint64)
+        for label in labels:
+            if label in self.codes:
+                mask[self.codes[label] // 64] |= np.uint64(1) << np.uint64(self.codes[label] % 64)
+        return mask
+
+    def mask(self, labels, match='any'):
+        ## Rows carrying any (or all) of the given labels
+        mask = self.label_mask(labels)
+        if match == 'all':
+            if any(label not in self.codes for label in labels):
+                return np.zeros(self.n_rows, dtype=bool)
+            return ((self.bits & mask) == mask).all(axis=1)
+        return ((self.bits & mask) != 0).any(axis=1)
@@ -0,0 +1,160 @@
+# Import required libraries
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+
+## Minimal Prometheus text-format metrics. Recording a sample is a lock, a bisect and a few
+## additions; the text is only rendered when /metrics is scraped. Samples recorded in another
+## process (a background job) are moved into the scraped registry with drain() and merge().
+
+# Bucket upper bounds: wall time (seconds), payload size (bytes) and row counts
+SECONDS_BUCKETS = [0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30]
+BYTES_BUCKETS = [1e3, 1e4, 1e5, 2.5e5, 5e5, 1e6, 2.5e6, 5e6, 1e7]
+ROWS_BUCKETS = [0, 10, 100, 1e3, 1e4, 1e5, 1e6, 1e7]
+
+def _labels(labels):
+    if not labels:
+        return ''
+    escaped = [(name, str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')) for name, value in labels]
+    return '{' + ','.join(f'{name}="{value}"' for name, value in escaped) + '}'
+
+def _number(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class Counter:
+    def __init__(self, name, documentation):
+        self.name = name
+        self.documentation = documentation
+        self.values = {}
+        self.lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple(sorted(labels.items()))
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def drain(self):
+        # Values recorded since the last drain, which start again from zero
+        with self.lock:
+            values, self.values = self.values, {}
+        return values
+
+    def merge(self, values):
+        with self.lock:
+            for key, value in values.items():
+                self.values[key] = self.values.get(key, 0) + value
+
+    def after_fork(self):
+        self.lock = threading.Lock()
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} counter']
+        with self.lock:
+            for key, value in self.values.items():
+                lines.append(f'{self.name}{_labels(key)} {_number(value)}')
+        return lines
+
+class Histogram:
+    def __init__(self, name, documentation, buckets):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = list(buckets)
+        self.values = {}
+        self.lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(sorted(labels.items()))
+        position = bisect.bisect_left(self.buckets, value)
+        with self.lock:
+            counts, total = self.values.get(key, ([0] * (len(self.buckets) + 1), 0))
+            counts[position] += 1
+            self.values[key] = (counts, total + value)
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def drain(self):
+        with self.lock:
+            values, self.values = self.values, {}
+        return values
+
+    def merge(self, values):
+        with self.lock:
+            for key, (counts, total) in values.items():
+                own_counts, own_total = self.values.get(key, ([0] * (len(self.buckets) + 1), 0))
+                self.values[key] = ([own + count for own, count in zip(own_counts, counts)], own_total + total)
+
+    def after_fork(self):
+        self.lock = threading.Lock()
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} histogram']
+        with self.lock:
+            values = [(key, list(counts), total) for key, (counts, total) in self.values.items()]
+        for key, counts, total in values:
+            cumulative = 0
+            for bound, count in zip(self.buckets + [float('inf')], counts):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{_labels(key + (("le", _number(bound)),))} {cumulative}')
+            lines.append(f'{self.name}_sum{_labels(key)} {_number(total)}')
+            lines.append(f'{self.name}_count{_labels(key)} {cumulative}')
+        return lines
+
+class Gauge:
+    # Value read from `function` at scrape time
+    def __init__(self, name, documentation, function, kind='gauge'):
+        self.name = name
+        self.documentation = documentation
+        self.function = function
+        self.kind = kind
+
+    def render(self):
+        return [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} {self.kind}',
+                f'{self.name} {_number(self.function())}']
+
+class Registry:
+    def __init__(self):
+        self.metrics = []
+
+    def counter(self, name, documentation):
+        self.metrics.append(Counter(name, documentation))
+        return self.metrics[-1]
+
+    def histogram(self, name, documentation, buckets=SECONDS_BUCKETS):
+        self.metrics.append(Histogram(name, documentation, buckets))
+        return self.metrics[-1]
+
+    def gauge(self, name, documentation, function, kind='gauge'):
+        self.metrics.append(Gauge(name, documentation, function, kind))
+        return self.metrics[-1]
+
+    def after_fork(self):
+        # Fresh locks in a forked process (see ResultCache.after_fork)
+        for metric in self.metrics:
+            if hasattr(metric, 'after_fork'):
+                metric.after_fork()
+
+    def drain(self):
+        ## Counter and histogram samples recorded since the last drain, by metric name (gauges are
+        ## read at scrape time and have none)
+        return {metric.name: metric.drain() for metric in self.metrics if hasattr(metric, 'drain')}
+
+    def merge(self, samples):
+        # Add samples drained from the same metrics in another process
+        for metric in self.metrics:
+            if metric.name in samples:
+                metric.merge(samples[metric.name])
+
+    def render(self):
+        lines = []
+        for metric in self.metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
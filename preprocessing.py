@@ -0,0 +1,100 @@
+# Import required libraries
+import numpy as np
+import pandas as pd
+
+# Per-platform engagement counters: column name -> key in the post's raw statistics
+TWITTER_COUNTERS = {
+    'tw_retweets': 'retweets',
+    'tw_replies': 'replies',
+    'tw_likes': 'likes',
+    'tw_quote_count': 'quote_count',
+}
+
+FACEBOOK_COUNTERS = {
+    'fb_like': 'likeCount',
+    'fb_share': 'shareCount',
+    'fb_comment': 'commentCount',
+    'fb_love': 'loveCount',
+    'fb_wow': 'wowCount',
+    'fb_haha': 'hahaCount',
+    'fb_sad': 'sadCount',
+    'fb_angry': 'angryCount',
+    'fb_thankful': 'thankfulCount',
+    'fb_care': 'careCount',
+}
+
+INSTAGRAM_COUNTERS = {
+    'ig_favorite': 'favoriteCount',
+    'ig_comment': 'commentCount',
+}
+
+ENGAGEMENT_COLUMNS = list(TWITTER_COUNTERS) + list(FACEBOOK_COUNTERS) + list(INSTAGRAM_COUNTERS)
+
+# Accounts whose posts the Groups and Communities panel shows
+INTERESTING_AUTHORS = ['COVID-19 Long Haulers Support', 'Survivor Corps', 
+                       'Vaccines save lives', 'COVID-19 Novel Coronavirus FACTS', 
+                       '¡MÉDICOS POR LA VERDAD!', 'Black News Network (BNN)', 
+                       'COVID19: Real Talk from Health Care Workers around the Globe', 
+                       'Black Educators', 'Covid Wellness Clinic', 
+                       'Coronavirus Updates for: Statesboro, Georgia & Surrounding Counties', 
+                       'Athens GA COVID-19 Resources and Discussion', 'Georgia Trump Republicans', 
+                       "Skip Mason's Vanishing Black Atlanta History", 'DeKalb Strong', 
+                       'COVID-19 Watch North GA w/ Help & Resources', 
+                       'Albany, GA Area Happenings Over 21', 'Albany GA: Home Is Where The Heart Is', 
+                       'Type 1 Diabetes Recipes & Food Ideas', 
+                       'Kimono My House (Virtual House Concerts)', 'Dank Diabetes Memes Diabuddies', 
+                       'America First Tea Party', 'The Prayer Wall', 'TERMINÓ 🧑\u200d🦽🧑\u200d🦽🧑\u200d🦽🧑\u200d🦽', 
+                       'Coronavirus Updates from NBC News']
+
+def _post_statistics(platform, raw):
+    # Twitter keeps its counters at the top level, Facebook and Instagram under statistics.actual
+    if not isinstance(raw, dict):
+        return {}
+    if platform == 'twitter':
+        return raw
+    return raw.get('statistics', {}).get('actual', {})
+
+def add_engagement_columns(sm_df):
+    ## Extract the nested per-platform counters into flat int64 columns (one pass at load time)
+    values = {column: np.zeros(len(sm_df.index), dtype=np.int64) for column in ENGAGEMENT_COLUMNS}
+
+    for position, (platform, raw) in enumerate(zip(sm_df['platform'], sm_df['raw'])):
+        if platform == 'twitter':
+            platform_counters = TWITTER_COUNTERS
+        elif platform == 'facebook':
+            platform_counters = FACEBOOK_COUNTERS
+        else:
+            platform_counters = INSTAGRAM_COUNTERS
+
+        statistics = _post_statistics(platform, raw)
+        for column, key in platform_counters.items():
+            value = statistics.get(key)
+            if value is not None and not pd.isnull(value):
+                values[column][position] = value
+
+    for column in ENGAGEMENT_COLUMNS:
+        sm_df[column] = values[column]
+
+    # Comments as counted by the engagement panel: Twitter replies + Facebook/Instagram comments
+    sm_df['comments'] = sm_df['tw_replies'] + sm_df['fb_comment'] + sm_df['ig_comment']
+
+    return sm_df
+
+def _follower_count(raw):
+    # Facebook and Instagram posts carry the account's subscriber count, tweets the user's follower count
+    if not isinstance(raw, dict):
+        return None
+    account = raw.get('account')
+    if isinstance(account, dict) and account.get('subscriberCount') is not None:
+        return account['subscriberCount']
+    user = raw.get('user')
+    if isinstance(user, dict) and user.get('followers_count') is not None:
+        return user['followers_count']
+    return raw.get('followers_count', raw.get('followers'))
+
+def add_follower_columns(sm_df):
+    ## Follower count of the author account and engagement normalized by it (NaN when unknown)
+    followers = pd.to_numeric(pd.Series([_follower_count(raw) for raw in sm_df['raw']], index=sm_df.index), errors='coerce')
+    sm_df['followers'] = followers.astype(np.float64)
+    sm_df['engagementNormalized'] = (sm_df['engagementRaw'] / sm_df['followers'].where(sm_df['followers'] > 0)).astype(np.float64)
+    return sm_df
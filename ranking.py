@@ -0,0 +1,62 @@
+# Import required libraries
+import numpy as np
+
+# Score columns the popular posts panel can rank by
+RANKINGS = {
+    'engagement': 'engagementRaw',
+    'normalized': 'engagementNormalized',
+}
+
+class EngagementIndex:
+    ## Global descending orders of sm_df rows by each ranking score, built once at load so the
+    ## top posts of any filtered subset never require sorting the subset.
+    def __init__(self, sm_df):
+        self.n_rows = len(sm_df.index)
+        self.scores = {}
+        self.orders = {}
+
+        for ranking, column in RANKINGS.items():
+            if column not in sm_df.columns:
+                continue
+            # Rows without a score (e.g. unknown follower count) rank last
+            scores = sm_df[column].to_numpy(dtype=np.float64, na_value=-np.inf)
+            self.scores[ranking] = scores
+            self.orders[ranking] = np.argsort(-scores, kind='stable')
+
+    def top_k(self, rows, k=20, ranking='engagement'):
+        ## Positions of the k highest scoring rows among `rows`, best first (ties keep row order)
+        rows = np.asarray(rows, dtype=np.int64)
+        if ranking not in self.scores:
+            ranking = 'engagement'
+        scores = self.scores[ranking]
+
+        if len(rows) == 0:
+            return rows
+
+        # Walking the global order costs about k / density rows, partitioning the subset costs len(rows)
+        density = len(rows) / self.n_rows
+        if len(rows) > k and density * density > k / self.n_rows:
+            return self._walk(rows, k, ranking)
+
+        if len(rows) > k:
+            # Every row scoring at least the k-th best score, so ties at the cut go by row order too
+            threshold = -np.partition(-scores[rows], k - 1)[k - 1]
+            rows = rows[scores[rows] >= threshold]
+        return rows[np.lexsort((rows, -scores[rows]))][:k]
+
+    def _walk(self, rows, k, ranking):
+        order = self.orders[ranking]
+        mask = np.zeros(self.n_rows, dtype=bool)
+        mask[rows] = True
+
+        chunk = max(4 * k, int(2 * k * self.n_rows / len(rows)))
+        found = []
+        count = 0
+        for start in range(0, self.n_rows, chunk):
+            block = order[start:start + chunk]
+            block = block[mask[block]]
+            found.append(block)
+            count += len(block)
+            if count >= k:
+                break
+        return np.concatenate(found)[:k]
@@ -0,0 +1,141 @@
+# Import required libraries
+import numpy as np
+import pandas as pd
+from filter_index import FLAG_COLUMNS
+from preprocessing import ENGAGEMENT_COLUMNS
+from label_index import NEWS_LABELS, LabelIndex
+
+# Label flags packed into each cell's key: the sidebar's flags plus the news/institutional label
+ROLLUP_FLAGS = FLAG_COLUMNS + ['news_institutional']
+FLAG_BITS = {flag: 1 << bit for bit, flag in enumerate(ROLLUP_FLAGS)}
+
+SENTIMENT_COLUMNS = ['positive', 'negative', 'neutral', 'compound']
+
+# Rolling windows (in days) of the sentiment trend
+ROLLING_WINDOWS = [7, 30]
+
+# Summed per cell: post counts, engagement and sentiment (with the number of scored posts)
+MEASURES = ['posts', 'engagementRaw'] + ENGAGEMENT_COLUMNS + ['comments'] + SENTIMENT_COLUMNS + ['scored']
+
+def _flag_values(sm_df):
+    # One integer per post with a bit set for each flag it carries
+    flags = np.zeros(len(sm_df.index), dtype=np.int64)
+    for flag, bit in FLAG_BITS.items():
+        if flag == 'news_institutional':
+            values = LabelIndex(sm_df).mask(NEWS_LABELS)
+        elif flag in sm_df.columns:
+            values = sm_df[flag].to_numpy() == 1
+        else:
+            continue
+        flags |= np.where(values, bit, 0)
+    return flags
+
+def build_rollup(sm_df):
+    ## Daily rollup cube: one row per (day, platform, flags) cell with the measures summed
+    cells = pd.DataFrame({
+        'authoredAt': pd.to_datetime(sm_df['authoredAt'].to_numpy()).normalize(),
+        'platform': sm_df['platform'].to_numpy(dtype=object),
+        'flags': _flag_values(sm_df),
+        'posts': 1,
+        'engagementRaw': pd.to_numeric(sm_df['engagementRaw'].to_numpy(), errors='coerce'),
+    })
+    for column in ENGAGEMENT_COLUMNS + ['comments']:
+        cells[column] = sm_df[column].to_numpy()
+
+    sentiment = pd.DataFrame({column: pd.to_numeric(sm_df[column].to_numpy(), errors='coerce') if column in sm_df.columns else np.nan
+                              for column in SENTIMENT_COLUMNS})
+    cells['scored'] = sentiment['compound'].notna().to_numpy(dtype=np.int64)
+    for column in SENTIMENT_COLUMNS:
+        cells[column] = sentiment[column].fillna(0).to_numpy(dtype=np.float64)
+
+    return cells.groupby(['authoredAt', 'platform', 'flags'], sort=True).sum().reset_index()
+
+def merge_rollup(cube, sm_df):
+    ## Cube with the posts of sm_df added: their cells are summed into the matching cells of cube,
+    ## so appending posts costs the size of the cube rather than a pass over every post
+    cube = cube.assign(platform=cube['platform'].to_numpy(dtype=object))
+    cells = pd.concat([cube, build_rollup(sm_df)], ignore_index=True)
+    return cells.groupby(['authoredAt', 'platform', 'flags'], sort=True).sum().reset_index()
+
+class Rollup:
+    ## Answers sidebar selections by summing matching cube cells instead of scanning posts
+    def __init__(self, cube):
+        self.cube = cube.reset_index(drop=True)
+        self.dates = self.cube['authoredAt'].to_numpy(dtype='datetime64[ns]')
+        # Platforms as small integer codes rather than an object array of names
+        self.platform_names, self.platforms = np.unique(self.cube['platform'].to_numpy(dtype=object), return_inverse=True)
+        self.flags = self.cube['flags'].to_numpy(dtype=np.int64)
+
+    def _has(self, flag):
+        return (self.flags & FLAG_BITS[flag]) != 0
+
+    def mask(self, platform_list, account_category, account_identity, account_type, account_location):
+        # Same selection as FilterIndex.mask, over cells instead of posts
+        mask = np.isin(self.platforms, np.flatnonzero(np.isin(self.platform_names, list(platform_list))))
+
+        for account in account_category:
+            mask &= self._has(account) if account in FLAG_BITS else False
+
+        if account_identity != 'all':
+            mask &= self._has(account_identity) if account_identity in FLAG_BITS else False
+
+        if account_type != 'all':
+            mask &= self._has('institutional') if account_type == 'institutional' else ~self._has('institutional')
+
+        if account_location != 'all':
+            mask &= self._has('georgia') if account_location == 'georgia' else ~self._has('georgia')
+
+        return mask
+
+    def post_cells(self, sm_df):
+        # Position in the cube of each post's cell (sm_df must be the frame the cube was built from)
+        cells = pd.MultiIndex.from_frame(self.cube[['authoredAt', 'platform', 'flags']])
+        keys = pd.MultiIndex.from_arrays([pd.to_datetime(sm_df['authoredAt'].to_numpy()).normalize(),
+                                          sm_df['platform'].to_numpy(dtype=object), _flag_values(sm_df)])
+        return cells.get_indexer(keys)
+
+    def latest_date(self, mask):
+        if not mask.any():
+            return pd.NaT
+        return pd.Timestamp(self.dates[mask].max())
+
+    def cells(self, mask, start=None, end=None):
+        # Matching cells with start <= day < end
+        if start is not None:
+            mask = mask & (self.dates >= np.datetime64(start, 'ns'))
+        if end is not None:
+            mask = mask & (self.dates < np.datetime64(end, 'ns'))
+        return self.cube[mask]
+
+    def news_institutional(self, cells):
+        return cells[(cells['flags'].to_numpy() & FLAG_BITS['news_institutional']) != 0]
+
+    def post_counts(self, cells):
+        # Posts per day, as groupby('authoredAt').size() over the matching posts
+        return cells.groupby('authoredAt')['posts'].sum()
+
+    def sentiment_trend(self, cells, windows=ROLLING_WINDOWS):
+        ## Daily mean compound sentiment by platform, with rolling means over the last 7 and 30 days.
+        ## Each call sums the matching cells by day and takes every window as the difference of two
+        ## prefix sums over the calendar, so a window costs the same whatever its length. Nothing is
+        ## kept between calls; the rendered panel is cached per filter key like the other panels.
+        columns = ['authoredAt', 'platform', 'compound'] + [f'compound_{window}day' for window in windows]
+        if cells.empty:
+            return pd.DataFrame(columns=columns)
+
+        trends = []
+        sums = cells.groupby(['platform', 'authoredAt'])[['compound', 'scored']].sum()
+        for platform, daily in sums.groupby(level='platform'):
+            daily = daily.droplevel('platform')
+            days = pd.date_range(daily.index.min(), daily.index.max(), freq='D')
+            daily = daily.reindex(days, fill_value=0)
+            totals = daily.cumsum()
+
+            trend = pd.DataFrame({'authoredAt': days, 'platform': platform})
+            trend['compound'] = (daily['compound'] / daily['scored'].where(daily['scored'] > 0)).to_numpy()
+            for window in windows:
+                window_sums = totals - totals.shift(window, fill_value=0)
+                trend[f'compound_{window}day'] = (window_sums['compound'] / window_sums['scored'].where(window_sums['scored'] > 0)).to_numpy()
+            trends.append(trend)
+
+        return pd.concat(trends, ignore_index=True)[columns]
@@ -0,0 +1,95 @@
+# Import required libraries
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+from data import PICKLE_FILES, build_store, text_hash, write_pickle
+from rollup import SENTIMENT_COLUMNS
+
+## VADER sentiment scored in batches across a process pool. Scores go straight into float32
+## positive/negative/neutral/compound columns; sentimentHash records the text each row was scored
+## on, so rescoring a frame only scores new or edited posts.
+
+# VADER key for each column
+VADER_KEYS = {'positive': 'pos', 'negative': 'neg', 'neutral': 'neu', 'compound': 'compound'}
+
+# Posts are short, so a chunk is mostly pickling overhead below a few hundred texts; several
+# chunks per worker keep the pool busy when some chunks hold longer posts than others
+MIN_CHUNK_SIZE = 500
+MAX_CHUNK_SIZE = 5000
+CHUNKS_PER_WORKER = 4
+
+_analyzer = None
+
+def _score_chunk(texts):
+    # Runs in the worker processes; each builds its analyzer (and lexicon) once
+    global _analyzer
+    if _analyzer is None:
+        _analyzer = SentimentIntensityAnalyzer()
+
+    scores = np.empty((len(texts), len(SENTIMENT_COLUMNS)), dtype=np.float32)
+    for row, text in enumerate(texts):
+        polarity = _analyzer.polarity_scores(text)
+        scores[row] = [polarity[VADER_KEYS[column]] for column in SENTIMENT_COLUMNS]
+    return scores
+
+def chunk_size(n_texts, workers):
+    return int(min(MAX_CHUNK_SIZE, max(MIN_CHUNK_SIZE, n_texts // (workers * CHUNKS_PER_WORKER) + 1)))
+
+def score_texts(texts, workers=None, size=None):
+    ## (n_texts x 4) float32 scores in SENTIMENT_COLUMNS order
+    texts = [text if isinstance(text, str) else '' for text in texts]
+    workers = workers or os.cpu_count() or 1
+    size = size or chunk_size(len(texts), workers)
+    chunks = [texts[start:start + size] for start in range(0, len(texts), size)]
+
+    if workers == 1 or len(chunks) <= 1:
+        results = [_score_chunk(chunk) for chunk in chunks]
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(chunks))) as pool:
+            results = list(pool.map(_score_chunk, chunks))
+
+    if not results:
+        return np.empty((0, len(SENTIMENT_COLUMNS)), dtype=np.float32)
+    return np.concatenate(results)
+
+def score_posts(sm_df, text_column='content', workers=None):
+    ## Score the posts whose text has not been scored yet, in place; returns the number scored
+    texts = [text if isinstance(text, str) else '' for text in sm_df[text_column]]
+    hashes = np.array([text_hash(text) for text in texts], dtype=object)
+
+    for column in SENTIMENT_COLUMNS:
+        values = sm_df[column] if column in sm_df.columns else pd.Series(np.nan, index=sm_df.index)
+        sm_df[column] = pd.to_numeric(values, errors='coerce').astype(np.float32)
+    if 'sentimentHash' not in sm_df.columns:
+        # Scores from before the hash was recorded are taken to be for the current text
+        sm_df['sentimentHash'] = np.where(sm_df['compound'].notna(), hashes, None)
+    # The four columns replace the notebook's per-row dict of the same scores
+    sm_df.drop(columns='sentiment', errors='ignore', inplace=True)
+
+    pending = np.flatnonzero(sm_df['sentimentHash'].to_numpy(dtype=object) != hashes)
+    if len(pending) == 0:
+        return 0
+
+    # Identical texts (reposts, retweets) are scored once
+    unique_hashes, first, inverse = np.unique(hashes[pending], return_index=True, return_inverse=True)
+    scores = score_texts([texts[row] for row in pending[first]], workers)[inverse]
+
+    for position, column in enumerate(SENTIMENT_COLUMNS):
+        values = sm_df[column].to_numpy(dtype=np.float32, copy=True)
+        values[pending] = scores[:, position]
+        sm_df[column] = values
+    sentiment_hashes = sm_df['sentimentHash'].to_numpy(dtype=object, copy=True)
+    sentiment_hashes[pending] = hashes[pending]
+    sm_df['sentimentHash'] = sentiment_hashes
+
+    return len(pending)
+
+if __name__ == '__main__':
+    # Backfill the posts data (python sentiment.py [workers]), then rebuild the columnar store
+    sm_df = pd.read_pickle(PICKLE_FILES['posts'])
+    print(f'{score_posts(sm_df, workers=int(sys.argv[1]) if len(sys.argv) > 1 else None):,} posts scored')
+    write_pickle(sm_df, PICKLE_FILES['posts'])
+    build_store()
@@ -0,0 +1,61 @@
+# Import required libraries
+import gc
+import os
+from gunicorn.app.base import BaseApplication
+
+## Production entry point: a gunicorn master loads and indexes the data once, then forks the
+## workers. The posts are memory-mapped Arrow buffers and the indexes are numpy arrays, so the
+## workers share those pages with the master instead of each building a private copy.
+##
+##     DASHBOARD_WORKERS=4 DASHBOARD_THREADS=8 python serve.py
+##
+## Each worker forks its own pool of DASHBOARD_JOB_PROCESSES processes for the background panels
+## on first use (see jobs.py). dev.py is still the single-process debug server.
+
+def settings():
+    # Worker and thread tuning from the environment
+    return {
+        'bind': os.environ.get('DASHBOARD_BIND', '0.0.0.0:8050'),
+        'workers': int(os.environ.get('DASHBOARD_WORKERS', os.cpu_count() or 1)),
+        # Callbacks spend most of their time in numpy and pandas, which release the GIL
+        'worker_class': 'gthread',
+        'threads': int(os.environ.get('DASHBOARD_THREADS', 4)),
+        'timeout': int(os.environ.get('DASHBOARD_TIMEOUT', 120)),
+        # Recycling workers is off by default; set it to cap memory if a leak ever shows up
+        'max_requests': int(os.environ.get('DASHBOARD_MAX_REQUESTS', 0)),
+        'max_requests_jitter': int(os.environ.get('DASHBOARD_MAX_REQUESTS_JITTER', 0)),
+        'preload_app': True,
+        'post_fork': post_fork,
+    }
+
+def preload():
+    ## Load everything in the master, before the fork
+    # No collections while loading, so freed objects leave no holes in the pages the workers share
+    gc.disable()
+
+    # Load synchronously: a background loading thread would not survive the fork
+    os.environ['DASHBOARD_EAGER_STARTUP'] = '1'
+    from dashboard import server
+
+    # Move everything loaded so far out of the collector's reach: a collection in a worker would
+    # otherwise write to the header of every long-lived object and unshare its page
+    gc.freeze()
+    return server
+
+def post_fork(arbiter, worker):
+    gc.enable()
+
+class DashboardServer(BaseApplication):
+    def __init__(self, options):
+        self.options = options
+        super().__init__()
+
+    def load_config(self):
+        for key, value in self.options.items():
+            self.cfg.set(key, value)
+
+    def load(self):
+        return preload()
+
+if __name__ == '__main__':
+    DashboardServer(settings()).run()
@@ -1,211 +1,219 @@
 # Import required libraries
 from dash import html, dcc
 from style import SIDEBAR_STYLE
-from datetime import datetime
+from datetime import datetime, timedelta
 import pandas as pd
+from filter_index import FilterIndex
+from label_index import LabelIndex
+from data import load_metadata
 
-sm_df = pd.read_pickle('updated_testing_data.pkl')
+def sidebar():
+    # Platform list and date bounds come from the store's metadata, without loading any posts
+    metadata = load_metadata()
 
-sidebar = html.Div(
-    [# Filter By Social Media Platform and Time Frame
-        html.Div([
-            html.H4('Filter By Platform'),
-            dcc.Checklist(id='platform-selection',
-                        options=[{'label': platform.capitalize(), 'value': platform} for platform in sm_df.platform.unique()],
-                        value=sm_df.platform.unique(),
-                        inputStyle={"marginRight":"0.5rem", "marginLeft":"0.5rem"}),
-            html.Br(),
-            html.H4('Filter By Time Frame'),
-            dcc.RadioItems(
-                id="time-frame",
-                options=[
-                    {"label": "Use Relative Dates", "value": "relative"},
-                    {"label": "Select Custom Range", "value": "range"},
-                ],
-                value="relative",
-                inputStyle={"marginRight":"0.5rem", "marginLeft":"0.5rem"}
-            ),
-            html.Div(id='date-range-div', children=[
+    return html.Div(
+        [# Filter By Social Media Platform and Time Frame
+            html.Div([
+                html.H4('Filter By Platform'),
+                dcc.Checklist(id='platform-selection',
+                            options=[{'label': platform.capitalize(), 'value': platform} for platform in metadata['platforms']],
+                            value=metadata['platforms'],
+                            inputStyle={"marginRight":"0.5rem", "marginLeft":"0.5rem"}),
                 html.Br(),
-                dcc.DatePickerRange(
-                    start_date_placeholder_text="Start Date",
-                    end_date_placeholder_text="End Date",
-                    calendar_orientation='vertical',
-                    id='date-range',
-                    min_date_allowed=sm_df['authoredAt'].min(),
-                    max_date_allowed=sm_df['authoredAt'].max(),
-                    initial_visible_month=sm_df['authoredAt'].max(),
-                    start_date=sm_df['authoredAt'].min(),
-                    end_date=sm_df['authoredAt'].max(),
-                    display_format='MM/DD/YYYY',
+                html.H4('Filter By Time Frame'),
+                dcc.RadioItems(
+                    id="time-frame",
+                    options=[
+                        {"label": "Use Relative Dates", "value": "relative"},
+                        {"label": "Select Custom Range", "value": "range"},
+                    ],
+                    value="relative",
+                    inputStyle={"marginRight":"0.5rem", "marginLeft":"0.5rem"}
                 ),
-            ], style={'display': 'none', }, className="dbc"),
+                html.Div(id='date-range-div', children=[
+                    html.Br(),
+                    dcc.DatePickerRange(
+                        start_date_placeholder_text="Start Date",
+                        end_date_placeholder_text="End Date",
+                        calendar_orientation='vertical',
+                        id='date-range',
+                        min_date_allowed=metadata['min_date'],
+                        max_date_allowed=metadata['max_date'],
+                        initial_visible_month=metadata['max_date'],
+                        start_date=metadata['min_date'],
+                        end_date=metadata['max_date'],
+                        display_format='MM/DD/YYYY',
+                    ),
+                ], style={'display': 'none', }, className="dbc"),
 
-            html.Div(id='relative-date-div', children=[
-                html.Br(),
-                dcc.Dropdown(['Last 7 Days', 'Last 15 Days', 'Last 30 Days', 'Last 60 Days',
-                            'Last 90 Days', 'Last 6 Months', 'Last 1 Year', 'All Dates'], 'All Dates', id='dates-dropdown'), 
-            ], style={'display': 'block'}),
-        ]),
+                html.Div(id='relative-date-div', children=[
+                    html.Br(),
+                    dcc.Dropdown(['Last 7 Days', 'Last 15 Days', 'Last 30 Days', 'Last 60 Days',
+                                'Last 90 Days', 'Last 6 Months', 'Last 1 Year', 'All Dates'], 'All Dates', id='dates-dropdown'), 
+                ], style={'display': 'block'}),
+            ]),
         
-        html.Br(),
-        # Filter By Labels
-        html.Div([
-            html.H4('Filter By Post Labels'),
-            html.H5('Account Categories'),
-            dcc.Checklist(
-                id="all-or-none-category",
-                options=[{"label": "All", "value": "all"}],
-                value=[],
-                inputStyle={"marginRight":"0.5rem", "marginLeft":"0.5rem"}
-            ),
-            dcc.Checklist(
-                id="account-category",
-                options=[
-                    {"label": "Government", "value": "government"},
-                    {"label": "Media", "value": "media"},
-                    {"label": "Faith", "value": "faith"},
-                    {"label": "Health", "value": "health"},
-                    {"label": "COVID", "value": "covid"},
-                    {"label": "Known Misinfo Spreaders", "value": "misinfo"},
-                    {"label": "Project Partners", "value": "partners"},
-                    {"label": "Trusted Resources", "value": "trusted"}
-                ],
-                value=[],
-                inputStyle={"marginRight":"0.5rem", "marginLeft":"0.5rem"}
-            ),
-            html.Br(),
-            html.H5('Account Identity'),
-            dcc.RadioItems(
-                id="account-identity",
-                options=[
-                    {"label": "All", "value": "all"},
-                    {"label": "Black/African American", "value": "blackafam"},
-                    {"label": "Hispanic/Latinx", "value": "latinx"},
-                ],
-                value="all",
-                inputStyle={"marginRight":"0.5rem", "marginLeft":"0.5rem"}
-            ),
-            html.Br(),
-            html.H5('Account Type'),
-            dcc.RadioItems(
-                id="account-type",
-                options=[
-                    {"label": "All", "value": "all"},
-                    {"label": "Institution", "value": "institutional"},
-                    {"label": "Non-Institution", "value": "non-institutional"},
-                ],
-                value="all",
-                inputStyle={"marginRight":"0.5rem", "marginLeft":"0.5rem"}
-            ),
-            html.Br(),
-            html.H5('Account Location'),
-            dcc.RadioItems(
-                id="account-location",
-                options=[
-                    {"label": "All", "value": "all"},
-                    {"label": "Georgia", "value": "georgia"},
-                    {"label": "Non-Georgia", "value": "non-georgia"},
-                ],
-                value="all",
-                inputStyle={"marginRight":"0.5rem", "marginLeft":"0.5rem"}
-            ),
             html.Br(),
+            # Filter By Labels
             html.Div([
-            html.H5('COM-B Components'),
-            dcc.Checklist(
-                id="all-or-none-com-b",
-                options=[{"label": "All", "value": "all"}],
-                value=[],
-                inputStyle={"marginRight":"0.5rem", "marginLeft":"0.5rem"}
-            ),
-            dcc.Checklist(
-                id="com-b-components",
-                options=[
-                    {"label": "Physical Capability", "value": "physical-capability"},
-                    {"label": "Psychological Capability", "value": "psychological-capability"},
-                    {"label": "Reflective Motivation", "value": "reflective-motivation"},
-                    {"label": "Automatic Motivation", "value": "automatic-motivation"},
-                    {"label": "Physical Opportunity", "value": "physical-opportunity"},
-                    {"label": "Social Opportunity", "value": "social-opportunity"},
-                ],
-                value=[],
-                inputStyle={"marginRight":"0.5rem", "marginLeft":"0.5rem"}
-            ),
-            html.Br(),
-            ]),  # Adjust the width as needed
-        ]),
-    ],
-    style=SIDEBAR_STYLE,
-)
+                html.H4('Filter By Post Labels'),
+                html.H5('Account Categories'),
+                dcc.Checklist(
+                    id="all-or-none-category",
+                    options=[{"label": "All", "value": "all"}],
+                    value=[],
+                    inputStyle={"marginRight":"0.5rem", "marginLeft":"0.5rem"}
+                ),
+                dcc.Checklist(
+                    id="account-category",
+                    options=[
+                        {"label": "Government", "value": "government"},
+                        {"label": "Media", "value": "media"},
+                        {"label": "Faith", "value": "faith"},
+                        {"label": "Health", "value": "health"},
+                        {"label": "COVID", "value": "covid"},
+                        {"label": "Known Misinfo Spreaders", "value": "misinfo"},
+                        {"label": "Project Partners", "value": "partners"},
+                        {"label": "Trusted Resources", "value": "trusted"}
+                    ],
+                    value=[],
+                    inputStyle={"marginRight":"0.5rem", "marginLeft":"0.5rem"}
+                ),
+                html.Br(),
+                html.H5('Account Identity'),
+                dcc.RadioItems(
+                    id="account-identity",
+                    options=[
+                        {"label": "All", "value": "all"},
+                        {"label": "Black/African American", "value": "blackafam"},
+                        {"label": "Hispanic/Latinx", "value": "latinx"},
+                    ],
+                    value="all",
+                    inputStyle={"marginRight":"0.5rem", "marginLeft":"0.5rem"}
+                ),
+                html.Br(),
+                html.H5('Account Type'),
+                dcc.RadioItems(
+                    id="account-type",
+                    options=[
+                        {"label": "All", "value": "all"},
+                        {"label": "Institution", "value": "institutional"},
+                        {"label": "Non-Institution", "value": "non-institutional"},
+                    ],
+                    value="all",
+                    inputStyle={"marginRight":"0.5rem", "marginLeft":"0.5rem"}
+                ),
+                html.Br(),
+                html.H5('Account Location'),
+                dcc.RadioItems(
+                    id="account-location",
+                    options=[
+                        {"label": "All", "value": "all"},
+                        {"label": "Georgia", "value": "georgia"},
+                        {"label": "Non-Georgia", "value": "non-georgia"},
+                    ],
+                    value="all",
+                    inputStyle={"marginRight":"0.5rem", "marginLeft":"0.5rem"}
+                ),
+                html.Br(),
+                html.Div([
+                html.H5('COM-B Components'),
+                dcc.Checklist(
+                    id="all-or-none-com-b",
+                    options=[{"label": "All", "value": "all"}],
+                    value=[],
+                    inputStyle={"marginRight":"0.5rem", "marginLeft":"0.5rem"}
+                ),
+                dcc.Checklist(
+                    id="com-b-components",
+                    options=[
+                        {"label": "Physical Capability", "value": "physical-capability"},
+                        {"label": "Psychological Capability", "value": "psychological-capability"},
+                        {"label": "Reflective Motivation", "value": "reflective-motivation"},
+                        {"label": "Automatic Motivation", "value": "automatic-motivation"},
+                        {"label": "Physical Opportunity", "value": "physical-opportunity"},
+                        {"label": "Social Opportunity", "value": "social-opportunity"},
+                    ],
+                    value=[],
+                    inputStyle={"marginRight":"0.5rem", "marginLeft":"0.5rem"}
+                ),
+                html.Br(),
+                ]),  # Adjust the width as needed
+            ]),
+        ],
+        style=SIDEBAR_STYLE,
+    )
+
+# Relative date options and how far back each one reaches from the latest post
+RELATIVE_DATE_OFFSETS = {
+    'Last 7 Days': pd.DateOffset(days=7),
+    'Last 15 Days': pd.DateOffset(days=15),
+    'Last 30 Days': pd.DateOffset(days=30),
+    'Last 60 Days': pd.DateOffset(days=60),
+    'Last 90 Days': pd.DateOffset(days=90),
+    'Last 6 Months': pd.DateOffset(months=6),
+    'Last 1 Year': pd.DateOffset(years=1),
+}
+
+def date_window(time_frame, relative_date, start_date, end_date, latest_date=None):
+    ## Resolve the time frame inputs into (start_date, end_date, start, end): the dates shown for the
+    ## window and the bounds start <= authoredAt < end (None is unbounded). Relative windows reach
+    ## back from latest_date, the newest selected post.
+    if time_frame == 'relative':
+        if relative_date == 'All Dates':
+            return None, end_date, None, None
+        if pd.isnull(latest_date):
+            # Nothing selected: an empty window
+            return pd.NaT, pd.NaT, pd.Timestamp.min, pd.Timestamp.min
+
+        end_date = latest_date.date()
+        start_date = (latest_date - RELATIVE_DATE_OFFSETS[relative_date]).date()
+        return start_date, end_date, datetime.combine(start_date, datetime.min.time()), None
+
+    date_format = '%Y-%m-%d'
+    start_date = datetime.strptime(start_date[:10], date_format).date() if isinstance(start_date, str) else start_date
+    end_date = datetime.strptime(end_date[:10], date_format).date() if isinstance(end_date, str) else end_date
+    start = datetime.combine(start_date, datetime.min.time())
+    end = datetime.combine(end_date, datetime.min.time()) + timedelta(days=1) # End date is inclusive
+    return start_date, end_date, start, end
 
-def dataframe_filter(sm_df, weekly_df, symptoms_df, platform_list, account_category, account_identity, account_type, account_location, time_frame, relative_date, start_date, end_date):
+def dataframe_filter(sm_df, platform_list, account_category, account_identity, account_type, account_location, time_frame, relative_date, start_date, end_date, filter_index=None,
+                     labels=None, label_match='any', label_index=None):
     ## Filter the dataframe based on the selected platforms and the selected labels
-    filtered_df = sm_df[sm_df['platform'].isin(platform_list)]
-    filtered_weekly_df = weekly_df
-    filtered_weekly_df['weekAuthored'] = pd.to_datetime(filtered_weekly_df['weekAuthored'])
-    filtered_symptoms_df = symptoms_df
-
-    # Account Category
-    for account in account_category:
-        filtered_df = filtered_df[filtered_df[account] == 1]
-    
-    # Account Identity
-    if account_identity != 'all':
-        filtered_df = filtered_df[filtered_df[account_identity] == 1]
-    
-    # Account Type
-    if account_type != 'all':
-        if account_type == 'institutional':
-            filtered_df = filtered_df[filtered_df['institutional'] == 1]
-        else:
-            filtered_df = filtered_df[filtered_df['institutional'] == 0]
-
-    # Acccount Location
-    if account_location != 'all':
-        if account_location == 'georgia':
-            filtered_df = filtered_df[filtered_df['georgia'] == 1]
-        else:
-            filtered_df = filtered_df[filtered_df['georgia'] == 0]
+    # The indexes should be built once at load (see dashboard.py); building them here is only a fallback
+    if filter_index is None:
+        filter_index = FilterIndex(sm_df)
+
+    mask = filter_index.mask(platform_list, account_category, account_identity, account_type, account_location)
+
+    # Free-form post labels: rows carrying any (or all) of the given labels
+    if labels:
+        if label_index is None:
+            label_index = LabelIndex(sm_df)
+        mask &= label_index.mask(labels, label_match)
 
     # Relative vs. Custom Date Range
-    if time_frame == 'relative':
-        current_date = filtered_df['authoredAt'].max()
-        start_date = None
-
-        if relative_date != 'All Dates':
-            end_date = current_date.date()
-            if relative_date == 'Last 7 Days':
-                start_date = current_date - pd.DateOffset(days=7)
-                start_date = start_date.date()
-            elif relative_date == 'Last 15 Days':
-                start_date = current_date - pd.DateOffset(days=15)
-                start_date = start_date.date()
-            elif relative_date == 'Last 30 Days':
-                start_date = current_date - pd.DateOffset(days=30)
-                start_date = start_date.date()
-            elif relative_date == 'Last 60 Days':
-                start_date = current_date - pd.DateOffset(days=60)
-                start_date = start_date.date()
-            elif relative_date == 'Last 90 Days':
-                start_date = current_date - pd.DateOffset(days=90)
-                start_date = start_date.date()
-            elif relative_date == 'Last 6 Months':
-                start_date = current_date - pd.DateOffset(months=6)
-                start_date = start_date.date()
-            elif relative_date == 'Last 1 Year':
-                start_date = current_date - pd.DateOffset(years=1)
-                start_date = start_date.date()
-            filtered_df = filtered_df[filtered_df['authoredAt'] >= datetime.combine(start_date, datetime.min.time())]
-            filtered_weekly_df = filtered_weekly_df[filtered_weekly_df['weekAuthored'] >= datetime.combine(start_date, datetime.min.time())]
-            filtered_symptoms_df = symptoms_df[symptoms_df['weekAuthored'] >= datetime.combine(start_date, datetime.min.time())]
+    latest_date = filter_index.latest_date(mask) if time_frame == 'relative' else None
+    start_date, end_date, start, end = date_window(time_frame, relative_date, start_date, end_date, latest_date)
+
+    filtered_df = sm_df.take(filter_index.rows(mask, start=start, end=end))
 
+    return [filtered_df, start_date, end_date]
+
+def filter_key(platform_list, account_category, account_identity, account_type, account_location, time_frame, relative_date, start_date, end_date):
+    ## Normalized, hashable form of the sidebar state used as a cache key
+    if time_frame == 'relative':
+        # The custom range pickers are hidden and ignored in relative mode
+        start_date = end_date = None
     else:
-        date_format = '%Y-%m-%d'
-        start_date = datetime.strptime(start_date, date_format).date() if isinstance(start_date, str) else start_date
-        end_date = datetime.strptime(end_date, date_format).date() if isinstance(end_date, str) else end_date
-        filtered_df = filtered_df[(filtered_df['authoredAt'] >=  datetime.combine(start_date, datetime.min.time())) & (filtered_df['authoredAt'].date() <= datetime.combine(end_date, datetime.min.time()))]
-        filtered_weekly_df = filtered_weekly_df[(filtered_weekly_df['weekAuthored'] >= datetime.combine(start_date, datetime.min.time())) & (filtered_weekly_df['weekAuthored'].date() <= datetime.combine(end_date, datetime.min.time()))]
-        filtered_symptoms_df = symptoms_df[symptoms_df['weekAuthored'] >= datetime.combine(start_date, datetime.min.time())]
-
-    return [filtered_df, filtered_weekly_df, filtered_symptoms_df, start_date, end_date]
\ No newline at end of file
+        relative_date = None
+        start_date = str(start_date)[:10] if start_date is not None else None
+        end_date = str(end_date)[:10] if end_date is not None else None
+
+    return (tuple(sorted(platform_list or [])), tuple(sorted(account_category or [])),
+            account_identity, account_type, account_location, time_frame, relative_date, start_date, end_date)
+
+def default_filters():
+    # Sidebar values on first page load, in dataframe_filter argument order
+    metadata = load_metadata()
+    return (metadata['platforms'], [], 'all', 'all', 'all', 'relative', 'All Dates', metadata['min_date'], metadata['max_date'])
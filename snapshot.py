@@ -0,0 +1,79 @@
+# Import required libraries
+import numpy as np
+import pandas as pd
+from data import STORE_DIR, store_version, load_posts, load_rollup, load_symptoms, load_term_matrix
+from filter_index import FilterIndex
+from label_index import LabelIndex
+from ranking import EngagementIndex
+from symptom_index import SymptomIndex
+from rollup import Rollup
+from topic_index import TopicIndex
+
+class FrozenArrowArray(pd.arrays.ArrowExtensionArray):
+    ## Arrow-backed column that refuses in-place writes. The Arrow buffers are immutable anyway, but
+    ## ArrowExtensionArray.__setitem__ swaps a new array in under every reader of the frame.
+    ## Slices and takes stay frozen; an explicit copy is an ordinary, writable column.
+    def __setitem__(self, key, value):
+        raise ValueError('assignment destination is read-only')
+
+    def copy(self):
+        return pd.arrays.ArrowExtensionArray(self.__arrow_array__())
+
+def _read_only_array(values):
+    # Memory-mapped columns are read-only already and are not copied
+    if values.flags.writeable:
+        values = values.copy()
+        values.flags.writeable = False
+    return values
+
+def read_only(df):
+    ## Frame whose every column raises on an in-place write instead of changing data other threads
+    ## are reading: numpy columns and categorical codes over read-only arrays, Arrow columns frozen
+    columns = {}
+    for name, column in df.items():
+        if isinstance(column.dtype, pd.CategoricalDtype):
+            columns[name] = pd.Categorical.from_codes(_read_only_array(column.cat.codes.to_numpy()), dtype=column.dtype)
+        elif isinstance(column.array, pd.arrays.ArrowExtensionArray):
+            columns[name] = FrozenArrowArray(column.array.__arrow_array__())
+        else:
+            columns[name] = _read_only_array(column.to_numpy())
+    return pd.DataFrame(columns, index=df.index, copy=False)
+
+def _freeze(index):
+    # Mark the arrays an index holds (directly or in a dict) read-only
+    for value in vars(index).values():
+        for array in value.values() if isinstance(value, dict) else [value]:
+            if isinstance(array, np.ndarray):
+                array.flags.writeable = False
+
+class Snapshot:
+    ## One version of the data and every index built over it. A snapshot is complete before it is
+    ## published and nothing writes to it afterwards, so callbacks on any thread read it without
+    ## locks; a reload builds a new snapshot and swaps the reference (see dashboard.load_data).
+    def __init__(self, version, sm_df, symptoms, rollup_cube, term_matrix):
+        self.version = version
+        self.sm_df = sm_df = read_only(sm_df)
+
+        self.filter_index = FilterIndex(sm_df)
+        self.label_index = LabelIndex(sm_df)
+        self.engagement_index = EngagementIndex(sm_df)
+        self.symptom_index = SymptomIndex(sm_df, symptoms)
+        self.rollup = Rollup(rollup_cube)
+        self.topic_index = TopicIndex(sm_df, *term_matrix)
+
+        for index in [self.filter_index, self.label_index, self.engagement_index, self.symptom_index, self.rollup, self.topic_index]:
+            _freeze(index)
+
+def load_snapshot(store_dir=STORE_DIR):
+    ## Snapshot of the build being served (the posts stay memory-mapped). Every file is opened from
+    ## that one build directory, which is never written again once published, so a snapshot never
+    ## mixes files from two versions of the store. If two newer builds are published while the files
+    ## are being opened, the build being read may already be removed; the newest one is read instead.
+    while True:
+        version = store_version(store_dir)
+        try:
+            return Snapshot(version, load_posts(store_dir, version), load_symptoms(store_dir, version),
+                            load_rollup(store_dir, version), load_term_matrix(store_dir, version))
+        except FileNotFoundError:
+            if store_version(store_dir) == version:
+                raise
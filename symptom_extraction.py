@@ -0,0 +1,88 @@
+# Import required libraries
+import hashlib
+import json
+import os
+import pickle
+import sys
+import numpy as np
+import pandas as pd
+import spacy
+from spacy.matcher import PhraseMatcher
+from data import PICKLE_FILES, build_store, temporary_path, text_hash, write_pickle, write_symptom_matrix
+from symptom_index import PHRASE_SYMPTOMS, SYMPTOMS
+
+## Symptom tagging with the notebook's spaCy pipeline, run over whole batches of posts. Matching
+## symptom phrases on lowercased tokens only needs the tokenizer, so every other pipeline
+## component is disabled. Results are cached by text hash (per version of the phrase list), so
+## re-tagging only runs the pipeline on new or edited posts, or on everything after a pattern change.
+##
+##     python symptom_extraction.py [n_process]
+
+MODEL = 'en_core_web_sm'
+# Everything in en_core_web_sm after the tokenizer; none of it is used by the phrase matcher
+EXCLUDED_COMPONENTS = ['tok2vec', 'tagger', 'parser', 'senter', 'attribute_ruler', 'lemmatizer', 'ner']
+BATCH_SIZE = 1000
+CACHE_FILE = 'symptom_cache.pkl'
+
+# Changes whenever a phrase or its symptom group changes, which invalidates the cache
+PATTERNS_VERSION = hashlib.sha1(json.dumps(sorted(PHRASE_SYMPTOMS.items())).encode('utf-8')).hexdigest()[:16]
+
+def load_pipeline(model=MODEL):
+    ## Tokenizer-only pipeline and a phrase matcher labelling each phrase with its symptom group
+    nlp = spacy.load(model, exclude=EXCLUDED_COMPONENTS)
+    matcher = PhraseMatcher(nlp.vocab, attr='LOWER')
+    for phrase, symptom in PHRASE_SYMPTOMS.items():
+        matcher.add(symptom, [nlp.make_doc(phrase)])
+    return nlp, matcher
+
+def load_cache(path=CACHE_FILE):
+    # {text hash: packed symptom row} for the current phrase list
+    if os.path.exists(path):
+        with open(path, 'rb') as cache_file:
+            cache = pickle.load(cache_file)
+        if cache.get('version') == PATTERNS_VERSION:
+            return cache['rows']
+    return {}
+
+def save_cache(rows, path=CACHE_FILE):
+    with open(temporary_path(path), 'wb') as cache_file:
+        pickle.dump({'version': PATTERNS_VERSION, 'rows': rows}, cache_file)
+    os.replace(temporary_path(path), path)
+
+def extract_symptoms(texts, n_process=1, batch_size=BATCH_SIZE, cache=None, pipeline=None):
+    ## Bit-packed multi-hot symptom rows, one per text (the uint8 matrix the store keeps)
+    texts = [text if isinstance(text, str) else '' for text in texts]
+    hashes = [text_hash(text) for text in texts]
+    cache = {} if cache is None else cache
+    columns = {symptom: position for position, symptom in enumerate(SYMPTOMS)}
+
+    # Each distinct uncached text goes through the pipeline once
+    pending = {}
+    for text, hashed in zip(texts, hashes):
+        if hashed not in cache and hashed not in pending:
+            pending[hashed] = text
+
+    if pending:
+        nlp, matcher = pipeline or load_pipeline()
+        for hashed, doc in zip(pending, nlp.pipe(pending.values(), batch_size=batch_size, n_process=n_process)):
+            row = np.zeros(len(SYMPTOMS), dtype=np.uint8)
+            for match_id, start, end in matcher(doc):
+                row[columns[nlp.vocab.strings[match_id]]] = 1
+            cache[hashed] = np.packbits(row)
+
+    if not texts:
+        return np.zeros((0, (len(SYMPTOMS) + 7) // 8), dtype=np.uint8)
+    return np.stack([cache[hashed] for hashed in hashes])
+
+if __name__ == '__main__':
+    # Re-tag every post (python symptom_extraction.py [n_process]), then rebuild the columnar store
+    sm_df = pd.read_pickle(PICKLE_FILES['posts'])
+    cache = load_cache()
+    matrix = extract_symptoms(sm_df['actualText'].to_numpy(), n_process=int(sys.argv[1]) if len(sys.argv) > 1 else 1, cache=cache)
+    save_cache(cache)
+
+    # The matrix replaces the notebook's per-post symptom sets
+    write_symptom_matrix(matrix)
+    if 'symptoms' in sm_df.columns:
+        write_pickle(sm_df.drop(columns='symptoms'), PICKLE_FILES['posts'])
+    build_store()
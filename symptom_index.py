@@ -0,0 +1,119 @@
+# Import required libraries
+import numpy as np
+import pandas as pd
+
+# Symptom groups and the phrases that indicate them (same groups as the notebook's spaCy matcher)
+SYMPTOM_PHRASES = {
+    "fever": ["fever", "high temperature"],
+    "headache": ["headache", "migraine"],
+    "cough": ["cough", "coughing"],
+    "shortness_of_breath": ["shortness of breath"],
+    "fatigue": ["fatigue", "tiredness", "loss of energy"],
+    "sore_throat": ["sore", "sore throat"],
+    "congestion": ["congestion", "runny nose"],
+    "muscle_aches": ["muscle", "body aches"],
+    "nausea_vomiting": ["nausea", "vomiting"],
+    "diarrhea": ["diarrhea"],
+    "chills": ["chills", "shivering"],
+    "chest_head_pressure": ["pressure on chest", "weight on my chest", "pressure in head"],
+    "pink_eye": ["pink eye"],
+    "rash": ["rash"],
+    "dizziness": ["fainting", "dizziness"],
+    "seizures": ["seizures", "seizure"],
+    "confusion": ["confusion"],
+    "abdominal_pain": ["abdominal pain", "stomach pain"],
+    "loss_of_appetite": ["loss of appetite", "not hungry"],
+    "muscle_joint_pain": ["muscle", "joint pain"],
+    "difficulty_sleeping": ["difficulty sleeping", "insomnia", "can't sleep"],
+    "feeling_disoriented": ["feeling disoriented", "disoriented"],
+    "numbness_tingling": ["numbness", "tingling"],
+    "chest_pain": ["chest pain"],
+    "swelling_edema": ["swelling", "edema"],
+    "bruising": ["bruising"],
+    "loss_of_coordination": ["loss of coordination", "uncoordinated", "poor balance"],
+    "difficulty_speaking": ["difficulty speaking"],
+    "frequent_urination": ["frequent urination"],
+    "blood_in_urine": ["blood in urine", "hematuria"],
+    "skin_discoloration": ["skin discoloration", "discoloration"],
+    "decreased_urination": ["decreased urination"],
+    "swollen_glands": ["swollen glands", "enlarged glands"],
+    "hair_loss": ["hair loss"],
+    "chapped_lips": ["chapped lips", "chapped"],
+    "puffy_eyes": ["puffy eyes"],
+    "weight_gain": ["weight gain"],
+    "hoarse_voice": ["hoarse voice", "hoarse"],
+    "mood_changes": ["mood changes"],
+    "cognitive_issues": ["cognitive issues"],
+    "leg_swelling": ["leg swelling"],
+    "hair_thinning": ["hair thinning", "thinning"],
+    "dry_skin": ["dry skin"],
+    "weakness": ["weakness"],
+    "tremors": ["tremors"],
+    "depression": ["depression"],
+    "anxiety": ["anxiety"],
+    "irritability": ["irritability"],
+    "insomnia": ["insomnia"],
+    "feeling_cold": ["feeling cold", "feel cold"],
+    "feeling_hot": ["feeling hot", "feel hot", "sweats", "sweaty"],
+    "difficulty_breathing": ["difficulty breathing"],
+    "chest_tightness": ["chest tightness", "tightness in chest"],
+    "palpitations": ["palpitations", "heart palpitations", "fluttering", "racing heart", "heart fluttering", "irregular heartbeat"],
+    "lightheadedness": ["lightheadedness"],
+    "severe_headache": ["severe headache"],
+    "stroke_heart_attack": ["stroke", "heart attack"],
+    "vision_loss": ["vision loss"],
+    "paralysis": ["paralysis"],
+    "aphasia": ["aphasia"],
+    "weakness_in_arms": ["weakness in arms"],
+    "weakness_in_legs": ["weakness in legs"],
+    "facial_droop": ["facial droop"],
+    "slurred_speech": ["slurred speech"],
+    "difficulty_swallowing": ["difficulty swallowing"],
+    "decreased_sense_of_smell": ["decreased sense of smell", "sense of smell", "smell", "loss of smell"],
+    "decreased_sense_of_taste": ["decreased sense of taste", "taste", "sense of taste", "loss of taste", "no taste"]
+}
+
+SYMPTOMS = list(SYMPTOM_PHRASES)
+
+# A phrase counts towards the first group that lists it
+PHRASE_SYMPTOMS = {}
+for symptom, phrases in SYMPTOM_PHRASES.items():
+    for phrase in phrases:
+        PHRASE_SYMPTOMS.setdefault(phrase, symptom)
+
+def encode_symptoms(symptom_sets):
+    ## Multi-hot matrix from per-post collections of symptom names
+    columns = {symptom: position for position, symptom in enumerate(SYMPTOMS)}
+    matrix = np.zeros((len(symptom_sets), len(SYMPTOMS)), dtype=np.uint8)
+
+    for row, symptom_set in enumerate(symptom_sets):
+        if isinstance(symptom_set, (set, list, tuple, frozenset)):
+            for symptom in symptom_set:
+                if symptom in columns:
+                    matrix[row, columns[symptom]] = 1
+    return matrix
+
+class SymptomIndex:
+    ## Bit-packed multi-hot symptom matrix aligned with sm_df rows, so symptom counts for any
+    ## filter are one masked column sum. Tagging happens offline (see symptom_extraction.py).
+    def __init__(self, sm_df, packed):
+        self.n_rows = len(sm_df.index)
+        self.packed = packed
+
+        # Week each post falls in (weeks ending on Sunday, like the weekly keyword tables)
+        weeks = sm_df['authoredAt'].dt.to_period('W-SUN')
+        self.weeks = weeks.dt.end_time.dt.normalize().to_numpy(dtype='datetime64[ns]')
+
+    def matrix(self, rows):
+        return np.unpackbits(self.packed[rows], axis=1, count=len(SYMPTOMS))
+
+    def counts(self, rows):
+        # Number of selected posts mentioning each symptom
+        return pd.Series(self.matrix(rows).sum(axis=0, dtype=np.int64), index=SYMPTOMS)
+
+    def weeks_observed(self, rows):
+        # Number of weeks in which at least one selected post mentions each symptom
+        if len(rows) == 0:
+            return pd.Series(0, index=SYMPTOMS, dtype=np.int64)
+        weekly = pd.DataFrame(self.matrix(rows), columns=SYMPTOMS).groupby(self.weeks[rows]).max()
+        return weekly.sum().astype(np.int64)
@@ -0,0 +1,143 @@
+# Import required libraries
+import os
+import sys
+import numpy as np
+import pandas as pd
+from data import PICKLE_FILES
+from filter_index import FLAG_COLUMNS
+from preprocessing import FACEBOOK_COUNTERS, INSTAGRAM_COUNTERS, INTERESTING_AUTHORS, TWITTER_COUNTERS
+from symptom_index import PHRASE_SYMPTOMS, SYMPTOM_PHRASES
+
+## Fake posts shaped like the notebook's output, for benchmarks and demos without the real
+## (sensitive) pickles. Frames match what the dashboard loads: sm_df (updated_testing_data.pkl),
+## weekly_df (keywords.pkl) and symptoms_df (weekly_tf_idf.pkl).
+##
+##     python synthetic_data.py 100000 [output_dir]
+
+PLATFORMS = ['facebook', 'twitter', 'instagram']
+PLATFORM_SHARES = [0.5, 0.35, 0.15]
+
+LABELS = FLAG_COLUMNS + ['news']
+# Share of posts carrying each label
+LABEL_RATES = {'government': 0.08, 'media': 0.15, 'faith': 0.05, 'health': 0.2, 'covid': 0.3, 'misinfo': 0.03,
+               'partners': 0.04, 'trusted': 0.1, 'blackafam': 0.12, 'latinx': 0.08, 'institutional': 0.18,
+               'georgia': 0.35, 'news': 0.12}
+
+WORDS = ('vaccine clinic booster shots school masks family church community georgia atlanta savannah '
+         'macon county hospital doctors nurses testing site free appointment weekend children parents '
+         'update cases week health department outbreak variant omicron protect elderly neighbors help '
+         'support resources share information news report study research mandate policy vote city').split()
+SYMPTOM_TERMS = list(PHRASE_SYMPTOMS)
+
+N_AUTHORS = 5000
+START_DATE = pd.Timestamp('2022-04-10')
+DAYS = 730
+
+def _texts(rng, n_posts):
+    # 8-40 words each, with a symptom phrase in about one post in five; returns (texts, symptom sets)
+    lengths = rng.integers(8, 41, n_posts)
+    words = np.array(WORDS, dtype=object)[rng.integers(0, len(WORDS), lengths.sum())]
+    bounds = np.concatenate([[0], np.cumsum(lengths)])
+    phrases = np.where(rng.random(n_posts) < 0.2, np.array(SYMPTOM_TERMS, dtype=object)[rng.integers(0, len(SYMPTOM_TERMS), n_posts)], None)
+
+    texts = [' '.join(words[bounds[row]:bounds[row + 1]]) + (f' {phrase}' if phrase else '') for row, phrase in enumerate(phrases)]
+    symptoms = [{PHRASE_SYMPTOMS[phrase]} if phrase else set() for phrase in phrases]
+    return texts, symptoms
+
+def _raw(platform, counters, followers, account_type, post_id):
+    # Nested per-platform record, as stored by the collection pipeline
+    if platform == 'twitter':
+        return dict(counters, id=post_id, user={'followers_count': followers})
+    return {'id': post_id, 'statistics': {'actual': counters}, 'account': {'subscriberCount': followers, 'accountType': account_type}}
+
+def generate_posts(n_posts, seed=0):
+    ## sm_df with n_posts rows
+    rng = np.random.default_rng(seed)
+    platforms = np.array(PLATFORMS, dtype=object)[rng.choice(len(PLATFORMS), n_posts, p=PLATFORM_SHARES)]
+
+    # A few prolific authors (the interesting groups among them) and a long tail
+    authors = rng.permutation(np.array(INTERESTING_AUTHORS + [f'Account {number}' for number in range(N_AUTHORS)], dtype=object))
+    author_rows = np.minimum(rng.zipf(1.3, n_posts) - 1, len(authors) - 1)
+    authored = START_DATE + pd.to_timedelta(np.sort(rng.integers(0, DAYS, n_posts)), unit='D')
+
+    # Heavy-tailed engagement counters and follower counts
+    counter_keys = {'twitter': list(TWITTER_COUNTERS.values()), 'facebook': list(FACEBOOK_COUNTERS.values()),
+                    'instagram': list(INSTAGRAM_COUNTERS.values())}
+    counts = rng.negative_binomial(0.5, 0.02, (n_posts, max(len(keys) for keys in counter_keys.values())))
+    followers = rng.lognormal(7, 2, n_posts).astype(np.int64)
+    group_accounts = rng.random(n_posts) < 0.3
+
+    raws = []
+    for row, platform in enumerate(platforms):
+        counters = dict(zip(counter_keys[platform], counts[row].tolist()))
+        account_type = 'facebook_group' if group_accounts[row] else f'{platform}_page'
+        raws.append(_raw(platform, counters, int(followers[row]), account_type, row))
+
+    label_flags = {label: rng.random(n_posts) < rate for label, rate in LABEL_RATES.items()}
+    labels = [[label for label in LABELS if label_flags[label][row]] for row in range(n_posts)]
+
+    texts, symptoms = _texts(rng, n_posts)
+    sentiment = rng.dirichlet([2, 5, 2], n_posts).astype(np.float32)
+
+    sm_df = pd.DataFrame({
+        'platform': platforms,
+        'author': authors[author_rows],
+        'url': [f'https://example.com/posts/{row}' for row in range(n_posts)],
+        'authoredAt': authored,
+        'content': texts,
+        'text_translated': None,
+        'actualText': texts,
+        'raw': raws,
+        'labels': labels,
+        'engagementRaw': counts.sum(axis=1),
+        'topics': [[] for row in range(n_posts)],
+        'symptoms': symptoms,
+        'negative': sentiment[:, 0],
+        'neutral': sentiment[:, 1],
+        'positive': sentiment[:, 2],
+        'compound': np.clip(sentiment[:, 2] - sentiment[:, 0] + rng.normal(0, 0.2, n_posts), -1, 1).astype(np.float32),
+    })
+    sm_df['weekAuthored'] = sm_df['authoredAt'].dt.isocalendar().week
+
+    # One-Hot Encoding Account Labels
+    for label in LABELS:
+        sm_df[label] = label_flags[label].astype(np.int64)
+    return sm_df
+
+def generate_weekly(sm_df, seed=0):
+    ## keywords.pkl and weekly_tf_idf.pkl frames for the weeks covered by sm_df
+    rng = np.random.default_rng(seed)
+    weeks = pd.date_range(sm_df['authoredAt'].min(), sm_df['authoredAt'].max() + pd.Timedelta(days=6), freq='W')
+    post_counts = sm_df.groupby(pd.Grouper(key='authoredAt', freq='W')).size().reindex(weeks, fill_value=0)
+
+    keywords = [list(rng.choice(WORDS, 20, replace=False)) for week in weeks]
+    weekly_df = pd.DataFrame(keywords, columns=range(20))
+    weekly_df.insert(0, 'weekAuthored', weeks)
+
+    symptom_names = list(SYMPTOM_PHRASES)
+    symptoms_df = pd.DataFrame({
+        'weekAuthored': weeks,
+        'textProcessed': '',
+        'count': post_counts.to_numpy(),
+        'tfIdfMatrix': [{} for week in weeks],
+        'values': keywords,
+        'symptoms': [set(rng.choice(symptom_names, rng.integers(0, 12), replace=False)) for week in weeks],
+    })
+    return weekly_df, symptoms_df
+
+def generate(n_posts, seed=0):
+    # (sm_df, weekly_df, symptoms_df)
+    sm_df = generate_posts(n_posts, seed)
+    weekly_df, symptoms_df = generate_weekly(sm_df, seed)
+    return sm_df, weekly_df, symptoms_df
+
+def write_pickles(n_posts, directory='.', seed=0):
+    ## The three notebook pickles, ready for data.build_store
+    sm_df, weekly_df, symptoms_df = generate(n_posts, seed)
+    os.makedirs(directory, exist_ok=True)
+    sm_df.to_pickle(os.path.join(directory, PICKLE_FILES['posts']))
+    weekly_df.to_pickle(os.path.join(directory, PICKLE_FILES['keywords']))
+    symptoms_df.to_pickle(os.path.join(directory, PICKLE_FILES['weekly']))
+
+if __name__ == '__main__':
+    write_pickles(int(sys.argv[1]), sys.argv[2] if len(sys.argv) > 2 else '.')
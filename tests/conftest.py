@@ -0,0 +1,25 @@
+# Import required libraries
+import os
+import sys
+import pytest
+
+# The dashboard's modules live at the top of the repository
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from preprocessing import add_engagement_columns, add_follower_columns
+from synthetic_data import generate
+
+## Shared synthetic data (see synthetic_data.py). Each index is checked against the pandas
+## expression it replaces, over the same posts.
+
+N_POSTS = 3000
+
+@pytest.fixture(scope='session')
+def frames():
+    # (sm_df, weekly_df, symptoms_df) with the columns build_store adds
+    sm_df, weekly_df, symptoms_df = generate(N_POSTS, seed=7)
+    return add_follower_columns(add_engagement_columns(sm_df)), weekly_df, symptoms_df
+
+@pytest.fixture(scope='session')
+def sm_df(frames):
+    return frames[0]
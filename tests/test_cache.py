@@ -0,0 +1,48 @@
+# Import required libraries
+import threading
+import time
+from cache import ResultCache
+
+def test_evicts_least_recently_used_over_budget():
+    cache = ResultCache(max_bytes=100)
+    cache.put('a', 1, size=40)
+    cache.put('b', 2, size=40)
+    assert cache.get('a') == 1
+    cache.put('c', 3, size=40)
+    assert cache.get('b') is None
+    assert cache.get('a') == 1 and cache.get('c') == 3
+    assert cache.stats()['bytes'] == 80
+
+def test_skips_entries_larger_than_budget():
+    cache = ResultCache(max_bytes=100)
+    assert cache.put('big', 'value', size=101) == 'value'
+    assert cache.get('big') is None
+
+def test_new_version_drops_entries():
+    cache = ResultCache(max_bytes=100)
+    cache.set_version(1)
+    cache.put('a', 1, size=10)
+    cache.set_version(1)
+    assert cache.get('a') == 1
+    cache.set_version(2)
+    assert cache.get('a') is None and cache.stats()['bytes'] == 0
+
+def test_concurrent_callers_share_one_computation():
+    cache = ResultCache(max_bytes=1000)
+    calls = []
+
+    def compute():
+        calls.append(1)
+        time.sleep(0.2)
+        return 'result'
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_compute('key', compute))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == ['result'] * 8 and len(calls) == 1
+    assert cache.stats()['misses'] == 8 and cache.stats()['hits'] == 0
+    assert cache.get_or_compute('key', compute) == 'result' and len(calls) == 1
@@ -0,0 +1,81 @@
+# Import required libraries
+import os
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pytest
+import data
+from data import PICKLE_FILES, STORE_FILES, build_store, update_store, store_version, load_metadata, read_symptom_matrix
+from snapshot import load_snapshot
+
+N_OLD = 2400
+
+def write_pickles(sm_df, weekly_df, symptoms_df):
+    sm_df.to_pickle(PICKLE_FILES['posts'])
+    weekly_df.to_pickle(PICKLE_FILES['keywords'])
+    symptoms_df.to_pickle(PICKLE_FILES['weekly'])
+
+def build_files(store_dir):
+    directory = os.path.join(store_dir, store_version(store_dir))
+    return {name: os.path.join(directory, name) for name in STORE_FILES}
+
+def same_file(path, other):
+    if path.endswith('.npy'):
+        return np.array_equal(np.load(path), np.load(other))
+    if path.endswith('.arrow'):
+        return data._read_table(path).equals(data._read_table(other))
+    with open(path) as first, open(other) as second:
+        return first.read() == second.read()
+
+@pytest.fixture
+def updated_store(tmp_path, monkeypatch, frames):
+    # A store built from the first N_OLD posts, then updated with the rest
+    sm_df, weekly_df, symptoms_df = frames
+    monkeypatch.chdir(tmp_path)
+    write_pickles(sm_df.iloc[:N_OLD], weekly_df, symptoms_df)
+    build_store('store')
+    first = store_version('store')
+    update_store(sm_df, len(sm_df.index) - N_OLD, read_symptom_matrix(sm_df), symptoms_df, weekly_df, 'store')
+    return first
+
+def test_update_matches_full_build(updated_store, frames):
+    write_pickles(*frames)
+    build_store('full')
+    updated, full = build_files('store'), build_files('full')
+    for name in STORE_FILES:
+        assert same_file(updated[name], full[name]), name
+
+def test_builds_are_published_whole(updated_store, frames):
+    sm_df, weekly_df, symptoms_df = frames
+    # The replaced build stays for readers still opening it; older ones are removed
+    assert sorted(os.listdir('store')) == sorted(['CURRENT', updated_store, store_version('store')])
+    assert load_metadata('store')['rows'] == len(sm_df.index)
+    assert load_metadata('store', updated_store)['rows'] == N_OLD
+
+    second = store_version('store')
+    write_pickles(*frames)
+    build_store('store')
+    assert sorted(os.listdir('store')) == sorted(['CURRENT', second, store_version('store')])
+
+def test_update_refuses_other_posts(updated_store, frames):
+    sm_df, weekly_df, symptoms_df = frames
+    with pytest.raises(ValueError):
+        update_store(sm_df, 100, read_symptom_matrix(sm_df), symptoms_df, weekly_df, 'store')
+
+def test_snapshot_reads_one_build(updated_store, frames):
+    sm_df = frames[0]
+    snapshot = load_snapshot('store')
+    assert snapshot.version == store_version('store')
+    assert len(snapshot.sm_df.index) == len(snapshot.symptom_index.packed) == len(snapshot.topic_index.indptr) - 1 == len(sm_df.index)
+    assert snapshot.rollup.cube['posts'].sum() == len(sm_df.index)
+    assert snapshot.symptom_index.counts(np.arange(len(sm_df.index))).sum() == sm_df['symptoms'].apply(len).sum()
+
+def test_snapshot_columns_are_read_only(updated_store):
+    sm_df = load_snapshot('store').sm_df
+    for column in ['engagementRaw', 'platform', 'actualText', 'authoredAt']:
+        with pytest.raises(ValueError):
+            sm_df[column].array[0] = sm_df[column].iloc[1]
+    # A copy is an ordinary frame again
+    copy = sm_df[['actualText']].copy()
+    copy.loc[0, 'actualText'] = 'changed'
+    assert copy['actualText'].iloc[0] == 'changed'
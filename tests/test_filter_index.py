@@ -0,0 +1,48 @@
+# Import required libraries
+import numpy as np
+import pandas as pd
+import pytest
+from filter_index import FilterIndex
+
+SELECTIONS = [
+    (['facebook', 'twitter', 'instagram'], [], 'all', 'all', 'all'),
+    (['twitter'], [], 'all', 'all', 'all'),
+    (['facebook', 'instagram'], ['health'], 'all', 'institutional', 'all'),
+    (['facebook', 'twitter'], ['covid', 'media'], 'blackafam', 'all', 'georgia'),
+    (['instagram', 'twitter'], [], 'latinx', 'non-institutional', 'non-georgia'),
+    (['facebook'], ['not-a-label'], 'all', 'all', 'all'),
+    ([], [], 'all', 'all', 'all'),
+]
+
+def pandas_filter(sm_df, platform_list, account_category, account_identity, account_type, account_location):
+    # The boolean filtering dataframe_filter did before the index
+    filtered_df = sm_df[sm_df['platform'].isin(platform_list)]
+    for account in account_category:
+        filtered_df = filtered_df[filtered_df[account] == 1] if account in filtered_df.columns else filtered_df.iloc[:0]
+    if account_identity != 'all':
+        filtered_df = filtered_df[filtered_df[account_identity] == 1]
+    if account_type != 'all':
+        filtered_df = filtered_df[filtered_df['institutional'] == (1 if account_type == 'institutional' else 0)]
+    if account_location != 'all':
+        filtered_df = filtered_df[filtered_df['georgia'] == (1 if account_location == 'georgia' else 0)]
+    return filtered_df
+
+@pytest.mark.parametrize('selection', SELECTIONS)
+def test_mask_matches_boolean_filtering(sm_df, selection):
+    index = FilterIndex(sm_df)
+    expected = pandas_filter(sm_df, *selection)
+    assert np.array_equal(np.flatnonzero(index.mask(*selection)), expected.index.to_numpy())
+
+@pytest.mark.parametrize('selection', SELECTIONS[:4])
+def test_rows_apply_date_bounds(sm_df, selection):
+    index = FilterIndex(sm_df)
+    start, end = pd.Timestamp('2022-09-01'), pd.Timestamp('2023-03-15')
+    expected = pandas_filter(sm_df, *selection)
+    expected = expected[(expected['authoredAt'] >= start) & (expected['authoredAt'] < end)]
+    assert np.array_equal(index.rows(index.mask(*selection), start, end), expected.index.to_numpy())
+
+def test_latest_date(sm_df):
+    index = FilterIndex(sm_df)
+    mask = index.mask(['instagram'], ['covid'], 'all', 'all', 'all')
+    assert index.latest_date(mask) == pandas_filter(sm_df, ['instagram'], ['covid'], 'all', 'all', 'all')['authoredAt'].max()
+    assert index.latest_date(np.zeros(len(sm_df.index), dtype=bool)) is pd.NaT
@@ -0,0 +1,68 @@
+# Import required libraries
+import time
+import pytest
+from jobs import JobManager
+
+def square(value):
+    time.sleep(0.3)
+    return value * value
+
+def failing(value):
+    raise ValueError(f'bad value {value}')
+
+def counting(set_progress, steps):
+    for step in range(steps):
+        set_progress((step, steps))
+        time.sleep(0.1)
+    return steps
+
+@pytest.fixture
+def manager(tmp_path):
+    manager = JobManager(str(tmp_path / 'jobs'), processes=2)
+    for fn, progress in [(square, False), (failing, False), (counting, True)]:
+        manager.make_job_fn(fn, progress, key=fn.__name__)
+    yield manager
+    manager.restart()
+
+def wait(manager, timeout=30):
+    end = time.time() + timeout
+    while manager.stats()['running'] and time.time() < end:
+        time.sleep(0.02)
+
+def test_identical_requests_share_a_job(manager):
+    # Results are kept for later requests when they are cached, as the app does per data version
+    manager.cache_by = [lambda: 'version']
+    jobs = [manager.call_job_fn('square-3', 'square', [3], None) for _ in range(3)]
+    assert manager.job_running(jobs[0])
+    wait(manager)
+    assert manager.get_result('square-3', jobs[0]) == 9
+    assert manager.stats() == {'running': 0, 'submitted': 1, 'shared': 2}
+
+    manager.call_job_fn('square-3', 'square', [3], None)
+    assert manager.stats()['submitted'] == 1 and manager.get_result('square-3', jobs[0]) == 9
+
+def test_errors_are_reported_and_not_kept(manager):
+    job = manager.call_job_fn('failing-1', 'failing', [1], None)
+    wait(manager)
+    result = manager.get_result('failing-1', job)
+    assert result['long_callback_error']['msg'] == 'bad value 1'
+    assert not manager.result_ready('failing-1')
+
+def test_progress_is_readable_until_the_job_finishes(manager):
+    job = manager.call_job_fn('counting-5', 'counting', [5], None)
+    seen = []
+    while manager.job_running(job):
+        progress = manager.get_progress('counting-5')
+        if progress is not None:
+            seen.append(tuple(progress))
+        time.sleep(0.02)
+    wait(manager)
+    # Every poller sees the progress: reading it does not remove it
+    assert len(seen) > 1 and seen == sorted(seen)
+    assert manager.get_progress('counting-5') is None
+    assert manager.get_result('counting-5', job) == 5
+
+def test_stored_data(manager):
+    manager.store_data('page', {'rows': [1, 2]})
+    assert manager.read_data('page') == {'rows': [1, 2]}
+    assert manager.read_data('missing', 'default') == 'default'
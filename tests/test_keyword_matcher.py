@@ -0,0 +1,34 @@
+# Import required libraries
+import re
+import pandas as pd
+from keyword_matcher import KeywordMatcher, keyword_matcher
+
+KEYWORDS = ['vaccine', 'booster shots', 'free appointment', 'covid-19', 'georgia', "can't sleep", 'school masks']
+
+def pandas_contains(texts, keywords):
+    # str.contains over whole tokens, case-insensitively: a keyword matches where its words follow
+    # one another with only separators between them
+    token = r"[\w'@#-]"
+    phrases = [r'[^\w\'@#-]+'.join(re.escape(word) for word in keyword.lower().split()) for keyword in keywords]
+    pattern = rf"(?<!{token})(?:{'|'.join(phrases)})(?!{token})"
+    return pd.Series(texts).str.contains(pattern, case=False, regex=True).to_numpy()
+
+def test_find_matches_str_contains(sm_df):
+    texts = list(sm_df['actualText'].head(2000)) + ['Booster  shots, free appointment!', 'COVID-19 school-masks', "I can't sleep",
+                                                     'vaccines', 'Georgia.', None]
+    matcher = KeywordMatcher(KEYWORDS)
+    assert [bool(matcher.find(text)) for text in texts] == list(pandas_contains([text or '' for text in texts], KEYWORDS))
+
+def test_find_reports_each_keyword_once_in_order():
+    matcher = KeywordMatcher(['clinic', 'free clinic', 'weekend', 'clinic'])
+    hits = matcher.find('This weekend: free clinic, and the clinic is open next weekend')
+    assert hits[0] == 'weekend' and sorted(hits[1:]) == ['clinic', 'free clinic']
+    assert KeywordMatcher([]).find('anything') == []
+
+def test_search_stops_at_limit(sm_df):
+    texts = sm_df['actualText'].to_numpy()
+    matcher = keyword_matcher(tuple(KEYWORDS))
+    matches = list(matcher.search(texts, limit=5))
+    expected = pandas_contains(texts, KEYWORDS).nonzero()[0][:5]
+    assert [row for row, hits in matches] == list(expected)
+    assert keyword_matcher(tuple(KEYWORDS)) is matcher
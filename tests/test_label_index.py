@@ -0,0 +1,21 @@
+# Import required libraries
+import numpy as np
+import pytest
+from label_index import LabelIndex, NEWS_LABELS
+
+@pytest.mark.parametrize('labels', [NEWS_LABELS, ['covid'], ['misinfo', 'faith', 'latinx'], ['not-a-label'], []])
+def test_any_matches_apply(sm_df, labels):
+    expected = sm_df['labels'].apply(lambda x: any(label in x for label in labels)).to_numpy()
+    assert np.array_equal(LabelIndex(sm_df).mask(labels), expected)
+
+@pytest.mark.parametrize('labels', [NEWS_LABELS, ['covid', 'health'], ['covid', 'not-a-label']])
+def test_all_matches_apply(sm_df, labels):
+    expected = sm_df['labels'].apply(lambda x: all(label in x for label in labels)).to_numpy()
+    assert np.array_equal(LabelIndex(sm_df).mask(labels, match='all'), expected)
+
+def test_sets_and_missing_labels(sm_df):
+    # Pickled posts may hold sets or no labels at all
+    df = sm_df[['labels']].head(50).copy()
+    df['labels'] = [set(value) if row % 2 else None if row % 5 == 0 else value for row, value in enumerate(df['labels'])]
+    expected = np.array([bool(value) and 'covid' in value for value in df['labels']])
+    assert np.array_equal(LabelIndex(df).mask(['covid']), expected)
@@ -0,0 +1,27 @@
+# Import required libraries
+import numpy as np
+import pytest
+from filter_index import FilterIndex
+from ranking import EngagementIndex, RANKINGS
+
+def pandas_top(sm_df, rows, k, column):
+    # The sort the popular posts panel did before the index (ties keep row order)
+    return sm_df.iloc[rows].sort_values(by=column, ascending=False, kind='stable').head(k).index.to_numpy()
+
+@pytest.mark.parametrize('ranking', list(RANKINGS))
+@pytest.mark.parametrize('k', [1, 20, 100])
+@pytest.mark.parametrize('selection', [
+    (['facebook', 'twitter', 'instagram'], [], 'all', 'all', 'all'),
+    (['twitter'], ['health'], 'all', 'all', 'all'),
+    (['facebook'], ['covid', 'media'], 'all', 'institutional', 'georgia'),
+])
+def test_top_k_matches_sort_values(sm_df, ranking, k, selection):
+    rows = np.flatnonzero(FilterIndex(sm_df).mask(*selection))
+    top = EngagementIndex(sm_df).top_k(rows, k, ranking)
+    assert np.array_equal(top, pandas_top(sm_df, rows, k, RANKINGS[ranking]))
+
+def test_top_k_of_few_rows(sm_df):
+    index = EngagementIndex(sm_df)
+    rows = np.array([5, 17, 40])
+    assert np.array_equal(index.top_k(rows, 20), pandas_top(sm_df, rows, 20, 'engagementRaw'))
+    assert len(index.top_k(np.array([], dtype=np.int64), 20)) == 0
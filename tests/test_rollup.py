@@ -0,0 +1,61 @@
+# Import required libraries
+import numpy as np
+import pandas as pd
+import pytest
+from preprocessing import ENGAGEMENT_COLUMNS
+from label_index import NEWS_LABELS
+from rollup import Rollup, build_rollup, merge_rollup, ROLLING_WINDOWS
+from test_filter_index import pandas_filter
+
+SELECTIONS = [
+    (['facebook', 'twitter', 'instagram'], [], 'all', 'all', 'all'),
+    (['twitter', 'instagram'], ['health'], 'all', 'all', 'georgia'),
+    (['facebook'], ['covid'], 'blackafam', 'non-institutional', 'all'),
+]
+START, END = pd.Timestamp('2022-10-01'), pd.Timestamp('2023-06-01')
+
+@pytest.fixture(scope='module')
+def rollup(sm_df):
+    return Rollup(build_rollup(sm_df))
+
+def selected_posts(sm_df, selection, start=START, end=END):
+    posts = pandas_filter(sm_df, *selection)
+    return posts[(posts['authoredAt'] >= start) & (posts['authoredAt'] < end)]
+
+@pytest.mark.parametrize('selection', SELECTIONS)
+def test_sums_match_groupby(sm_df, rollup, selection):
+    cells = rollup.cells(rollup.mask(*selection), START, END)
+    posts = selected_posts(sm_df, selection)
+    assert cells['posts'].sum() == len(posts.index)
+    for column in ['engagementRaw', 'comments'] + ENGAGEMENT_COLUMNS:
+        assert cells[column].sum() == posts[column].sum(), column
+    assert np.isclose(cells['compound'].sum(), posts['compound'].astype(np.float64).sum())
+
+@pytest.mark.parametrize('selection', SELECTIONS)
+def test_post_counts_match_groupby(sm_df, rollup, selection):
+    cells = rollup.cells(rollup.mask(*selection), START, END)
+    posts = selected_posts(sm_df, selection)
+    expected = posts.groupby(posts['authoredAt'].dt.normalize()).size()
+    pd.testing.assert_series_equal(rollup.post_counts(cells), expected, check_names=False, check_dtype=False)
+
+    news = posts[posts['labels'].apply(lambda x: any(label in x for label in NEWS_LABELS))]
+    expected = news.groupby(news['authoredAt'].dt.normalize()).size()
+    pd.testing.assert_series_equal(rollup.post_counts(rollup.news_institutional(cells)), expected, check_names=False, check_dtype=False)
+
+def test_sentiment_trend_matches_rolling(sm_df, rollup):
+    selection = SELECTIONS[1]
+    trend = rollup.sentiment_trend(rollup.cells(rollup.mask(*selection), START, END))
+    posts = selected_posts(sm_df, selection)
+    for platform, platform_posts in posts.groupby('platform'):
+        daily = platform_posts.groupby(platform_posts['authoredAt'].dt.normalize())['compound'].agg(['sum', 'count'])
+        daily = daily.reindex(pd.date_range(daily.index.min(), daily.index.max(), freq='D'), fill_value=0)
+        platform_trend = trend[trend['platform'] == platform].set_index('authoredAt')
+        assert np.array_equal(platform_trend.index, daily.index)
+        assert np.allclose(platform_trend['compound'], daily['sum'] / daily['count'].where(daily['count'] > 0), equal_nan=True)
+        for window in ROLLING_WINDOWS:
+            sums = daily.rolling(window, min_periods=1).sum()
+            assert np.allclose(platform_trend[f'compound_{window}day'], sums['sum'] / sums['count'].where(sums['count'] > 0), equal_nan=True)
+
+def test_merge_rollup_matches_full_build(sm_df):
+    merged = merge_rollup(build_rollup(sm_df.iloc[:2000]), sm_df.iloc[2000:])
+    pd.testing.assert_frame_equal(merged, build_rollup(sm_df), check_dtype=False)
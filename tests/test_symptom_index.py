@@ -0,0 +1,29 @@
+# Import required libraries
+import numpy as np
+import pandas as pd
+import pytest
+from symptom_index import SymptomIndex, SYMPTOMS, encode_symptoms
+
+@pytest.fixture(scope='module')
+def index(sm_df):
+    return SymptomIndex(sm_df, np.packbits(encode_symptoms(sm_df['symptoms'].to_numpy()).astype(bool), axis=1))
+
+@pytest.fixture(scope='module')
+def rows(sm_df):
+    return np.flatnonzero(sm_df['platform'].to_numpy() != 'twitter')
+
+def test_counts_match_value_counts(sm_df, index, rows):
+    expected = sm_df['symptoms'].iloc[rows].explode().value_counts().reindex(SYMPTOMS, fill_value=0)
+    pd.testing.assert_series_equal(index.counts(rows), expected, check_names=False, check_dtype=False)
+
+def test_weeks_observed_match_groupby(sm_df, index, rows):
+    posts = sm_df.iloc[rows]
+    mentions = posts[['authoredAt', 'symptoms']].explode('symptoms').dropna()
+    expected = mentions.groupby('symptoms')['authoredAt'].apply(lambda dates: dates.dt.to_period('W-SUN').nunique())
+    expected = expected.reindex(SYMPTOMS, fill_value=0)
+    pd.testing.assert_series_equal(index.weeks_observed(rows), expected, check_names=False, check_dtype=False)
+
+def test_no_rows(index):
+    rows = np.zeros(0, dtype=np.int64)
+    assert index.counts(rows).sum() == 0
+    assert index.weeks_observed(rows).sum() == 0
@@ -0,0 +1,42 @@
+# Import required libraries
+import numpy as np
+import pandas as pd
+import pytest
+from topic_index import TopicIndex, build_term_matrix, document_terms, KEYWORDS_PER_WEEK
+
+@pytest.fixture(scope='module')
+def matrix(sm_df):
+    return build_term_matrix(sm_df['actualText'].to_numpy())
+
+def pandas_keywords(sm_df, rows, terms, k=KEYWORDS_PER_WEEK):
+    # Weekly TF-IDF top terms computed over exploded terms with groupby
+    posts = sm_df.iloc[rows]
+    exploded = pd.DataFrame({'week': posts['authoredAt'].dt.to_period('W-SUN').dt.end_time.dt.normalize().to_numpy(),
+                             'term': [document_terms(text) for text in posts['actualText']]}).explode('term').dropna()
+    counts = exploded.groupby(['week', 'term']).size().rename('count').reset_index()
+    week_totals = counts.groupby('week')['count'].transform('sum')
+    documents = counts.groupby('term')['week'].transform('size')
+    idf = np.log10((1 + counts['week'].nunique()) / (1 + documents)) + 1
+    counts['score'] = counts['count'] / week_totals * idf
+    counts['position'] = counts['term'].map({term: position for position, term in enumerate(terms)})
+
+    records = []
+    for week, week_counts in counts.groupby('week'):
+        top = list(week_counts.sort_values(['score', 'position'], ascending=[False, True])['term'].head(k))
+        records.append([week] + top + [None] * (k - len(top)))
+    return pd.DataFrame(records, columns=['weekAuthored'] + list(range(k)))
+
+@pytest.mark.parametrize('platforms', [['facebook', 'twitter', 'instagram'], ['instagram']])
+def test_weekly_keywords_match_groupby(sm_df, matrix, platforms):
+    rows = np.flatnonzero(sm_df['platform'].isin(platforms).to_numpy())
+    keywords = TopicIndex(sm_df, *matrix).weekly_keywords(rows)
+    pd.testing.assert_frame_equal(keywords, pandas_keywords(sm_df, rows, matrix[3]), check_dtype=False)
+
+def test_appended_rows_match_full_build(sm_df, matrix):
+    texts = sm_df['actualText'].to_numpy()
+    appended = build_term_matrix(texts, build_term_matrix(texts[:1000]))
+    for built, expected in zip(appended, matrix):
+        assert np.array_equal(built, expected)
+
+def test_no_rows(sm_df, matrix):
+    assert TopicIndex(sm_df, *matrix).weekly_keywords(np.zeros(0, dtype=np.int64)).empty
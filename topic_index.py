@@ -0,0 +1,136 @@
+# Import required libraries
+import numpy as np
+import pandas as pd
+from keyword_matcher import tokenize
+from stopwords import STOP_WORDS, KEYWORD_STOPWORDS
+
+KEYWORDS_PER_WEEK = 20
+
+# Weeks with fewer than n_terms / SPARSE_WEEK_RATIO entries are summed by sorting their terms
+# rather than with a vocabulary-sized count array
+SPARSE_WEEK_RATIO = 8
+
+def keyword_allowed(term):
+    # Same rules as the weekly keyword lists: no numbers, short words or stopword phrases
+    return not term.isdigit() and len(term) > 3 and all(word not in KEYWORD_STOPWORDS for word in term.split())
+
+def document_terms(text):
+    ## Unigrams and bigrams of a post, with the project's stopword lists applied
+    if not isinstance(text, str):
+        return []
+    words = tokenize(text)
+    terms = [word for word in words if word not in STOP_WORDS]
+    terms += [f'{first} {second}' for first, second in zip(words, words[1:]) if first not in STOP_WORDS and second not in STOP_WORDS]
+    return [term for term in terms if keyword_allowed(term)]
+
+def text_hashes(texts):
+    # 64-bit hash of each text, recorded with the matrix to tell which of its rows are still valid
+    return pd.util.hash_array(np.array([text if isinstance(text, str) else '' for text in texts], dtype=object))
+
+def build_term_matrix(texts, previous=None):
+    ## CSR document-term matrix of term counts: (indptr, indices, data, terms). `previous` is the
+    ## matrix of the first texts (as built by an earlier call); only the texts after it are
+    ## tokenized, and their rows are appended with the vocabulary extended in the same order.
+    if previous is None:
+        previous = (np.zeros(1, dtype=np.int64), np.zeros(0, dtype=np.int32), np.zeros(0, dtype=np.float32), [])
+    old_indptr, old_indices, old_data, terms = previous
+    vocabulary = {term: column for column, term in enumerate(terms)}
+    start = len(old_indptr) - 1
+    indptr = np.zeros(len(texts) - start, dtype=np.int64)
+    indices = []
+    data = []
+
+    for row, text in enumerate(texts[start:]):
+        counts = {}
+        for term in document_terms(text):
+            column = vocabulary.setdefault(term, len(vocabulary))
+            counts[column] = counts.get(column, 0) + 1
+        for column in sorted(counts):
+            indices.append(column)
+            data.append(counts[column])
+        indptr[row] = len(indices)
+
+    return (np.concatenate([old_indptr, old_indptr[-1] + indptr]),
+            np.concatenate([old_indices, np.array(indices, dtype=np.int32)]),
+            np.concatenate([old_data, np.array(data, dtype=np.float32)]),
+            list(vocabulary))
+
+class TopicIndex:
+    ## Hot topics for any subset of posts: the subset's rows of the document-term matrix are summed
+    ## per week, each week is scored as one TF-IDF document, and argpartition picks its top terms.
+    def __init__(self, sm_df, indptr, indices, data, terms):
+        self.indptr = indptr
+        self.indices = indices
+        self.data = data
+        self.terms = terms
+        self.n_terms = len(terms)
+
+        # Week each post falls in (weeks ending on Sunday, like keywords.pkl)
+        weeks = sm_df['authoredAt'].dt.to_period('W-SUN').dt.end_time.dt.normalize()
+        self.weeks, self.week_codes = np.unique(weeks.to_numpy(dtype='datetime64[ns]'), return_inverse=True)
+
+    def week_term_counts(self, rows):
+        # Sparse (week, term) -> count sums over the selected posts, sorted by week then term. Only
+        # the selected rows' entries are read (grouped by week through a sort of the rows, not of
+        # the entries), and each week's term counts are summed on their own.
+        if len(rows) == 0:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float64)
+        row_weeks = self.week_codes[rows]
+        order = np.argsort(row_weeks, kind='stable')
+        rows, row_weeks = rows[order], row_weeks[order]
+
+        # Positions of the selected rows' entries, indptr[r]:indptr[r + 1] for each row in turn
+        starts = self.indptr[rows]
+        lengths = self.indptr[rows + 1] - starts
+        ends = np.cumsum(lengths)
+        positions = np.arange(ends[-1]) + np.repeat(starts - (ends - lengths), lengths)
+        entry_terms = self.indices[positions]
+        entry_counts = self.data[positions]
+
+        observed, first_rows = np.unique(row_weeks, return_index=True)
+        bounds = np.append((ends - lengths)[first_rows], ends[-1])
+        weeks, terms, counts = [], [], []
+        for week, low, high in zip(observed, bounds[:-1], bounds[1:]):
+            if (high - low) * SPARSE_WEEK_RATIO < self.n_terms:
+                # Few entries: sort just this week's terms
+                week_terms, inverse = np.unique(entry_terms[low:high], return_inverse=True)
+                week_counts = np.bincount(inverse, weights=entry_counts[low:high])
+            else:
+                totals = np.bincount(entry_terms[low:high], weights=entry_counts[low:high], minlength=self.n_terms)
+                week_terms = np.flatnonzero(totals)
+                week_counts = totals[week_terms]
+            weeks.append(np.full(len(week_terms), week, dtype=np.int64))
+            terms.append(week_terms.astype(np.int64))
+            counts.append(week_counts.astype(np.float64))
+        return np.concatenate(weeks), np.concatenate(terms), np.concatenate(counts)
+
+    def weekly_keywords(self, rows, k=KEYWORDS_PER_WEEK):
+        ## keywords.pkl-shaped frame (weekAuthored, 0..k-1) of the top terms per week in the subset
+        empty = pd.DataFrame(columns=['weekAuthored'] + list(range(k)))
+        if self.n_terms == 0 or len(rows) == 0:
+            return empty
+        weeks, terms, counts = self.week_term_counts(np.asarray(rows, dtype=np.int64))
+        if len(weeks) == 0:
+            return empty
+
+        # Term frequency within each week, smoothed inverse frequency across the subset's weeks
+        observed = np.unique(weeks)
+        week_totals = np.bincount(weeks, weights=counts)
+        documents = np.bincount(terms, minlength=self.n_terms)
+        idf = np.log10((1 + len(observed)) / (1 + documents)) + 1
+        scores = counts / week_totals[weeks] * idf[terms]
+
+        bounds = np.searchsorted(weeks, np.append(observed, observed[-1] + 1))
+        records = []
+        for week, low, high in zip(observed, bounds[:-1], bounds[1:]):
+            week_scores = scores[low:high]
+            top = np.arange(len(week_scores))
+            if len(week_scores) > k:
+                # Every term scoring at least the k-th best score, so ties at the cut are decided below
+                top = np.flatnonzero(week_scores >= -np.partition(-week_scores, k - 1)[k - 1])
+            # Highest score first, ties in vocabulary order
+            top = top[np.lexsort((terms[low:high][top], -week_scores[top]))][:k]
+            keywords = [self.terms[term] for term in terms[low:high][top]]
+            records.append([pd.Timestamp(self.weeks[week])] + keywords + [None] * (k - len(keywords)))
+
+        return pd.DataFrame(records, columns=['weekAuthored'] + list(range(k)))